@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+📦 Batch Mode - Upload tanpa interaksi dari manifest CSV / JSONL
+Manifest dibaca baris per baris (tidak dimuat semua ke memori) dan job
+langsung dikirim ke worker pool. Tidak pernah menunggu input keyboard:
+kalau login/post otomatis gagal, job ditandai retry dan ditulis ke retry file
+(formatnya sama dengan manifest, jadi bisa langsung dijalankan ulang).
+
+Kolom manifest:
+    path          file video (wajib)
+    account       akun di cookie vault (default: default)
+    caption       teks caption (otomatis caption_mode=text)
+    caption_mode  ai | local | text | none  (local = caption engine offline, tanpa Gemini)
+    description   konteks untuk caption AI / local (default: nama file)
+
+Usage:
+    python batch.py manifest.csv
+    python batch.py manifest.jsonl --concurrency 2 --retry-file config/retry.jsonl
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+
+from cookie_vault import DEFAULT_ACCOUNT
+from video_inspector import inspect_video, format_report
+from worker_pool import iter_pool
+
+CAPTION_MODES = ("ai", "local", "text", "none")
+RETRY_FILE = "config/retry.jsonl"
+
+
+def _manifest_rows(path):
+    """Raw rows (line number, dict) from a CSV or JSONL manifest, one at a time"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    print(f"⚠️ {path}:{line_no}: invalid JSON ({e})")
+                    continue
+                if isinstance(row, dict):
+                    yield line_no, row
+                else:
+                    print(f"⚠️ {path}:{line_no}: expected a JSON object")
+        else:
+            # Header is line 1, so data rows start at line 2
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, row
+
+
+def read_manifest(path, default_mode="ai"):
+    """Stream normalized job dicts from a manifest; bad rows are reported and skipped"""
+    for line_no, row in _manifest_rows(path):
+        row = {str(k).strip().lower(): (v.strip() if isinstance(v, str) else v)
+               for k, v in row.items() if k is not None}
+        video_path = row.get('path') or row.get('video_path')
+        if not video_path:
+            print(f"⚠️ {path}:{line_no}: missing video path")
+            continue
+
+        caption = row.get('caption') or ""
+        mode = (row.get('caption_mode') or ("text" if caption else default_mode)).lower()
+        if mode not in CAPTION_MODES:
+            print(f"⚠️ {path}:{line_no}: unknown caption_mode '{mode}'")
+            continue
+
+        yield {
+            'job_id': line_no,
+            'video_path': os.path.abspath(os.path.expanduser(video_path)),
+            'account': row.get('account') or DEFAULT_ACCOUNT,
+            'caption_mode': mode,
+            'caption': caption if mode == "text" else "",
+            'description': row.get('description') or "",
+        }
+
+
+def append_retry(retry_out, job, error):
+    """Write a job back in manifest format so the retry file can be run as is"""
+    entry = {k: job.get(k, "") for k in ('video_path', 'account', 'caption_mode', 'caption', 'description')}
+    entry['path'] = entry.pop('video_path')
+    entry['error'] = error
+    retry_out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    retry_out.flush()
+
+
+def run_batch(manifest, concurrency=1, max_workers=None, lean=False, retry_file=RETRY_FILE, default_mode="ai"):
+    """Run a manifest through the worker pool; returns counts per outcome"""
+    counts = {'posted': 0, 'skipped': 0, 'retry': 0, 'failed': 0, 'rejected': 0}
+    inflight = {}
+
+    os.makedirs(os.path.dirname(retry_file) or ".", exist_ok=True)
+    retry_out = open(retry_file, 'a', encoding='utf-8')
+
+    def accepted_jobs():
+        # Pre-flight each row as it streams past, so bad files never reach a browser
+        for job in read_manifest(manifest, default_mode):
+            report = inspect_video(job['video_path'])
+            if not report['ok']:
+                print(format_report(report))
+                counts['rejected'] += 1
+                continue
+            inflight[job['job_id']] = job
+            yield job
+
+    try:
+        for result in iter_pool(accepted_jobs(), concurrency, max_workers, lean=lean):
+            job = inflight.pop(result['job_id'], None)
+            name = os.path.basename(result['video_path'])
+            if result['skipped']:
+                counts['skipped'] += 1
+                print(f"⏭️ {name} [{result['account']}] already posted")
+            elif result['success']:
+                counts['posted'] += 1
+                print(f"✅ {name} [{result['worker']}] {result['duration']:.1f}s")
+            elif result['retry']:
+                counts['retry'] += 1
+                print(f"🔁 {name} [{result['worker']}] {result['error']}")
+                if job:
+                    append_retry(retry_out, job, result['error'])
+            else:
+                counts['failed'] += 1
+                print(f"❌ {name} [{result['worker']}] {result['error']}")
+    finally:
+        retry_out.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Non-interactive TikTok upload from a CSV/JSONL manifest")
+    parser.add_argument("manifest", help="CSV (with header) or JSONL manifest")
+    parser.add_argument("--concurrency", type=int, default=1, help="Workers per account")
+    parser.add_argument("--max-workers", type=int, default=None, help="Total worker cap (default: CPU cores)")
+    parser.add_argument("--caption-mode", choices=CAPTION_MODES, default="ai",
+                        help="Used for rows without caption/caption_mode")
+    parser.add_argument("--retry-file", default=RETRY_FILE, help="Jobs to run again are appended here")
+    parser.add_argument("--lean", action="store_true", help="Headless lean browsers")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.manifest):
+        print(f"❌ Manifest not found: {args.manifest}")
+        return
+
+    print("📦 TikTok Batch Upload")
+    print(f"📄 Manifest: {args.manifest} | 🔁 Retry file: {args.retry_file}")
+    print("-" * 50)
+
+    started = time.time()
+    counts = run_batch(args.manifest, args.concurrency, args.max_workers, args.lean, args.retry_file,
+                       args.caption_mode)
+    elapsed = time.time() - started
+
+    print("-" * 50)
+    print(f"✅ Posted: {counts['posted']} | ⏭️ Skipped: {counts['skipped']} | 🔁 Retry: {counts['retry']} | "
+          f"❌ Failed: {counts['failed']} | 🚫 Rejected: {counts['rejected']}")
+    print(f"⏱️ {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+🏁 Offline Benchmark - Jalankan login_tiktok / upload_video / post_video
+terhadap bench_site.py (tanpa internet) dan laporkan latency per fase
+serta videos/hour. Dipakai untuk cek setiap perubahan performa.
+
+Usage:
+    python bench.py --videos 10 --processing 3 --jitter 1
+    python bench.py --variant alt --json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import metrics
+from bench_site import BenchSite, VARIANTS
+from tiktok_uploader import TikTokUploader
+from selector_registry import SelectorRegistry
+from session_check import SessionCache
+
+BENCH_CAPTION = "🔥 Bench caption #fyp #viral #bench #test #speed"
+
+
+def run_benchmark(videos=5, processing=3.0, jitter=0.5, variant='default', headless=True, caption=BENCH_CAPTION,
+                  lean=False):
+    """Run the real uploader flow against the local stand-in; returns a result dict"""
+    site = BenchSite(processing=processing, jitter=jitter, variant=variant).start()
+    workdir = tempfile.mkdtemp(prefix="tiktok-bench-")
+
+    # Keep bench numbers and learned state out of the real config/ files
+    saved_metrics = (metrics.recorder.events_file, metrics.recorder.prom_file)
+    metrics.recorder.flush()
+    metrics.recorder.events_file = os.path.join(workdir, "events.jsonl")
+    metrics.recorder.prom_file = os.path.join(workdir, "bench.prom")
+
+    uploader = None
+    result = {'variant': variant, 'videos': videos, 'processing': processing, 'jitter': jitter,
+              'posted': 0, 'login_ok': False}
+    try:
+        cookies_file = os.path.join(workdir, "cookies.json")
+        with open(cookies_file, 'w', encoding='utf-8') as f:
+            json.dump([{
+                'name': 'sessionid', 'value': 'bench', 'domain': '127.0.0.1', 'path': '/',
+                'expiry': int(time.time()) + 86400,
+            }], f)
+
+        video_path = os.path.join(workdir, "bench.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(b"\0" * 1024)
+
+        # Non-interactive: a broken login/post fails the bench instead of waiting for a human
+        uploader = TikTokUploader(cookies_file=cookies_file, user_data_dir=os.path.join(workdir, "profile"),
+                                  account="bench", interactive=False)
+        uploader.base_url = site.url
+        uploader.selectors = SelectorRegistry(stats_file=os.path.join(workdir, "selector_stats.json"))
+        uploader.session_cache = SessionCache(state_file=os.path.join(workdir, "session_state.json"))
+
+        started = time.time()
+        if not uploader.setup_driver(detach=False, headless=headless, lean=lean):
+            raise Exception("Chrome could not start")
+        result['login_ok'] = bool(uploader.login_tiktok())
+        if not result['login_ok']:
+            raise Exception(f"Login against bench site failed ({uploader.retry_reason or 'no session'})")
+
+        loop_started = time.time()
+        for i in range(videos):
+            if i and not uploader.open_upload_page():
+                continue
+            if uploader.upload_video(video_path, caption):
+                result['posted'] += 1
+        finished = time.time()
+
+        result['total_seconds'] = finished - started
+        result['upload_seconds'] = finished - loop_started
+        result['videos_per_hour'] = result['posted'] / result['upload_seconds'] * 3600 if result['posted'] else 0.0
+        result['phases'] = {
+            name: {'count': stats['count'], 'failures': stats['failures'],
+                   'p50': stats['quantiles'][0.5], 'p95': stats['quantiles'][0.95]}
+            for name, stats in metrics.summarize(metrics.read_events(metrics.recorder.events_file)).items()
+        }
+    finally:
+        if uploader:
+            uploader.close()
+        site.stop()
+        # Bench spans go to the bench .prom, then the real files are used again
+        metrics.recorder.flush()
+        metrics.recorder.events_file, metrics.recorder.prom_file = saved_metrics
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def print_result(result):
+    print(f"\n🏁 Benchmark ({result['variant']} variant, {result['processing']}s ± {result['jitter']}s processing)")
+    print("-" * 60)
+    print(f"{'phase':<28}{'count':>7}{'fail':>6}{'p50':>9}{'p95':>9}")
+    for name, stats in sorted(result['phases'].items()):
+        print(f"{name:<28}{stats['count']:>7}{stats['failures']:>6}{stats['p50']:>8.2f}s{stats['p95']:>8.2f}s")
+    print("-" * 60)
+    print(f"📤 Posted: {result['posted']}/{result['videos']}")
+    print(f"⏱️ Total: {result['total_seconds']:.1f}s (uploads {result['upload_seconds']:.1f}s)")
+    print(f"🚀 Throughput: {result['videos_per_hour']:.0f} videos/hour")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end uploader benchmark")
+    parser.add_argument("--videos", type=int, default=5)
+    parser.add_argument("--processing", type=float, default=3.0, help="Fake processing seconds per video")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default='default')
+    parser.add_argument("--headful", action="store_true", help="Show the browser window")
+    parser.add_argument("--lean", action="store_true", help="Use the lean browser profile")
+    parser.add_argument("--json", action="store_true", help="Print the raw result as JSON")
+    args = parser.parse_args()
+
+    try:
+        result = run_benchmark(args.videos, args.processing, args.jitter, args.variant, not args.headful,
+                               lean=args.lean)
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_result(result)
+    sys.exit(0 if result['posted'] == result['videos'] else 1)
+
+
+if __name__ == "__main__":
+    main()
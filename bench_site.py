@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+🧪 Bench Site - Tiruan lokal halaman TikTok untuk benchmark offline
+Meniru kontrak DOM yang dipakai TikTokUploader:
+- homepage dengan profile indicator (kalau cookie sessionid ada)
+- /upload dengan input[type='file'], progress bar, caption editor contenteditable
+- button[data-e2e="publish-button"] yang aktif setelah "processing" selesai
+Delay processing, jitter dan varian selector bisa diatur.
+
+Usage:
+    python bench_site.py --port 8900 --processing 3 --jitter 1 --variant alt
+"""
+
+import json
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Which selectors each variant exposes, so selector fallbacks get exercised too
+VARIANTS = {
+    'default': {
+        'profile': '<div data-e2e="profile-icon">👤</div>',
+        'editor': '<div contenteditable="true" data-e2e="editor" style="min-height:40px;border:1px solid #ccc"></div>',
+    },
+    'alt': {
+        'profile': '<a href="/upload">Upload</a>',
+        'editor': '<textarea placeholder="Add a caption" rows="3" cols="60"></textarea>',
+    },
+}
+
+HOME_HTML = """<!doctype html>
+<html><head><title>TikTok (bench)</title></head><body>
+<div id="app">Loading...</div>
+<script>
+setTimeout(function() {
+    document.getElementById('app').innerHTML = %(logged_in)s ? %(profile)s : '<button>Log in</button>';
+}, %(render_ms)d);
+</script>
+</body></html>"""
+
+UPLOAD_HTML = """<!doctype html>
+<html><head><title>Upload (bench)</title></head><body>
+<div id="app">Loading...</div>
+<script>
+var cfg = %(config)s;
+function jittered(ms) { return Math.max(0, ms + (Math.random() * 2 - 1) * cfg.jitter_ms); }
+setTimeout(function() {
+    if (!cfg.logged_in) {
+        document.getElementById('app').innerHTML = '<div>Log in to upload</div>';
+        return;
+    }
+    document.getElementById('app').innerHTML =
+        '<div data-e2e="upload-container"><input type="file" accept="video/*"></div><div id="editor-area"></div>';
+    document.querySelector('input[type=file]').addEventListener('change', startProcessing);
+}, cfg.render_ms);
+
+function startProcessing() {
+    var area = document.getElementById('editor-area');
+    area.innerHTML = '<div role="progressbar" aria-valuenow="0" aria-valuemin="0" aria-valuemax="100"></div>'
+        + '<button data-e2e="publish-button" disabled>Post</button>';
+    var bar = area.querySelector('[role=progressbar]');
+    var total = jittered(cfg.processing_ms), started = Date.now();
+    var tick = setInterval(function() {
+        var pct = Math.min(100, Math.round((Date.now() - started) / Math.max(total, 1) * 100));
+        bar.setAttribute('aria-valuenow', pct);
+        bar.textContent = pct + '%%';
+        if (pct >= 100) {
+            clearInterval(tick);
+            area.insertAdjacentHTML('afterbegin', cfg.editor);
+            var button = area.querySelector('button[data-e2e="publish-button"]');
+            button.disabled = false;
+            button.addEventListener('click', publish);
+        }
+    }, 100);
+}
+
+function publish() {
+    var button = this;
+    button.disabled = true;
+    setTimeout(function() { location.href = '/manage'; }, jittered(cfg.post_ms));
+}
+</script>
+</body></html>"""
+
+MANAGE_HTML = """<!doctype html>
+<html><head><title>Posts (bench)</title></head><body><h1>Manage your posts</h1></body></html>"""
+
+
+class BenchSite:
+    """Local stand-in server; start() runs it on a background thread"""
+
+    def __init__(self, port=0, processing=3.0, jitter=0.5, render=0.3, post=0.5, variant='default'):
+        self.config = {
+            'processing_ms': int(processing * 1000),
+            'jitter_ms': int(jitter * 1000),
+            'render_ms': int(render * 1000),
+            'post_ms': int(post * 1000),
+            'variant': variant,
+        }
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_html(self, body, content_type="text/html; charset=utf-8"):
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                variant = VARIANTS[site.config['variant']]
+                logged_in = "sessionid=" in (self.headers.get("Cookie") or "")
+                # Render delay also gets jitter, like a real SPA hydrating
+                render_ms = max(0, site.config['render_ms'] + random.randint(-1, 1) * site.config['jitter_ms'] // 4)
+
+                if path == "/":
+                    self.send_html(HOME_HTML % {
+                        'logged_in': json.dumps(logged_in),
+                        'profile': json.dumps(variant['profile']),
+                        'render_ms': render_ms,
+                    })
+                elif path == "/upload":
+                    config = dict(site.config, logged_in=logged_in, render_ms=render_ms, editor=variant['editor'])
+                    self.send_html(UPLOAD_HTML % {'config': json.dumps(config)})
+                elif path == "/manage":
+                    self.send_html(MANAGE_HTML)
+                elif path == "/robots.txt":
+                    self.send_html("User-agent: *\n", "text/plain")
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local TikTok stand-in for offline benchmarks")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--processing", type=float, default=3.0, help="Seconds of fake video processing")
+    parser.add_argument("--jitter", type=float, default=0.5, help="± seconds of random jitter")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default='default')
+    args = parser.parse_args()
+
+    site = BenchSite(args.port, args.processing, args.jitter, variant=args.variant)
+    print(f"🧪 Bench site running at {site.url} (variant: {args.variant})")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+🔥 Browser Daemon - Chrome tetap hidup, sudah login, siap di halaman upload
+Daemon memegang satu atau lebih sesi Chrome (via remote debugging port).
+Client kecil mengirim job upload ke daemon, jadi tiap upload mulai dari
+halaman upload yang sudah terbuka dan sudah login.
+
+Usage:
+    python browser_daemon.py serve --sessions 2     # start daemon
+    python browser_daemon.py submit video.mp4 --caption "..."
+    python browser_daemon.py status
+    python browser_daemon.py stop
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+import socketserver
+
+from tiktok_uploader import TikTokUploader
+from cookie_vault import DEFAULT_ACCOUNT, cookies_path
+
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+BASE_DEBUG_PORT = 9222
+PROFILE_DIR = "config/daemon"
+
+
+def port_open(port, host="127.0.0.1"):
+    """True if something is listening on the port"""
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+class WarmSession:
+    """One Chrome instance kept logged in and parked on the upload page"""
+
+    def __init__(self, slot, cookies_file):
+        self.slot = slot
+        self.debug_port = BASE_DEBUG_PORT + slot
+        self.uploader = TikTokUploader(
+            cookies_file=cookies_file,
+            user_data_dir=os.path.join(PROFILE_DIR, f"profile-{slot}"),
+            # Requests are handled on server threads: no usable stdin for manual steps
+            interactive=False,
+        )
+        self.cold_start = None
+        self.reused_browser = False
+        self.uploads = 0
+
+    def start(self):
+        """Attach to a browser left by a previous run, or launch a new one"""
+        started = time.time()
+        self.reused_browser = port_open(self.debug_port)
+
+        if self.reused_browser:
+            ok = self.uploader.attach_driver(f"127.0.0.1:{self.debug_port}")
+            # Still parked on the upload page from last time? Then no login needed
+            if ok and self.uploader.open_upload_page():
+                self.cold_start = time.time() - started
+                return True
+            if not ok:
+                return False
+        else:
+            # detach=True keeps Chrome alive after the daemon exits, for the next run
+            if not self.uploader.setup_driver(detach=True, debugging_port=self.debug_port):
+                return False
+
+        if not self.uploader.login_tiktok():
+            return False
+        self.cold_start = time.time() - started
+        return True
+
+    def ensure_ready(self):
+        """Make sure we're on an authenticated upload page; returns seconds spent"""
+        started = time.time()
+        try:
+            if "/upload" in self.uploader.driver.current_url and \
+                    self.uploader.selectors.find(self.uploader.driver, 'upload', 2):
+                return time.time() - started
+            if self.uploader.open_upload_page():
+                return time.time() - started
+        except Exception as e:
+            print(f"⚠️ [session {self.slot}] Browser not responding: {e}")
+
+        # Browser died or session lost: fall back to a cold start
+        print(f"🔄 [session {self.slot}] Restarting browser...")
+        try:
+            self.uploader.close()
+        except Exception:
+            pass
+        if not self.start():
+            raise Exception("Failed to restart browser session")
+        return time.time() - started
+
+
+class BrowserDaemon:
+    """Owns warm sessions and serves upload jobs over a local socket"""
+
+    def __init__(self, sessions=1, cookies_file=cookies_path(DEFAULT_ACCOUNT)):
+        self.sessions = [WarmSession(slot, cookies_file) for slot in range(sessions)]
+        self.idle = queue.Queue()
+        self.server = None
+
+    def start(self):
+        for session in self.sessions:
+            print(f"🔥 Warming session {session.slot} (debug port {session.debug_port})...")
+            if session.start():
+                how = "re-attached" if session.reused_browser else "cold start"
+                print(f"✅ Session {session.slot} ready in {session.cold_start:.1f}s ({how})")
+                self.idle.put(session)
+            else:
+                print(f"❌ Session {session.slot} failed to start")
+        return not self.idle.empty()
+
+    def handle(self, request):
+        """Execute one client request and return the response dict"""
+        cmd = request.get('cmd')
+
+        if cmd == 'status':
+            return {
+                'ok': True,
+                'sessions': [
+                    {'slot': s.slot, 'port': s.debug_port, 'uploads': s.uploads, 'cold_start': s.cold_start}
+                    for s in self.sessions
+                ],
+                'idle': self.idle.qsize(),
+            }
+
+        if cmd == 'stop':
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {'ok': True}
+
+        if cmd != 'upload':
+            return {'ok': False, 'error': f"unknown command: {cmd}"}
+
+        received = time.time()
+        session = self.idle.get()
+        try:
+            warm_start = session.ensure_ready()
+            upload_started = time.time()
+            success = session.uploader.upload_video(request['video_path'], request.get('caption', ""))
+            session.uploads += 1
+            return {
+                'ok': bool(success),
+                'session': session.slot,
+                'queued': upload_started - received - warm_start,
+                'warm_start': warm_start,
+                'cold_start': session.cold_start,
+                'upload': time.time() - upload_started,
+            }
+        except Exception as e:
+            return {'ok': False, 'session': session.slot, 'error': str(e)}
+        finally:
+            # Park the browser on a fresh upload page so the next job starts warm
+            try:
+                session.uploader.open_upload_page()
+            except Exception:
+                pass
+            self.idle.put(session)
+
+    def serve(self, host=DAEMON_HOST, port=DAEMON_PORT):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = daemon.handle(json.loads(line))
+                    except Exception as e:
+                        response = {'ok': False, 'error': str(e)}
+                    self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+                    self.wfile.flush()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        print(f"🟢 Daemon listening on {host}:{port} ({self.idle.qsize()} warm session(s))")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            # Browsers stay open on purpose: the next daemon re-attaches to them
+            print("🛑 Daemon stopped (browsers left running for next start)")
+
+
+def send_request(request, host=DAEMON_HOST, port=DAEMON_PORT, timeout=None):
+    """Client side: send one request to the daemon and return its response"""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        reader = sock.makefile('r', encoding='utf-8')
+        return json.loads(reader.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-browser TikTok upload daemon")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Start the daemon")
+    serve.add_argument("--sessions", type=int, default=1, help="Number of warm Chrome sessions")
+    serve.add_argument("--account", default=DEFAULT_ACCOUNT, help="Vault account to log in with")
+    serve.add_argument("--port", type=int, default=DAEMON_PORT)
+
+    submit = sub.add_parser("submit", help="Upload a video through the daemon")
+    submit.add_argument("video")
+    submit.add_argument("--caption", default="")
+    submit.add_argument("--port", type=int, default=DAEMON_PORT)
+
+    for name in ("status", "stop"):
+        sub.add_parser(name).add_argument("--port", type=int, default=DAEMON_PORT)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        daemon = BrowserDaemon(args.sessions, cookies_path(args.account))
+        if not daemon.start():
+            print("❌ No session could be started")
+            sys.exit(1)
+        daemon.serve(port=args.port)
+        return
+
+    try:
+        if args.command == "submit":
+            if not os.path.exists(args.video):
+                print(f"❌ File not found: {args.video}")
+                sys.exit(1)
+            started = time.time()
+            response = send_request({
+                'cmd': 'upload',
+                'video_path': os.path.abspath(args.video),
+                'caption': args.caption,
+            }, port=args.port)
+            if response.get('ok'):
+                print(f"🎉 Uploaded via session {response['session']} in {time.time() - started:.1f}s")
+            else:
+                print(f"❌ Upload failed: {response.get('error', 'see daemon log')}")
+            if 'warm_start' in response:
+                print(f"⏱️ Warm start: {response['warm_start']:.2f}s | "
+                      f"Cold start (session launch + login): {response['cold_start']:.1f}s | "
+                      f"Upload: {response['upload']:.1f}s")
+            sys.exit(0 if response.get('ok') else 1)
+        else:
+            print(json.dumps(send_request({'cmd': args.command}, port=args.port), indent=2))
+    except ConnectionRefusedError:
+        print("❌ Daemon is not running. Start it with: python browser_daemon.py serve")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+🪶 Lean Browser Profile - Chrome headless yang hemat RAM & bandwidth
+- Gambar, autoplay media, font dan tracker/analytics diblokir via CDP
+- Flag memori untuk menjalankan lebih banyak browser per host
+- Alat ukur: waktu load halaman + RSS seluruh proses Chrome
+
+Usage:
+    python browser_profile.py compare --url https://www.tiktok.com --runs 3
+"""
+
+import os
+import time
+import argparse
+
+# Matched by Network.setBlockedURLs (wildcards allowed)
+LEAN_BLOCKED_URL_PATTERNS = [
+    # Images
+    "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.png", "*.png?*",
+    "*.gif", "*.gif?*", "*.webp", "*.webp?*", "*.avif", "*.avif?*", "*.ico",
+    "*.image?*", "*~tplv-*",
+    # Video previews / feed playback (uploads go to a different endpoint)
+    "*mime_type=video_mp4*", "*/video/tos/*", "*.m3u8*", "*.m4s*",
+    # Fonts
+    "*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.otf",
+    # Third-party analytics and TikTok telemetry
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*connect.facebook.*", "*analytics.tiktok.com*",
+    "*/monitor_browser/*", "*/web/report*", "*mon.tiktokv.com*", "*mcs.tiktokw.com*",
+]
+
+# Merged with the standard --disable-features list (Chrome only honours the last flag)
+LEAN_DISABLED_FEATURES = [
+    "Translate", "MediaRouter", "OptimizationHints", "AutofillServerCommunication",
+    "BackForwardCache", "InterestFeedContentSuggestions",
+]
+
+LEAN_ARGUMENTS = [
+    "--headless=new",
+    "--blink-settings=imagesEnabled=false",
+    "--autoplay-policy=user-gesture-required",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--disable-breakpad",
+    "--renderer-process-limit=2",
+    "--disable-site-isolation-trials",
+    "--js-flags=--max-old-space-size=512",
+    "--disk-cache-size=33554432",
+]
+
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+
+
+def block_requests(driver, patterns=None):
+    """Block URL patterns for this tab through CDP (call before the first navigation)"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns or LEAN_BLOCKED_URL_PATTERNS})
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not enable request blocking: {e}")
+        return False
+
+
+def _children_map():
+    """ppid -> [pid] from /proc (Linux only)"""
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", 'r') as f:
+                # Field 4 is ppid; the command name (field 2) may contain spaces, so split after ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def process_tree(root_pid):
+    """root_pid and all its descendants (Linux only)"""
+    children = _children_map()
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def process_rss_mb(pid):
+    """Resident memory of one process in MB, None if unknown"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def driver_rss_mb(driver):
+    """Total RSS of chromedriver + every Chrome process it spawned (None off Linux)"""
+    if not os.path.isdir("/proc"):
+        return None
+    try:
+        root_pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    sizes = [process_rss_mb(pid) for pid in process_tree(root_pid)]
+    return sum(size for size in sizes if size)
+
+
+def page_load_ms(driver):
+    """Navigation timing of the current page (start → load event) in ms"""
+    return driver.execute_script("""
+var nav = performance.getEntriesByType('navigation')[0];
+if (nav) return nav.loadEventEnd || nav.domContentLoadedEventEnd;
+return performance.timing.loadEventEnd - performance.timing.navigationStart;
+""")
+
+
+def measure_profile(lean, url, runs=3):
+    """Start a browser in one profile, load url a few times; returns (load_ms list, rss_mb)"""
+    from tiktok_uploader import TikTokUploader
+
+    uploader = TikTokUploader()
+    # Compare like with like: both profiles headless, only the lean tuning differs
+    if not uploader.setup_driver(detach=False, headless=True, lean=lean):
+        raise Exception("Chrome could not start")
+    try:
+        loads = []
+        for _ in range(runs):
+            uploader.driver.get(url)
+            loads.append(page_load_ms(uploader.driver))
+            uploader.driver.get("about:blank")
+        uploader.driver.get(url)
+        time.sleep(2)
+        return loads, driver_rss_mb(uploader.driver)
+    finally:
+        uploader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lean Chrome profile tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compare = sub.add_parser("compare", help="Page load time and RSS: standard vs lean profile")
+    compare.add_argument("--url", default="https://www.tiktok.com")
+    compare.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"📏 Measuring {args.url} ({args.runs} loads per profile)...")
+    results = {}
+    for name, lean in (("standard", False), ("lean", True)):
+        loads, rss = measure_profile(lean, args.url, args.runs)
+        results[name] = (loads, rss)
+
+    print(f"\n{'profile':<10}{'load p50':>12}{'load max':>12}{'RSS':>12}")
+    print("-" * 46)
+    for name, (loads, rss) in results.items():
+        loads = sorted(loads)
+        rss_text = f"{rss:.0f}MB" if rss is not None else "n/a"
+        print(f"{name:<10}{loads[len(loads) // 2]:>10.0f}ms{loads[-1]:>10.0f}ms{rss_text:>12}")
+
+
+if __name__ == "__main__":
+    main()
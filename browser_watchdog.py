@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+🐕 Browser Watchdog - Chrome worker tetap sehat untuk operasi berhari-hari
+- Browser di-recycle setelah N upload, kalau RSS proses tree Chrome melewati batas,
+  atau kalau tidak merespon. Sesi akun dimasukkan lagi dari cookie vault.
+- chromedriver / Chrome worker yang yatim (parent sudah mati) dibersihkan
+
+Usage:
+    python browser_watchdog.py status          # RSS semua proses chromedriver
+    python browser_watchdog.py reap --dry-run  # lihat proses yatim
+    python browser_watchdog.py reap
+"""
+
+import os
+import time
+import signal
+import argparse
+import threading
+
+import metrics
+from browser_profile import process_tree, process_rss_mb, driver_rss_mb
+from cookie_vault import ACCOUNTS_DIR
+
+DEFAULT_RECYCLE_AFTER = 25
+DEFAULT_MAX_RSS_MB = 1500
+PING_TIMEOUT = 15
+# Processes that adopt orphans besides pid 1 (PR_SET_CHILD_SUBREAPER / container inits)
+SUBREAPERS = ("systemd", "init", "tini", "dumb-init", "catatonit", "containerd-shim", "s6-svscan", "runsv",
+              "supervisord")
+
+
+def _call_with_timeout(func, timeout):
+    """Run func on a daemon thread; returns (finished, result) without waiting past timeout"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func()
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive() or 'error' in outcome:
+        return False, None
+    return True, outcome.get('result')
+
+
+def _kill(pids):
+    """SIGKILL whatever is still alive"""
+    killed = 0
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            killed += 1
+        except (OSError, AttributeError):
+            pass
+    return killed
+
+
+def _process_info(pid):
+    """(ppid, name, argv) from /proc, None if the process is gone"""
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            stat = f.read()
+        with open(f"/proc/{pid}/cmdline", 'rb') as f:
+            argv = [arg.decode('utf-8', 'replace') for arg in f.read().split(b"\0") if arg]
+    except OSError:
+        return None
+    name = stat[stat.index("(") + 1:stat.rindex(")")]
+    ppid = int(stat.rsplit(")", 1)[1].split()[1])
+    return ppid, name, argv
+
+
+def _adopted(ppid):
+    """Parent is init or a subreaper, i.e. whoever started the process is gone"""
+    if ppid == 1:
+        return True
+    info = _process_info(ppid)
+    return bool(info) and info[1] in SUBREAPERS
+
+
+def _uses_profile(argv, profile_root):
+    """Chrome started on a user-data-dir under profile_root"""
+    for arg in argv:
+        if arg.startswith("--user-data-dir="):
+            path = os.path.abspath(arg.split("=", 1)[1])
+            return path == profile_root or path.startswith(profile_root + os.sep)
+    return False
+
+
+def find_orphans(profile_root=ACCOUNTS_DIR):
+    """Orphaned chromedriver processes and Chrome browsers of worker profiles.
+    Other users' and tools' Selenium sessions never match: a chromedriver only counts
+    when one of its descendants is a Chrome on a profile under profile_root."""
+    if not os.path.isdir("/proc"):
+        return []
+    profile_root = os.path.abspath(profile_root)
+    orphans = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        info = _process_info(int(name))
+        if not info or not _adopted(info[0]):
+            continue
+        ppid, process_name, argv = info
+        if process_name == "chromedriver":
+            descendants = (_process_info(pid) for pid in process_tree(int(name))[1:])
+            if any(child and _uses_profile(child[2], profile_root) for child in descendants):
+                orphans.append(int(name))
+        # Only browsers on worker profiles; detached/daemon browsers are left alone on purpose
+        elif "chrome" in process_name and _uses_profile(argv, profile_root):
+            orphans.append(int(name))
+    return orphans
+
+
+def reap_orphans(profile_root=ACCOUNTS_DIR, dry_run=False):
+    """Kill orphaned worker browsers with their whole process tree; returns pids found"""
+    orphans = find_orphans(profile_root)
+    for pid in orphans:
+        tree = process_tree(pid)
+        rss = sum(size for size in (process_rss_mb(p) for p in tree) if size)
+        print(f"🧹 Orphan pid {pid} ({len(tree)} processes, {rss:.0f}MB){' [dry run]' if dry_run else ''}")
+        if not dry_run:
+            _kill(tree)
+    return orphans
+
+
+class BrowserWatchdog:
+    """Owns the browser lifecycle of one uploader in long-running worker mode"""
+
+    def __init__(self, uploader, recycle_after=DEFAULT_RECYCLE_AFTER, max_rss_mb=DEFAULT_MAX_RSS_MB,
+                 name="worker", **setup_kwargs):
+        self.uploader = uploader
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.name = name
+        self.setup_kwargs = dict(setup_kwargs, detach=False)
+        self.uploads = 0
+        self.recycles = 0
+
+    def start(self):
+        """Launch the browser and log in (cookies come from the vault via login_tiktok)"""
+        if not self.uploader.setup_driver(**self.setup_kwargs):
+            raise Exception("Failed to setup driver")
+        if not self.uploader.login_tiktok():
+            reason = self.uploader.retry_reason or "Login failed"
+            self.shutdown()
+            raise Exception(reason)
+        self.uploads = 0
+
+    def record_upload(self):
+        self.uploads += 1
+
+    def rss_mb(self):
+        return driver_rss_mb(self.uploader.driver) if self.uploader.driver else None
+
+    def responsive(self):
+        finished, state = _call_with_timeout(
+            lambda: self.uploader.driver.execute_script("return document.readyState"), PING_TIMEOUT)
+        return finished and state is not None
+
+    def check(self):
+        """Reason the browser should be recycled, or None if it's healthy"""
+        if not self.uploader.driver:
+            return "no browser"
+        if self.recycle_after and self.uploads >= self.recycle_after:
+            return f"{self.uploads} uploads"
+        rss = self.rss_mb()
+        if self.max_rss_mb and rss is not None and rss > self.max_rss_mb:
+            return f"RSS {rss:.0f}MB > {self.max_rss_mb}MB"
+        if not self.responsive():
+            return "unresponsive"
+        return None
+
+    def shutdown(self):
+        """Quit the driver (bounded) and kill anything left of its process tree"""
+        driver = self.uploader.driver
+        if not driver:
+            return
+        try:
+            pids = process_tree(driver.service.process.pid) if os.path.isdir("/proc") else []
+        except AttributeError:
+            pids = []
+        _call_with_timeout(driver.quit, PING_TIMEOUT)
+        self.uploader.driver = None
+        time.sleep(0.5)
+        leftovers = [pid for pid in pids if _process_info(pid)]
+        if leftovers:
+            print(f"🧹 [{self.name}] Killing {len(leftovers)} leftover browser process(es)")
+            _kill(leftovers)
+
+    def recycle(self, reason):
+        """Fresh browser + session; raises if the new browser can't log in"""
+        print(f"♻️ [{self.name}] Recycling browser ({reason})")
+        with metrics.span("watchdog.recycle", reason=reason, uploads=self.uploads, rss_mb=self.rss_mb()) as span:
+            if reason != "unresponsive":
+                # Keep any session cookies TikTok rotated during this browser's lifetime
+                _call_with_timeout(self.uploader.save_cookies, PING_TIMEOUT)
+            self.shutdown()
+            self.recycles += 1
+            self.start()
+            span.set(ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chrome worker process housekeeping")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="RSS of every chromedriver process tree")
+    reap = sub.add_parser("reap", help="Kill orphaned chromedriver / worker Chrome processes")
+    reap.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.isdir("/proc"):
+        print("❌ Needs Linux /proc")
+        return
+
+    if args.command == "reap":
+        found = reap_orphans(dry_run=args.dry_run)
+        print(f"✅ {len(found)} orphan(s) {'found' if args.dry_run else 'reaped'}")
+        return
+
+    print(f"{'pid':>8}{'ppid':>8}{'procs':>7}{'RSS':>10}")
+    print("-" * 33)
+    for name in sorted(os.listdir("/proc"), key=lambda n: int(n) if n.isdigit() else 0):
+        info = _process_info(int(name)) if name.isdigit() else None
+        if info and info[1] == "chromedriver":
+            tree = process_tree(int(name))
+            rss = sum(size for size in (process_rss_mb(p) for p in tree) if size)
+            print(f"{name:>8}{info[0]:>8}{len(tree):>7}{rss:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
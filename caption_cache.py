@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+🗃️ Caption Cache - Simpan caption AI di disk supaya deskripsi yang sama
+(atau hampir sama) tidak perlu panggil Gemini lagi.
+Key = hash dari deskripsi yang dinormalisasi + versi prompt.
+Eviction berdasarkan umur dan jumlah entry.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import unicodedata
+
+CACHE_DIR = "config/caption_cache"
+
+# Bump whenever the Gemini prompt changes so old captions aren't reused
+PROMPT_VERSION = "v1"
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_AGE = 14 * 24 * 3600
+
+# Run eviction every N writes instead of on every put
+EVICT_EVERY = 20
+
+
+def normalize_description(text):
+    """Collapse case, punctuation and whitespace so near-identical descriptions share a key"""
+    text = unicodedata.normalize('NFKC', text or "").casefold()
+    text = re.sub(r"[^\w#]+", " ", text)
+    return " ".join(text.split())
+
+
+class CaptionCache:
+    """Content-addressed on-disk cache with hit rate and latency stats"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES, max_age=DEFAULT_MAX_AGE,
+                 prompt_version=PROMPT_VERSION):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.prompt_version = prompt_version
+        self.hits = 0
+        self.misses = 0
+        self.latencies = []
+        self.puts = 0
+
+    def key(self, description):
+        raw = f"{self.prompt_version}\0{normalize_description(description)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, description):
+        """Cached caption or None"""
+        path = self._path(self.key(description))
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                raise OSError("expired")
+            with open(path, 'r', encoding='utf-8') as f:
+                caption = json.load(f)['caption']
+            self.hits += 1
+            return caption
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+    def put(self, description, caption):
+        """Store a caption (atomic write)"""
+        path = self._path(self.key(description))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_file = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'description': description,
+                    'prompt_version': self.prompt_version,
+                    'caption': caption,
+                    'created': time.time(),
+                }, f, ensure_ascii=False)
+            os.replace(tmp_file, path)
+        except Exception as e:
+            print(f"⚠️ Failed to cache caption: {e}")
+            return
+
+        self.puts += 1
+        if self.puts % EVICT_EVERY == 1:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        now = time.time()
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    mtime = os.path.getmtime(path)
+                    if now - mtime > self.max_age:
+                        os.remove(path)
+                    else:
+                        entries.append((mtime, path))
+                except OSError:
+                    continue
+
+        if len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def record_latency(self, seconds):
+        """Remember how long one Gemini call took"""
+        self.latencies.append(seconds)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'gemini_calls': len(self.latencies),
+            'avg_latency': sum(self.latencies) / len(self.latencies) if self.latencies else 0.0,
+            'last_latency': self.latencies[-1] if self.latencies else 0.0,
+        }
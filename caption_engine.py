@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+🧠 Caption Engine - Caption lokal tanpa internet (pengganti 6 fallback tetap)
+- Index kata kunci → topik → hashtag dibangun sekali per proses
+- Template + emoji per topik, hasil sesuai deskripsi video
+- Aturan sama dengan prompt Gemini: maksimal 150 karakter, 5-8 hashtag
+- Beberapa mikrodetik per caption: batch bisa pakai mode "local" sebagai jalur utama
+  dan hanya mengirim video tertentu ke Gemini
+
+Usage:
+    python caption_engine.py "kucing lucu main bola" "resep nasi goreng"
+    python caption_engine.py "kucing lucu" --bench 100000
+"""
+
+import re
+import time
+import random
+import argparse
+
+from gemini_client import graphemes, trim_caption, MAX_CAPTION_CHARS, MIN_HASHTAGS, MAX_HASHTAGS
+
+# topic: (keywords, hashtags, emojis)
+TOPICS = {
+    'cat': (("cat", "cats", "kitten", "kucing", "meow", "kitty", "anabul"),
+            ("#cat", "#catsoftiktok", "#kucing", "#meow", "#catlover"), "🐱😹🐾"),
+    'dog': (("dog", "dogs", "puppy", "anjing", "doggo", "pup", "golden", "husky"),
+            ("#dog", "#dogsoftiktok", "#puppy", "#doglover", "#anjing"), "🐶🐕🐾"),
+    'pet': (("pet", "pets", "hamster", "rabbit", "kelinci", "bird", "burung", "hewan", "animal"),
+            ("#pets", "#animals", "#petlover", "#cuteanimals"), "🐾🐰🐹"),
+    'food': (("food", "makanan", "makan", "eat", "eating", "mukbang", "kuliner", "snack", "jajan", "enak"),
+             ("#food", "#foodie", "#kuliner", "#foodtiktok", "#makanenak"), "🍜😋🔥"),
+    'recipe': (("recipe", "resep", "cook", "cooking", "masak", "masakan", "nasi", "goreng", "bake", "kue",
+                "cake", "sambal", "mie"),
+               ("#resep", "#recipe", "#cooking", "#masakrumahan", "#easyrecipe"), "🍳👩‍🍳🔥"),
+    'drink': (("coffee", "kopi", "tea", "teh", "drink", "minuman", "boba", "es", "latte"),
+              ("#coffee", "#kopi", "#minuman", "#drinks", "#ngopi"), "☕🧋✨"),
+    'funny': (("funny", "lucu", "lol", "prank", "ngakak", "comedy", "komedi", "meme", "kocak", "fail"),
+              ("#funny", "#lucu", "#comedy", "#ngakak", "#humor"), "😂🤣💀"),
+    'dance': (("dance", "dancing", "joget", "tari", "choreo", "choreography", "goyang"),
+              ("#dance", "#dancechallenge", "#joget", "#choreography"), "💃🕺🔥"),
+    'music': (("music", "musik", "song", "lagu", "cover", "sing", "singing", "nyanyi", "guitar", "gitar",
+               "piano"),
+              ("#music", "#cover", "#musik", "#singing", "#newmusic"), "🎵🎶🎤"),
+    'travel': (("travel", "trip", "liburan", "jalan", "pantai", "beach", "bali", "gunung", "mountain",
+                "explore", "wisata", "vacation"),
+               ("#travel", "#wisata", "#explore", "#liburan", "#traveltiktok"), "✈️🌴🌅"),
+    'fitness': (("gym", "workout", "fitness", "olahraga", "exercise", "lari", "running", "yoga", "diet"),
+                ("#fitness", "#gym", "#workout", "#olahraga", "#fitnessmotivation"), "💪🏋️🔥"),
+    'beauty': (("makeup", "skincare", "beauty", "cantik", "glow", "outfit", "ootd", "fashion", "style",
+                "hijab"),
+               ("#makeup", "#skincare", "#ootd", "#fashion", "#beauty"), "💄✨💅"),
+    'gaming': (("game", "gaming", "gamer", "mlbb", "ml", "mobile", "legends", "pubg", "ff", "minecraft",
+                "valorant", "roblox", "main"),
+               ("#gaming", "#gamer", "#mobilelegends", "#gamingtiktok", "#gameplay"), "🎮🕹️🔥"),
+    'tech': (("tech", "hp", "phone", "iphone", "android", "laptop", "gadget", "review", "unboxing", "setup"),
+             ("#tech", "#gadget", "#unboxing", "#review", "#techtok"), "📱💻⚡"),
+    'diy': (("diy", "craft", "hack", "tips", "trik", "tutorial", "cara", "howto", "lifehack"),
+            ("#diy", "#tips", "#tutorial", "#lifehack", "#caramudah"), "🛠️💡✨"),
+    'family': (("baby", "bayi", "anak", "kids", "family", "keluarga", "mom", "ibu", "ayah", "dad"),
+               ("#family", "#keluarga", "#baby", "#momlife", "#parenting"), "👶❤️🏡"),
+    'love': (("love", "cinta", "couple", "pacar", "bucin", "relationship", "wedding", "nikah"),
+             ("#love", "#couple", "#bucin", "#relationship", "#couplegoals"), "❤️💑🥰"),
+    'sport': (("football", "sepakbola", "bola", "soccer", "basket", "basketball", "badminton", "goal",
+               "gol", "timnas"),
+              ("#football", "#sepakbola", "#sports", "#goal", "#timnas"), "⚽🏆🔥"),
+    'car': (("car", "mobil", "motor", "motorcycle", "bike", "drift", "modif", "racing"),
+            ("#car", "#otomotif", "#motor", "#carsoftiktok", "#modifikasi"), "🚗🏍️💨"),
+    'nature': (("nature", "alam", "sunset", "sunrise", "rain", "hujan", "flower", "bunga", "sky", "langit"),
+               ("#nature", "#sunset", "#aesthetic", "#naturelover", "#alam"), "🌿🌅🌸"),
+    'daily': (("vlog", "daily", "day", "morning", "pagi", "routine", "rutinitas", "life", "kerja", "school",
+               "sekolah"),
+              ("#vlog", "#dayinmylife", "#dailyvlog", "#routine", "#keseharian"), "📹☀️✨"),
+}
+
+GENERIC_HASHTAGS = ("#fyp", "#foryou", "#viral", "#trending", "#foryoupage", "#fypシ", "#tiktokindonesia")
+GENERIC_EMOJIS = "🔥✨💯🚀😱🎯"
+
+# {subject} = cleaned description, {emoji} = topic emoji
+TEMPLATES = (
+    "{emoji} {subject} hits different! Drop a ❤️ if you agree",
+    "{emoji} POV: you found the best {subject} video today",
+    "{emoji} Can't stop watching this {subject}... who else?",
+    "{emoji} {subject} that made my day! Tag a friend 👇",
+    "{emoji} Wait for it... {subject} 😱",
+    "{emoji} Rate this {subject} from 1-10 👇",
+    "{emoji} Nobody talks about {subject} like this 👀",
+    "{emoji} Save this {subject} for later! 📌",
+    "{emoji} {subject} check ✅ Comment your thoughts!",
+    "{emoji} This {subject} is about to blow up 🚀",
+)
+# Used when there is no description at all (the old fallbacks, without their fixed tags)
+BARE_TEMPLATES = (
+    "{emoji} This hits different! Drop a ❤️",
+    "{emoji} POV: You found the perfect video",
+    "{emoji} This is about to blow up!",
+    "{emoji} Can't stop watching this!",
+    "{emoji} This gave me chills...",
+    "{emoji} Exactly what I needed to see",
+)
+
+MAX_SUBJECT_CHARS = 48
+_TOKEN = re.compile(r"[^\W_]+")
+_NOISE = frozenset(("img", "vid", "video", "mp4", "mov", "final", "edit", "copy", "the", "a", "an", "and", "of",
+                    "yang", "dan", "di", "ke", "ini", "itu"))
+
+_index = None
+
+
+def build_index():
+    """keyword -> tuple of topic ids, plus per-topic hashtag and emoji tuples (last emoji row is generic)"""
+    names = tuple(TOPICS)
+    keywords = {}
+    for topic_id, name in enumerate(names):
+        for keyword in TOPICS[name][0]:
+            keywords.setdefault(keyword, []).append(topic_id)
+    keywords = {keyword: tuple(ids) for keyword, ids in keywords.items()}
+    tags = tuple(TOPICS[name][1] for name in names)
+    emojis = tuple(tuple(graphemes(TOPICS[name][2])) for name in names) + (tuple(graphemes(GENERIC_EMOJIS)),)
+    return names, keywords, tags, emojis
+
+
+def get_index():
+    """The index, built on first use and shared for the rest of the process"""
+    global _index
+    if _index is None:
+        _index = build_index()
+    return _index
+
+
+def tokens(description):
+    """Lowercase words from a description or file stem (kucing_lucu-01 -> kucing, lucu)"""
+    return [word for word in _TOKEN.findall(description.lower()) if not word.isdigit() and word not in _NOISE]
+
+
+def match_topics(words):
+    """Topic ids ranked by matched keywords (first match breaks ties)"""
+    _, keywords, _, _ = get_index()
+    scores = {}
+    for position, word in enumerate(words):
+        ids = keywords.get(word) or (keywords.get(word[:-1]) if word.endswith("s") else None)
+        for topic_id in ids or ():
+            score, first = scores.get(topic_id, (0, position))
+            scores[topic_id] = (score + 1, first)
+    return sorted(scores, key=lambda topic_id: (-scores[topic_id][0], scores[topic_id][1]))
+
+
+def pick_hashtags(words, topic_ids, rng, count, own=()):
+    """Hashtags the description already had, then topic hashtags, the description's
+    own words and generic reach tags; no duplicates (case-insensitive)"""
+    _, keywords, tags, _ = get_index()
+    chosen = []
+    for tag in own:
+        if len(chosen) < MAX_HASHTAGS and tag.lower() not in chosen:
+            chosen.append(tag.lower())
+    count = min(max(count, len(chosen)), MAX_HASHTAGS)
+    # Three tags from the main topic, two from the runner-up
+    for topic_id, take in zip(topic_ids, (3, 2)):
+        for tag in tags[topic_id][:take]:
+            if len(chosen) >= count:
+                break
+            if tag not in chosen:
+                chosen.append(tag)
+    for word in words:
+        tag = "#" + word
+        if len(chosen) >= count - 2:
+            break
+        if word in keywords and len(word) > 2 and tag not in chosen:
+            chosen.append(tag)
+    generic = list(GENERIC_HASHTAGS)
+    rng.shuffle(generic)
+    # #fyp first: it's the one tag every caption should carry
+    for tag in ["#fyp"] + generic:
+        if len(chosen) >= count:
+            break
+        if tag not in chosen:
+            chosen.append(tag)
+    return chosen
+
+
+def split_hashtags(description):
+    """(description without #words, the #words) - hashtags belong at the end, counted once"""
+    words = description.split()
+    own = [word for word in words if word.startswith("#") and len(word) > 1]
+    return " ".join(word for word in words if word not in own), own
+
+
+def subject_text(description):
+    """Description as caption text: single spaces, no file-name noise, bounded length"""
+    if " " not in description.strip():
+        # File stem (IMG_2024_funny_cats): keep only the meaningful words
+        subject = " ".join(tokens(description))
+    else:
+        subject = " ".join(description.split())
+    if len(subject) > MAX_SUBJECT_CHARS:
+        subject = subject[:MAX_SUBJECT_CHARS].rsplit(" ", 1)[0]
+    return subject
+
+
+def generate_caption(description="", rng=None, max_chars=MAX_CAPTION_CHARS):
+    """Description-relevant caption with MIN_HASHTAGS..MAX_HASHTAGS hashtags, no network"""
+    rng = rng or random
+    _, _, _, emojis = get_index()
+    description, own = split_hashtags(description)
+    words = tokens(" ".join([description] + own))
+    topic_ids = match_topics(words)
+    subject = subject_text(description) if tokens(description) else ""
+
+    emoji = rng.choice(emojis[topic_ids[0]] if topic_ids else emojis[-1])
+    template = rng.choice(TEMPLATES if subject else BARE_TEMPLATES)
+    if template.startswith("{emoji} {subject}"):
+        subject = subject[:1].upper() + subject[1:]
+    text = template.format(emoji=emoji, subject=subject)
+
+    hashtags = pick_hashtags(words, topic_ids, rng, rng.randint(MIN_HASHTAGS + 1, MAX_HASHTAGS - 1), own)
+    caption = f"{text} {' '.join(hashtags)}"
+    return caption if len(caption) <= max_chars else trim_caption(caption, max_chars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate captions offline")
+    parser.add_argument("descriptions", nargs="*", default=[""])
+    parser.add_argument("--seed", type=int, help="Reproducible output")
+    parser.add_argument("--bench", type=int, metavar="N", help="Time N captions per description")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for description in args.descriptions:
+        caption = generate_caption(description, rng)
+        print(f"📝 {description or '(no description)'}\n✍️ {caption} ({len(caption)} chars)\n")
+        if args.bench:
+            started = time.perf_counter()
+            for _ in range(args.bench):
+                generate_caption(description, rng)
+            per_caption = (time.perf_counter() - started) / args.bench * 1e6
+            print(f"⏱️ {per_caption:.1f}µs per caption ({args.bench} runs)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+🎯 TikTok Bot CLI - Satu pintu masuk, start cepat
+Setiap subcommand hanya mengimpor modul yang dibutuhkan. Selenium dan Gemini
+baru dimuat saat browser dibuka / caption AI diminta.
+
+Usage:
+    python cli.py upload                          # interaktif (sama dengan tiktok_uploader.py)
+    python cli.py batch manifest.csv
+    python cli.py schedule manifest.csv --plan
+    python cli.py pool video1.mp4 video2.mp4 --account main
+    python cli.py queue --db /mnt/shared/queue.db work   # worker multi-host
+    python cli.py watch /data/drop --account main        # upload otomatis dari drop folder
+    python cli.py reset-cookies [akun]
+    python cli.py caption-only "kucing lucu" "resep nasi goreng"
+    python cli.py caption-only --local "kucing lucu"   # caption engine offline, tanpa Gemini
+    python cli.py bench --videos 3
+    python cli.py import-check                    # exit 1 kalau memuat Selenium/Gemini atau import > 150ms
+    python cli.py import-check --budget-ms 300    # budget lain (mesin CI yang lambat)
+"""
+
+import os
+import sys
+import argparse
+import importlib
+import subprocess
+
+# Entry modules that must start without Selenium / Gemini
+LIGHT_MODULES = ("cli", "fix_cookies", "cookie_vault", "tiktok_uploader", "worker_pool", "batch", "scheduler",
+                 "upload_ledger", "video_inspector", "metrics", "gemini_client", "caption_engine", "job_queue",
+                 "folder_watcher")
+HEAVY_MODULES = ("selenium", "google.generativeai")
+# Cumulative -X importtime of one entry module (CPU time of the import, not process start-up)
+IMPORT_BUDGET_MS = 150
+
+
+def reset_cookies():
+    from fix_cookies import fix_cookies
+    from cookie_vault import DEFAULT_ACCOUNT
+
+    parser = argparse.ArgumentParser(prog="cli.py reset-cookies", description="Empty an account's saved cookies")
+    parser.add_argument("account", nargs="?", default=DEFAULT_ACCOUNT)
+    args = parser.parse_args()
+    fix_cookies(args.account)
+
+
+def caption_only():
+    parser = argparse.ArgumentParser(prog="cli.py caption-only", description="Generate captions, no browser")
+    parser.add_argument("descriptions", nargs="+", help="One video description per caption")
+    parser.add_argument("--local", action="store_true", help="Offline caption engine only (no Gemini)")
+    args = parser.parse_args()
+
+    if args.local:
+        from caption_engine import generate_caption
+        captions = [generate_caption(description) for description in args.descriptions]
+    else:
+        from tiktok_uploader import TikTokUploader
+        captions = TikTokUploader().generate_ai_captions(args.descriptions)
+    print("-" * 50)
+    for description, caption in zip(args.descriptions, captions):
+        print(f"📝 {description}\n✍️ {caption}\n")
+
+
+def measure_import(module):
+    """Cumulative import time (ms, from -X importtime) of a module in a fresh interpreter
+    + heavy backends it left in sys.modules"""
+    code = (
+        "import sys\n"
+        f"import {module}\n"
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.strip().splitlines() if not line.startswith("import time:")]
+        raise Exception(lines[-1] if lines else f"exit code {proc.returncode}")
+    elapsed = 0.0
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[2].strip() == module:
+            elapsed = int(parts[1]) / 1000
+    heavy = (proc.stdout.splitlines() + [""])[0]
+    return elapsed, [name for name in heavy.split(",") if name]
+
+
+def import_check():
+    parser = argparse.ArgumentParser(prog="cli.py import-check",
+                                     description="Fail if entry modules import slowly or load Selenium / Gemini")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="Fail above this cumulative import time")
+    parser.add_argument("modules", nargs="*", default=list(LIGHT_MODULES))
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<20}{'import':>10}  status")
+    print("-" * 50)
+    for module in args.modules:
+        try:
+            elapsed, heavy = measure_import(module)
+        except Exception as e:
+            print(f"{module:<20}{'-':>10}  ❌ {e}")
+            failed = True
+            continue
+        if heavy:
+            status = f"❌ loads {', '.join(heavy)}"
+        elif elapsed > args.budget_ms:
+            status = f"❌ over {args.budget_ms:.0f}ms budget"
+        else:
+            status = "✅"
+        failed = failed or status != "✅"
+        print(f"{module:<20}{elapsed:>8.1f}ms  {status}")
+    sys.exit(1 if failed else 0)
+
+
+# subcommand -> (module, function, help); a module is only imported when its command runs
+COMMANDS = {
+    'upload': ("tiktok_uploader", "main", "Interactive single upload"),
+    'batch': ("batch", "main", "Non-interactive upload from a CSV/JSONL manifest"),
+    'schedule': ("scheduler", "main", "Rate-limited, time-slotted multi-account upload"),
+    'pool': ("worker_pool", "main", "Parallel multi-account upload of video files"),
+    'queue': ("job_queue", "main", "Shared multi-host job queue (enqueue / work / status)"),
+    'watch': ("folder_watcher", "main", "Upload videos as they land in a drop folder"),
+    'reset-cookies': (None, "reset_cookies", "Empty an account's saved cookies"),
+    'caption-only': (None, "caption_only", "Generate captions without opening a browser"),
+    'bench': ("bench", "main", "Offline end-to-end benchmark"),
+    'import-check': (None, "import_check", "Import time budget and heavy-backend check"),
+}
+
+
+def print_usage():
+    print("🎯 TikTok Bot CLI\n\nUsage: python cli.py <command> [options]\n\nCommands:")
+    for name, (_, _, help_text) in COMMANDS.items():
+        print(f"  {name:<15} {help_text}")
+    print("\nRun 'python cli.py <command> --help' for command options.")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return
+    if argv[0] not in COMMANDS:
+        print(f"❌ Unknown command: {argv[0]}\n")
+        print_usage()
+        sys.exit(2)
+
+    command = argv[0]
+    module_name, func_name, _ = COMMANDS[command]
+    # Every subcommand parses sys.argv itself, as if it were run directly
+    sys.argv = [f"cli.py {command}"] + argv[1:]
+    func = getattr(importlib.import_module(module_name), func_name) if module_name else globals()[func_name]
+    func()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+🔐 Cookie Vault - Cookies per akun, aman untuk banyak worker sekaligus
+- config/accounts/<akun>/cookies.json (akun 'default' = config/cookies.json)
+- Tulis pakai file lock + write-temp-lalu-rename, jadi file tidak pernah rusak
+- Inject semua cookies akun dalam satu panggilan CDP Network.setCookies
+  sebelum navigasi pertama (tidak perlu load homepage + refresh)
+"""
+
+import os
+import json
+import tempfile
+
+ACCOUNTS_DIR = "config/accounts"
+DEFAULT_ACCOUNT = "default"
+LEGACY_COOKIES_FILE = "config/cookies.json"
+
+DEFAULT_DOMAIN = ".tiktok.com"
+
+
+class FileLock:
+    """Exclusive lock on <path>.lock (fcntl on Linux/Mac, msvcrt on Windows)"""
+
+    def __init__(self, path):
+        self.lock_path = f"{path}.lock"
+        self.handle = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        self.handle = open(self.lock_path, 'a+')
+        if os.name == 'nt':
+            import msvcrt
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.handle.close()
+        return False
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file in the same directory, fsync, then rename over the target"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".cookies-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def valid_cookies(cookies):
+    """Drop entries without a name or value"""
+    return [c for c in cookies if isinstance(c, dict) and c.get('name') and c.get('value')]
+
+
+def load_file(path):
+    """Cookies from a file; [] if missing or unreadable (renames are atomic, so no lock needed)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cookies = json.load(f)
+        return cookies if isinstance(cookies, list) else []
+    except (OSError, ValueError):
+        return []
+
+
+def save_file(path, cookies):
+    """Locked atomic save; returns the number of cookies written"""
+    cookies = valid_cookies(cookies)
+    with FileLock(path):
+        atomic_write_json(path, cookies)
+    return len(cookies)
+
+
+def to_cdp_cookie(cookie):
+    """Selenium/exported cookie dict -> Network.CookieParam"""
+    param = {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie.get('domain') or DEFAULT_DOMAIN,
+        'path': cookie.get('path') or "/",
+    }
+    if 'secure' in cookie:
+        param['secure'] = bool(cookie['secure'])
+    if 'httpOnly' in cookie:
+        param['httpOnly'] = bool(cookie['httpOnly'])
+    if cookie.get('sameSite') in ("Strict", "Lax", "None"):
+        param['sameSite'] = cookie['sameSite']
+    expiry = cookie.get('expiry', cookie.get('expires'))
+    if isinstance(expiry, (int, float)) and expiry > 0:
+        param['expires'] = expiry
+    return param
+
+
+def inject_cookies(driver, cookies):
+    """Set every cookie in one CDP round trip; works before any page is loaded"""
+    params = [to_cdp_cookie(c) for c in valid_cookies(cookies)]
+    if params:
+        driver.execute_cdp_cmd("Network.setCookies", {'cookies': params})
+    return len(params)
+
+
+class CookieVault:
+    """Account-indexed cookie storage"""
+
+    def __init__(self, root=ACCOUNTS_DIR):
+        self.root = root
+
+    def path(self, account):
+        """Cookie file of an account (default account keeps config/cookies.json)"""
+        if not account or account == DEFAULT_ACCOUNT:
+            return LEGACY_COOKIES_FILE
+        return os.path.join(self.root, account, "cookies.json")
+
+    def accounts(self):
+        """Known accounts (default first)"""
+        names = [DEFAULT_ACCOUNT] if os.path.exists(LEGACY_COOKIES_FILE) else []
+        if os.path.isdir(self.root):
+            names += sorted(name for name in os.listdir(self.root)
+                            if os.path.exists(os.path.join(self.root, name, "cookies.json")))
+        return names
+
+    def load(self, account):
+        return load_file(self.path(account))
+
+    def save(self, account, cookies):
+        return save_file(self.path(account), cookies)
+
+    def reset(self, account):
+        return save_file(self.path(account), [])
+
+    def inject(self, driver, account):
+        return inject_cookies(driver, self.load(account))
+
+
+def cookies_path(account):
+    """Cookie file of an account in the default vault"""
+    return CookieVault().path(account)
@@ -1,24 +1,25 @@
 #!/usr/bin/env python3
 """
 🔧 Cookie Fixer - Reset TikTok cookies jika bermasalah
+
+Usage:
+    python fix_cookies.py            # akun default (config/cookies.json)
+    python fix_cookies.py second     # config/accounts/second/cookies.json
 """
 
-import os
-import json
+import sys
+from cookie_vault import CookieVault, DEFAULT_ACCOUNT
 
-def fix_cookies():
+def fix_cookies(account=DEFAULT_ACCOUNT):
     """Reset cookies file"""
-    cookies_file = "config/cookies.json"
-    
-    # Ensure config directory exists
-    os.makedirs("config", exist_ok=True)
+    vault = CookieVault()
+    cookies_file = vault.path(account)
     
-    # Reset cookies to empty array
-    with open(cookies_file, 'w', encoding='utf-8') as f:
-        json.dump([], f, indent=2)
+    # Reset cookies to empty array (locked + atomic, safe while workers run)
+    vault.reset(account)
     
     print(f"🔄 Reset {cookies_file} to empty")
     print("✅ Cookies fixed! Run tiktok_uploader.py again")
 
 if __name__ == "__main__":
-    fix_cookies()
\ No newline at end of file
+    fix_cookies(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ACCOUNT)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+👀 Folder Watcher - Upload otomatis video yang masuk ke drop folder
+- inotify (Linux, lewat ctypes) dengan fallback polling (NFS/SMB, macOS, Windows)
+- File baru baru diproses setelah ukuran & mtime berhenti berubah (selesai ditulis)
+- Hanya ekstensi yang diterima main(): .mp4 .mov .avi .mkv .webm
+- Backlog besar diproses bertahap dari cursor yang disimpan (config/watch_state.json),
+  jadi restart tidak mengulang semua file lama
+- Video siap dikirim ke worker pool lokal, atau ke queue multi-host (--queue)
+
+Usage:
+    python folder_watcher.py /data/drop --account main
+    python folder_watcher.py /data/drop --queue /mnt/shared/queue.db --caption-mode local
+    python folder_watcher.py /mnt/nfs/drop --poll              # tanpa inotify
+    python folder_watcher.py /data/drop --once                 # proses backlog lalu keluar
+"""
+
+import os
+import json
+import time
+import queue
+import select
+import struct
+import argparse
+
+from cookie_vault import DEFAULT_ACCOUNT, atomic_write_json
+from video_inspector import VALID_EXTENSIONS, inspect_video, format_report
+
+STATE_FILE = "config/watch_state.json"
+SETTLE_SECONDS = 3
+POLL_SECONDS = 2
+SCAN_BATCH = 500
+
+# inotify(7)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal inotify binding for one directory; raises OSError where it isn't available"""
+
+    def __init__(self, directory):
+        import ctypes
+        import ctypes.util
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except (OSError, AttributeError):
+            raise OSError("inotify not available on this platform")
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout):
+        """(names, overflowed) of events within timeout seconds (None = block)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set(), False
+        names, overflowed, offset = set(), False, 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF):
+                overflowed = True
+            elif name:
+                names.add(os.fsdecode(name))
+        return names, overflowed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def is_video_name(name):
+    return not name.startswith(".") and os.path.splitext(name)[1].lower() in VALID_EXTENSIONS
+
+
+class FolderWatcher:
+    """Yields video files in a directory once they have finished being written"""
+
+    def __init__(self, directory, settle_seconds=SETTLE_SECONDS, poll_seconds=POLL_SECONDS, scan_batch=SCAN_BATCH,
+                 state_file=STATE_FILE, use_inotify=True):
+        self.directory = os.path.abspath(directory)
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.scan_batch = scan_batch
+        self.state_file = state_file
+        # Every file whose (ctime_ns, name) is <= cursor has been handled already.
+        # ctime, unlike mtime, can't be preserved by cp -p / rsync, so new arrivals sort last.
+        self.cursor = self._load_cursor()
+        self.pending = {}      # name -> (size, mtime_ns, ctime_ns, unchanged since)
+        self.handled = {}      # name -> key, for files handled while the cursor couldn't pass them yet
+        self.inflight = {}     # name -> key, returned by poll() but not complete()d yet
+        self.seen = {}         # name -> (inode, key) of every video listed so far, so rescans only stat newcomers
+        self.backlog = []
+        self.dir_mtime = None
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = Inotify(self.directory)
+            except OSError as e:
+                print(f"⚠️ inotify unavailable ({e}), polling every {poll_seconds}s")
+        self._scan()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load_cursor(self):
+        cursor = self._load_state().get(self.directory, {}).get('cursor')
+        return tuple(cursor) if cursor else (0, "")
+
+    def _save_cursor(self):
+        state = self._load_state()
+        state[self.directory] = {'cursor': list(self.cursor), 'updated_at': time.time()}
+        atomic_write_json(self.state_file, state)
+
+    def _scan(self):
+        """List every video past the cursor, oldest first (poll() works through it scan_batch at a time).
+        The directory is still read in full, but only names not seen before (or replaced under
+        the same name, i.e. a new inode) are stat()ed again."""
+        try:
+            self.dir_mtime = os.stat(self.directory).st_mtime_ns
+            seen = {}
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if not is_video_name(entry.name):
+                        continue
+                    known = self.seen.get(entry.name)
+                    if known and known[0] == entry.inode():
+                        seen[entry.name] = known
+                        continue
+                    try:
+                        seen[entry.name] = (entry.inode(), (entry.stat().st_ctime_ns, entry.name))
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"❌ Cannot scan {self.directory}: {e}")
+            return
+        self.seen = seen
+        skip = set(self.pending) | set(self.handled) | set(self.inflight)
+        entries = sorted(key for name, (_, key) in seen.items() if key > self.cursor and name not in skip)
+        self.backlog = entries
+        if len(entries) > self.scan_batch:
+            print(f"📚 Backlog: {len(entries)} video(s) in {self.directory}")
+
+    def _observe(self, name, now):
+        """Cursor key once size and mtime have held still for settle_seconds, else None"""
+        try:
+            stat = os.stat(os.path.join(self.directory, name))
+        except OSError:
+            self.pending.pop(name, None)
+            return None
+        key = (stat.st_ctime_ns, name)
+        previous = self.pending.get(name)
+        if previous is None:
+            if stat.st_size and now - stat.st_mtime_ns / 1e9 >= self.settle_seconds:
+                # Untouched for a while before we ever saw it (backlog, or moved in whole)
+                return key
+        elif previous[:2] == (stat.st_size, stat.st_mtime_ns):
+            if stat.st_size and now - previous[3] >= self.settle_seconds:
+                del self.pending[name]
+                return key
+            return None
+        self.pending[name] = (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, now)
+        return None
+
+    def _unchanged(self, name):
+        """Already handled and not rewritten since"""
+        try:
+            return os.stat(os.path.join(self.directory, name)).st_ctime_ns == self.handled[name][0]
+        except OSError:
+            return True
+
+    def _advance(self, key):
+        """Record a handled file and move the cursor over every handled file older than
+        anything still outstanding (settling, in flight or in the backlog)"""
+        self.handled[key[1]] = key
+        outstanding = [(entry[2], name) for name, entry in self.pending.items()]
+        outstanding += list(self.inflight.values()) + self.backlog[:1]
+        limit = min(outstanding) if outstanding else None
+        passable = [handled for handled in self.handled.values()
+                    if handled > self.cursor and (limit is None or handled < limit)]
+        if not passable:
+            return False
+        self.cursor = max(passable)
+        self.handled = {name: handled for name, handled in self.handled.items() if handled > self.cursor}
+        return True
+
+    def complete(self, path):
+        """Mark a path returned by poll() as done (uploaded, queued or rejected); only then
+        may the saved cursor pass it, so a crash mid-upload picks it up again on restart"""
+        key = self.inflight.pop(os.path.basename(path), None)
+        if key and self._advance(key):
+            self._save_cursor()
+
+    def _wait(self, timeout):
+        """Block for filesystem activity; names worth a look"""
+        if self.inotify:
+            names, overflowed = self.inotify.read(timeout)
+            if overflowed:
+                print("⚠️ inotify queue overflow, rescanning")
+                self._scan()
+            return {name for name in names if is_video_name(name)}
+        time.sleep(self.poll_seconds if timeout is None else min(timeout, self.poll_seconds))
+        try:
+            # New or renamed entries change the directory mtime; in-progress writes are tracked in pending
+            if os.stat(self.directory).st_mtime_ns != self.dir_mtime:
+                self._scan()
+        except OSError:
+            pass
+        return set()
+
+    def poll(self, timeout=None):
+        """Paths that became ready; waits up to timeout (None = until something happens)"""
+        ready = []
+        # Backlog a batch at a time, so files landing now aren't stuck behind it
+        batch, self.backlog = self.backlog[:self.scan_batch], self.backlog[self.scan_batch:]
+        now = time.time()
+        for _, name in batch:
+            key = self._observe(name, now)
+            if key:
+                ready.append(key)
+
+        touched = set()
+        if not self.backlog and not ready:
+            # Settling files are re-checked every second; otherwise sleep until the kernel wakes us
+            wait = timeout if not self.pending else 1.0 if timeout is None else min(timeout, 1.0)
+            touched = self._wait(wait)
+
+        now = time.time()
+        for name in touched | set(self.pending):
+            if name in self.inflight:
+                continue
+            if name in self.handled and name not in self.pending and self._unchanged(name):
+                continue
+            key = self._observe(name, now)
+            if key and key > self.cursor:
+                ready.append(key)
+
+        ready.sort()
+        self.inflight.update((key[1], key) for key in ready)
+        return [os.path.join(self.directory, name) for _, name in ready]
+
+    def idle(self):
+        """Nothing left from the backlog, nothing still being written and nothing in flight"""
+        return not self.backlog and not self.pending and not self.inflight
+
+    def close(self):
+        if self.inotify:
+            self.inotify.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload videos as they land in a drop folder")
+    parser.add_argument("directory")
+    parser.add_argument("--account", default=DEFAULT_ACCOUNT)
+    parser.add_argument("--caption-mode", default="ai", choices=("ai", "local", "none"))
+    parser.add_argument("--queue", metavar="DB", help="Enqueue to a shared job_queue database instead of uploading here")
+    parser.add_argument("--concurrency", type=int, default=1, help="Workers per account (local pool)")
+    parser.add_argument("--lean", action="store_true", help="Headless lean browsers (local pool)")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                        help="Seconds a file's size/mtime must hold still before it is picked up")
+    parser.add_argument("--poll", action="store_true", help="Poll instead of inotify (network filesystems)")
+    parser.add_argument("--once", action="store_true", help="Handle the backlog, then exit")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Not a directory: {args.directory}")
+        return
+
+    watcher = FolderWatcher(args.directory, settle_seconds=args.settle, use_inotify=not args.poll)
+    if args.queue:
+        from job_queue import JobQueue
+        jobs, pool = JobQueue(args.queue), None
+    else:
+        from worker_pool import UploadWorkerPool
+        jobs, pool = None, UploadWorkerPool(args.concurrency, lean=args.lean)
+
+    print(f"👀 Watching {watcher.directory} ({'inotify' if watcher.inotify else 'polling'}) "
+          f"→ {'queue ' + args.queue if jobs else 'local pool'} [{args.account}]")
+    print("-" * 50)
+    try:
+        while True:
+            busy = pool is not None and pool.collected < pool.submitted
+            if args.once and watcher.idle() and not busy:
+                break
+            # Short waits only while uploads or settling files need attention
+            for path in watcher.poll(timeout=1.0 if busy or args.once else None):
+                report = inspect_video(path)
+                print(format_report(report))
+                if not report['ok']:
+                    watcher.complete(path)
+                    continue
+                if jobs:
+                    job_id = jobs.enqueue(path, args.account, args.caption_mode)
+                    print(f"📥 Queued #{job_id}" if job_id else "⏭️ Already in the queue")
+                    # The shared queue owns it from here
+                    watcher.complete(path)
+                else:
+                    pool.submit({'video_path': path, 'account': args.account, 'caption_mode': args.caption_mode})
+
+            while pool is not None and pool.collected < pool.submitted:
+                try:
+                    result = pool.get_result(timeout=0)
+                except queue.Empty:
+                    break
+                name = os.path.basename(result['video_path'])
+                status = "⏭️ already posted" if result['skipped'] else "✅ posted" if result['success'] \
+                    else f"🔁 retry: {result['error']}" if result['retry'] else f"❌ {result['error']}"
+                print(f"{status} {name} [{result['worker']}] {result['duration']:.1f}s")
+                watcher.complete(result['video_path'])
+    except KeyboardInterrupt:
+        print("\n👋 Stopping watcher")
+    finally:
+        watcher.close()
+        if pool:
+            pool.close()
+        if jobs:
+            jobs.close()
+
+
+if __name__ == "__main__":
+    main()
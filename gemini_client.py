@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+🤖 Gemini Client - Panggilan Gemini yang tidak bisa bikin upload macet
+- Deadline per request (request tidak ditunggu lebih lama dari timeout)
+- Retry terbatas dengan backoff + jitter
+- Batas request paralel (antar thread, dan antar proses worker lewat slot lock file)
+- Circuit breaker: kalau API sedang error, langsung pakai caption lokal
+- Caption kepanjangan dipotong rapi (batas grapheme/emoji & hashtag), tidak dibuang
+
+Usage:
+    python gemini_client.py "kucing lucu main bola"
+    python gemini_client.py "kucing lucu main bola" --fake   # tanpa API (FakeGeminiModel)
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import unicodedata
+
+import metrics
+
+MODEL_NAME = "gemini-1.5-flash"
+MAX_CAPTION_CHARS = 150
+MIN_HASHTAGS = 5
+MAX_HASHTAGS = 8
+SLOTS_DIR = "config/gemini_slots"
+
+# Errors that won't get better by asking again
+NON_RETRYABLE = ("PermissionDenied", "Unauthenticated", "InvalidArgument", "NotFound")
+
+
+class GeminiUnavailable(Exception):
+    """No usable answer: no API key, circuit open, or every attempt failed"""
+
+
+def _extends_cluster(char, previous):
+    """True if char belongs to the grapheme cluster ending in previous"""
+    code = ord(char)
+    if previous == "\u200d":                  # ZWJ joins the next emoji
+        return True
+    return (
+        char == "\u200d"
+        or unicodedata.combining(char) != 0
+        or unicodedata.category(char) in ("Me", "Mn", "Mc")
+        or 0xFE00 <= code <= 0xFE0F                # variation selectors
+        or 0x1F3FB <= code <= 0x1F3FF              # skin tone modifiers
+        or 0xE0020 <= code <= 0xE007F              # tag sequences (subdivision flags)
+        or code == 0x20E3                          # keycap
+    )
+
+
+def graphemes(text):
+    """Split text into user-perceived characters (emoji sequences, flags, combining marks)"""
+    clusters = []
+    for char in text:
+        if clusters and _extends_cluster(char, clusters[-1][-1]):
+            clusters[-1] += char
+        elif clusters and 0x1F1E6 <= ord(char) <= 0x1F1FF and len(clusters[-1]) == 1 \
+                and 0x1F1E6 <= ord(clusters[-1]) <= 0x1F1FF:
+            clusters[-1] += char                   # second half of a flag
+        else:
+            clusters.append(char)
+    return clusters
+
+
+def _cut(text, limit):
+    """Longest prefix of whole graphemes that fits in limit characters"""
+    kept, length = [], 0
+    for cluster in graphemes(text):
+        if length + len(cluster) > limit:
+            break
+        kept.append(cluster)
+        length += len(cluster)
+    return "".join(kept)
+
+
+def trim_caption(text, max_chars=MAX_CAPTION_CHARS, min_hashtags=MIN_HASHTAGS, max_hashtags=MAX_HASHTAGS):
+    """Fit a caption into max_chars: drop extra hashtags, then shorten the text on
+    word/grapheme boundaries. Hashtags are kept whole and moved to the end.
+    Captions that already fit are returned as they are."""
+    if len(text.strip()) <= max_chars:
+        return text.strip()
+    text = " ".join(text.strip().strip('"').split())
+    words = text.split(" ")
+    tags = [w for w in words if w.startswith("#") and len(w) > 1][:max_hashtags]
+    body = [w for w in words if not (w.startswith("#") and len(w) > 1)]
+
+    def joined():
+        return " ".join(body + tags)
+
+    if len(joined()) <= max_chars and len(words) == len(body) + len(tags):
+        return joined()
+
+    while len(joined()) > max_chars and len(tags) > min_hashtags:
+        tags.pop()
+
+    if len(joined()) > max_chars:
+        room = max_chars - len(" ".join(tags)) - (1 if tags else 0)
+        text_part = " ".join(body)
+        if room <= 1:
+            body = []
+        elif len(text_part) > room:
+            shortened = _cut(text_part, room - 1)
+            # Prefer ending on a whole word
+            if " " in shortened:
+                shortened = shortened[:shortened.rindex(" ")]
+            body = [shortened.rstrip(" ,.;:-") + "…"] if shortened.strip() else []
+
+    # Hashtags alone too long: keep as many whole ones as fit
+    while len(joined()) > max_chars and tags:
+        tags.pop()
+    # Not even one whole word fits: hard cut rather than an empty caption
+    return joined() or _cut(text, max_chars)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Local stand-in for GenerativeModel: canned answers, latency, failures, hangs"""
+
+    def __init__(self, responses=None, latency=0.0, fail_times=0, hang=False):
+        self.responses = list(responses or [
+            "😂 This cat has more skill than me! Who else is impressed? #cat #funny #pets #fyp #viral #catsoftiktok",
+        ])
+        self.latency = latency
+        self.fail_times = fail_times
+        self.hang = hang
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.hang:
+            time.sleep(3600)
+        time.sleep(self.latency)
+        if self.calls <= self.fail_times:
+            raise Exception("429 Resource has been exhausted (fake)")
+        return FakeResponse(self.responses[(self.calls - 1) % len(self.responses)])
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; one trial call after `cooldown`"""
+
+    def __init__(self, threshold=5, cooldown=120):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.time() - self.opened_at >= self.cooldown:
+                # Half-open: let one caller try; it re-opens or closes the breaker
+                self.opened_at = time.time()
+                return True
+            return False
+
+    def is_open(self):
+        return self.opened_at is not None and time.time() - self.opened_at < self.cooldown
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    print(f"⚡ Gemini circuit open for {self.cooldown}s after {self.failures} failures")
+                self.opened_at = time.time()
+
+
+class _SlotLock:
+    """Cross-process concurrency limit: hold one of N lock files (no-op without fcntl)"""
+
+    def __init__(self, slots, slots_dir=SLOTS_DIR):
+        self.slots = slots
+        self.slots_dir = slots_dir
+        self.handle = None
+
+    def acquire(self, timeout):
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        os.makedirs(self.slots_dir, exist_ok=True)
+        give_up = time.time() + timeout
+        while True:
+            for slot in range(self.slots):
+                handle = open(os.path.join(self.slots_dir, f"slot-{slot}.lock"), 'a+')
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    self.handle = handle
+                    return True
+                except OSError:
+                    handle.close()
+            if time.time() >= give_up:
+                return False
+            time.sleep(0.05)
+
+    def release(self):
+        if self.handle:
+            self.handle.close()  # closing drops the flock
+            self.handle = None
+
+
+class GeminiCaptionClient:
+    """generate_content with deadlines, retries, a concurrency limit and a circuit breaker"""
+
+    # Shared by every client in the process (pipeline prefetch threads, batch calls)
+    _breaker = CircuitBreaker()
+    _semaphores = {}           # max_concurrency -> BoundedSemaphore, so each limit is honoured
+    _semaphore_lock = threading.Lock()
+
+    def __init__(self, api_key=None, model=None, model_name=MODEL_NAME, timeout=20, retries=2, backoff=1.0,
+                 max_concurrency=4, process_slots=None):
+        self.api_key = api_key
+        self._model = model
+        self._model_lock = threading.Lock()
+        self.model_name = model_name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        # Total parallel calls across worker processes (env overrides for big pools)
+        self.process_slots = process_slots or int(os.getenv("GEMINI_MAX_CONCURRENCY", max_concurrency))
+        with GeminiCaptionClient._semaphore_lock:
+            semaphores = GeminiCaptionClient._semaphores
+            if max_concurrency not in semaphores:
+                semaphores[max_concurrency] = threading.BoundedSemaphore(max_concurrency)
+            self._semaphore = semaphores[max_concurrency]
+
+    @property
+    def model(self):
+        """GenerativeModel, configured on first use (None without an API key)"""
+        if self._model is None and self.api_key:
+            # Prefetch threads may ask at the same time; configure the SDK once
+            with self._model_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    @property
+    def breaker(self):
+        return GeminiCaptionClient._breaker
+
+    def available(self):
+        """Worth calling at all? (key/model present and circuit not open)"""
+        return (self._model is not None or bool(self.api_key)) and not self.breaker.is_open()
+
+    def _call(self, prompt, timeout, release):
+        """One generate_content call that returns within `timeout` (hung threads are abandoned).
+        release() runs once the call really ends, so an abandoned thread keeps its slot."""
+        outcome = {}
+
+        def target():
+            try:
+                try:
+                    response = self.model.generate_content(prompt, request_options={"timeout": timeout})
+                except TypeError:
+                    # Older SDKs don't take request_options
+                    response = self.model.generate_content(prompt)
+                outcome['text'] = response.text
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                release()
+
+        thread = threading.Thread(target=target, daemon=True)
+        try:
+            thread.start()
+        except BaseException:
+            release()
+            raise
+        thread.join(timeout)
+        if thread.is_alive():
+            raise TimeoutError(f"Gemini did not answer within {timeout:g}s")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['text']
+
+    def generate(self, prompt):
+        """Answer text, or raise GeminiUnavailable"""
+        if not self.available():
+            raise GeminiUnavailable("circuit open" if self.breaker.is_open() else "no API key")
+
+        give_up = time.time() + self.timeout * (self.retries + 1)
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise GeminiUnavailable("circuit open")
+
+            slot = _SlotLock(self.process_slots)
+            wait = max(0.0, give_up - time.time())
+            if not self._semaphore.acquire(timeout=wait):
+                raise GeminiUnavailable("no free Gemini slot")
+
+            def release(slot=slot):
+                slot.release()
+                self._semaphore.release()
+
+            try:
+                if not slot.acquire(max(0.0, give_up - time.time())):
+                    raise GeminiUnavailable("no free Gemini slot")
+            except BaseException:
+                release()
+                raise
+            with metrics.span("gemini.request", attempt=attempt) as span:
+                try:
+                    text = self._call(prompt, self.timeout, release)
+                    self.breaker.success()
+                    return text
+                except Exception as e:
+                    span.set(ok=False, error=str(e)[:200])
+                    last_error = e
+                    self.breaker.failure()
+
+            if any(name in type(last_error).__name__ for name in NON_RETRYABLE):
+                break
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+            if attempt == self.retries or time.time() + delay >= give_up:
+                break
+            print(f"🔁 Gemini attempt {attempt + 1} failed ({last_error}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+        raise GeminiUnavailable(str(last_error))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate one caption through the resilient Gemini client")
+    parser.add_argument("description")
+    parser.add_argument("--fake", action="store_true", help="Use FakeGeminiModel instead of the API")
+    parser.add_argument("--timeout", type=float, default=20)
+    args = parser.parse_args()
+
+    from tiktok_uploader import CAPTION_REQUIREMENTS
+
+    model = FakeGeminiModel(latency=0.2) if args.fake else None
+    client = GeminiCaptionClient(os.getenv('GEMINI_API_KEY'), model=model, timeout=args.timeout)
+    prompt = f'Create a catchy TikTok caption for a video about: "{args.description}".\n\n{CAPTION_REQUIREMENTS}'
+    try:
+        print(trim_caption(client.generate(prompt)))
+    except GeminiUnavailable as e:
+        print(f"❌ Gemini unavailable: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
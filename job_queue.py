@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+🌐 Job Queue - Satu backlog upload dibagi ke beberapa host
+- Queue = file SQLite di shared storage (NFS/SMB), tanpa service tambahan
+- Job di-lease ke satu worker; lease diperpanjang lewat heartbeat
+- Host mati → lease habis → job kembali ke queue untuk host lain
+- Akun di-pin ke satu host (satu sesi TikTok per akun), pin lepas kalau host mati
+- Setiap host menjalankan worker pool biasa (TikTokUploader per akun)
+
+Usage:
+    python job_queue.py enqueue manifest.csv --db /mnt/shared/tiktok_queue.db
+    python job_queue.py work --db /mnt/shared/tiktok_queue.db --max-workers 4   # di setiap host
+    python job_queue.py status --db /mnt/shared/tiktok_queue.db
+    python job_queue.py requeue --state retry --db /mnt/shared/tiktok_queue.db
+"""
+
+import os
+import time
+import queue
+import socket
+import sqlite3
+import argparse
+
+from cookie_vault import DEFAULT_ACCOUNT
+from upload_ledger import QUEUED, POSTED, FAILED, RETRY
+
+QUEUE_FILE = "config/job_queue.db"
+LEASED = "leased"
+
+LEASE_SECONDS = 600       # an upload never goes this long without a heartbeat
+PIN_SECONDS = 900         # an idle host keeps its accounts this long before others may take them
+HEARTBEAT_SECONDS = 30
+POLL_SECONDS = 2
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    id INTEGER PRIMARY KEY,
+    video_path TEXT NOT NULL,
+    account TEXT NOT NULL,
+    caption_mode TEXT NOT NULL DEFAULT 'ai',
+    caption TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (account, video_path)
+);
+CREATE INDEX IF NOT EXISTS queue_state ON queue (state, account, id);
+CREATE TABLE IF NOT EXISTS pins (
+    account TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    lease_until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    worker TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    in_flight INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def worker_id(host=None):
+    """host:pid, unique per running node"""
+    return f"{host or socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """Lease-based shared queue; every method is one short write transaction"""
+
+    def __init__(self, db_path=QUEUE_FILE, lease_seconds=LEASE_SECONDS, pin_seconds=PIN_SECONDS,
+                 max_attempts=MAX_ATTEMPTS):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.pin_seconds = pin_seconds
+        self.max_attempts = max_attempts
+        # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        # WAL needs shared memory, which network filesystems don't provide: stay on the rollback journal
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.executescript(SCHEMA)
+
+    def _write(self):
+        """Context manager for one exclusive-writer transaction"""
+        return _Transaction(self.conn)
+
+    def enqueue(self, video_path, account=DEFAULT_ACCOUNT, caption_mode="ai", caption="", description=""):
+        """Add a job; returns its id, or None if this video is already queued for the account"""
+        now = time.time()
+        with self._write():
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO queue (video_path, account, caption_mode, caption, description, state, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(video_path), account, caption_mode, caption or "", description or "", QUEUED,
+                 now, now),
+            )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def _expire(self, now):
+        """Give leases and pins of dead hosts back to everyone"""
+        expired = self.conn.execute(
+            "UPDATE queue SET state = ?, worker = NULL, lease_until = NULL, error = 'lease expired', "
+            "updated_at = ? WHERE state = ? AND lease_until < ?",
+            (QUEUED, now, LEASED, now),
+        ).rowcount
+        if expired:
+            print(f"⏰ Requeued {expired} job(s) whose worker stopped heartbeating")
+        self.conn.execute("DELETE FROM pins WHERE lease_until < ?", (now,))
+
+    def claim(self, worker, host, skip_accounts=()):
+        """Lease the oldest job whose account is free or already pinned to this host"""
+        now = time.time()
+        with self._write():
+            self._expire(now)
+            skip = tuple(skip_accounts)
+            row = self.conn.execute(
+                "SELECT q.* FROM queue q LEFT JOIN pins p ON p.account = q.account "
+                "WHERE q.state = ? AND (p.host IS NULL OR p.host = ?) "
+                f"AND q.account NOT IN ({','.join('?' * len(skip))}) "
+                "ORDER BY q.id LIMIT 1",
+                (QUEUED, host) + skip,
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE queue SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (LEASED, worker, now + self.lease_seconds, now, row['id']),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pins (account, host, lease_until) VALUES (?, ?, ?)",
+                (row['account'], host, now + self.pin_seconds),
+            )
+        return dict(row, state=LEASED, worker=worker, attempts=row['attempts'] + 1)
+
+    def heartbeat(self, worker, host, job_ids, accounts=(), done=0):
+        """Extend this worker's leases and the pins of accounts it is busy with;
+        returns the ids it no longer owns"""
+        now = time.time()
+        job_ids = list(job_ids)
+        accounts = list(accounts)
+        with self._write():
+            owned = set()
+            if job_ids:
+                marks = ','.join('?' * len(job_ids))
+                self.conn.execute(
+                    f"UPDATE queue SET lease_until = ? WHERE worker = ? AND state = ? AND id IN ({marks})",
+                    [now + self.lease_seconds, worker, LEASED] + job_ids,
+                )
+                owned = {row['id'] for row in self.conn.execute(
+                    f"SELECT id FROM queue WHERE worker = ? AND state = ? AND id IN ({marks})",
+                    [worker, LEASED] + job_ids,
+                )}
+            # Idle accounts keep their pin until it runs out, then any host may take them
+            self.conn.execute(
+                f"UPDATE pins SET lease_until = ? WHERE host = ? AND account IN ({','.join('?' * len(accounts))})",
+                [now + self.pin_seconds, host] + accounts,
+            )
+            self.conn.execute(
+                "INSERT INTO nodes (worker, host, started_at, last_seen, in_flight, done) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (worker) DO UPDATE SET last_seen = excluded.last_seen, "
+                "in_flight = excluded.in_flight, done = excluded.done",
+                (worker, host, now, now, len(job_ids), done),
+            )
+        return [job_id for job_id in job_ids if job_id not in owned]
+
+    def complete(self, job_id, worker, state, error=None):
+        """Finish a leased job (POSTED, RETRY or FAILED); failures are requeued until max_attempts.
+        Returns False if the lease was lost to another worker in the meantime"""
+        now = time.time()
+        with self._write():
+            row = self.conn.execute(
+                "SELECT attempts FROM queue WHERE id = ? AND worker = ? AND state = ?", (job_id, worker, LEASED)
+            ).fetchone()
+            if row is None:
+                return False
+            if state == FAILED and row['attempts'] < self.max_attempts:
+                state = QUEUED
+            self.conn.execute(
+                "UPDATE queue SET state = ?, worker = NULL, lease_until = NULL, error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (state, error, now, job_id),
+            )
+        return True
+
+    def release_host(self, host, worker):
+        """Clean shutdown: unpin accounts and hand back anything still leased"""
+        now = time.time()
+        with self._write():
+            self.conn.execute(
+                "UPDATE queue SET state = ?, worker = NULL, lease_until = NULL, attempts = attempts - 1, "
+                "updated_at = ? WHERE worker = ? AND state = ?",
+                (QUEUED, now, worker, LEASED),
+            )
+            self.conn.execute("DELETE FROM pins WHERE host = ?", (host,))
+            self.conn.execute("DELETE FROM nodes WHERE worker = ?", (worker,))
+
+    def requeue(self, state):
+        """Put every job in `state` back in the queue (e.g. retry after fixing cookies)"""
+        with self._write():
+            return self.conn.execute(
+                "UPDATE queue SET state = ?, attempts = 0, error = NULL, updated_at = ? WHERE state = ?",
+                (QUEUED, time.time(), state),
+            ).rowcount
+
+    def summary(self):
+        return {row['state']: row['count'] for row in self.conn.execute(
+            "SELECT state, COUNT(*) AS count FROM queue GROUP BY state"
+        )}
+
+    def pins(self):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM pins ORDER BY host, account")]
+
+    def nodes(self):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM nodes ORDER BY host, worker")]
+
+    def close(self):
+        self.conn.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK (takes the write lock up front, so claims never race)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def run_node(db_path=QUEUE_FILE, concurrency_per_account=1, max_workers=None, lean=False, exit_when_empty=False,
+             host=None, **pool_options):
+    """Claim jobs from the shared queue and run them through this host's worker pool"""
+    from worker_pool import UploadWorkerPool
+
+    host = host or socket.gethostname()
+    worker = worker_id(host)
+    jobs = JobQueue(db_path)
+    pool = UploadWorkerPool(concurrency_per_account, max_workers, lean=lean, **pool_options)
+    slots = pool.max_workers
+    in_flight = {}
+    counts = {'posted': 0, 'skipped': 0, 'retry': 0, 'failed': 0, 'lost': 0}
+    last_beat = 0
+
+    def finish(result):
+        job = in_flight.pop(result['job_id'])
+        name = os.path.basename(job['video_path'])
+        if result['skipped']:
+            state, key, note = POSTED, 'skipped', "already posted"
+        elif result.get('crashed'):
+            # The pool reports jobs of dead workers as failed; the lease must not outlive them
+            state, key, note = FAILED, 'failed', result['error']
+        elif result['success']:
+            state, key, note = POSTED, 'posted', f"{result['duration']:.1f}s"
+        elif result['retry']:
+            state, key, note = RETRY, 'retry', result['error']
+        else:
+            state, key, note = FAILED, 'failed', result['error']
+        counts[key] += 1
+        icon = {'posted': "✅", 'skipped': "⏭️", 'retry': "🔁", 'failed': "❌"}[key]
+        print(f"{icon} #{job['id']} {name} [{result['worker']}] {note}")
+        if not jobs.complete(job['id'], worker, state, result['error']):
+            counts['lost'] += 1
+
+    def beat():
+        # Never renew a lease for a job the pool no longer knows about
+        running = {job['job_id'] for job in pool.outstanding.values()}
+        for job_id in [job_id for job_id in in_flight if job_id not in running]:
+            job = in_flight.pop(job_id)
+            print(f"❌ #{job_id} {os.path.basename(job['video_path'])} has no worker any more")
+            counts['failed'] += 1
+            jobs.complete(job_id, worker, FAILED, "worker lost the job")
+        accounts = {job['account'] for job in in_flight.values()}
+        done = counts['posted'] + counts['skipped'] + counts['retry'] + counts['failed']
+        for job_id in jobs.heartbeat(worker, host, in_flight, accounts, done):
+            print(f"⚠️ Lease on #{job_id} was lost; its result will be ignored")
+
+    print(f"🌐 Node {worker} | queue: {db_path} | slots: {slots}")
+    try:
+        while True:
+            # Keep every worker busy: claim while there are free slots
+            while len(in_flight) < slots:
+                per_account = {}
+                for job in in_flight.values():
+                    per_account[job['account']] = per_account.get(job['account'], 0) + 1
+                full = [account for account, count in per_account.items() if count >= pool.capacity(account)]
+                job = jobs.claim(worker, host, skip_accounts=full)
+                if job is None:
+                    break
+                in_flight[job['id']] = job
+                pool.submit(dict(job, job_id=job['id']))
+                print(f"📥 Claimed #{job['id']} {os.path.basename(job['video_path'])} [{job['account']}]")
+
+            if time.time() - last_beat >= HEARTBEAT_SECONDS:
+                beat()
+                last_beat = time.time()
+
+            if not in_flight:
+                if exit_when_empty:
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+
+            try:
+                finish(pool.get_result(timeout=POLL_SECONDS))
+            except queue.Empty:
+                continue
+    finally:
+        # Jobs already handed to workers still run to the end; record them so they aren't posted twice
+        pool.close()
+        while in_flight:
+            try:
+                finish(pool.get_result(timeout=1))
+            except queue.Empty:
+                break
+        jobs.release_host(host, worker)
+        jobs.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared multi-host upload queue")
+    parser.add_argument("--db", default=QUEUE_FILE, help="Queue database (put it on shared storage)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Add a CSV/JSONL manifest to the queue")
+    enqueue.add_argument("manifest")
+    enqueue.add_argument("--caption-mode", default="ai", help="Used for rows without caption/caption_mode")
+
+    work = sub.add_parser("work", help="Run this host as a queue worker")
+    work.add_argument("--concurrency", type=int, default=1, help="Workers per account")
+    work.add_argument("--max-workers", type=int, default=None, help="Jobs in flight on this host (default: CPU cores)")
+    work.add_argument("--lean", action="store_true", help="Headless lean browsers")
+    work.add_argument("--exit-when-empty", action="store_true", help="Stop once the queue is drained")
+
+    sub.add_parser("status", help="Job counts, nodes and account pins")
+
+    requeue = sub.add_parser("requeue", help="Put retry/failed jobs back in the queue")
+    requeue.add_argument("--state", choices=(RETRY, FAILED), default=RETRY)
+    args = parser.parse_args()
+
+    if args.command == "work":
+        started = time.time()
+        counts = run_node(args.db, args.concurrency, args.max_workers, args.lean, args.exit_when_empty)
+        print("-" * 50)
+        print(f"✅ Posted: {counts['posted']} | ⏭️ Skipped: {counts['skipped']} | 🔁 Retry: {counts['retry']} | "
+              f"❌ Failed: {counts['failed']} | ⚠️ Lost lease: {counts['lost']}")
+        print(f"⏱️ {time.time() - started:.1f}s")
+        return
+
+    jobs = JobQueue(args.db)
+    try:
+        if args.command == "enqueue":
+            from batch import read_manifest
+            added = total = 0
+            for job in read_manifest(args.manifest, args.caption_mode):
+                total += 1
+                if jobs.enqueue(job['video_path'], job['account'], job['caption_mode'], job['caption'],
+                                job['description']):
+                    added += 1
+            print(f"📥 Queued {added}/{total} job(s) ({total - added} already in the queue)")
+        elif args.command == "requeue":
+            print(f"🔁 Requeued {jobs.requeue(args.state)} {args.state} job(s)")
+        else:
+            print("🌐 Job Queue")
+            print("-" * 40)
+            for state, count in sorted(jobs.summary().items()):
+                print(f"{state:<10} {count}")
+            now = time.time()
+            for node in jobs.nodes():
+                print(f"🖥️ {node['worker']}: {node['in_flight']} in flight, {node['done']} done, "
+                      f"seen {now - node['last_seen']:.0f}s ago")
+            for pin in jobs.pins():
+                print(f"📌 {pin['account']} → {pin['host']} ({pin['lease_until'] - now:.0f}s left)")
+    finally:
+        jobs.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+📊 Metrics - Timing per fase (setup, login, upload, caption, post, Gemini)
+Setiap fase/sub-step dicatat sebagai span ke config/metrics/events.jsonl
+(termasuk selector yang cocok, strategi post yang menang, latency Gemini).
+Tiap proses menyimpan ringkasan sendiri dan saat exit menggabungkannya (dengan lock)
+ke file Prometheus text-format, tanpa membaca ulang log. Log dirotasi saat > 50 MB.
+
+Usage:
+    python metrics.py report              # p50/p95/p99 per fase
+    python metrics.py report --since 24   # hanya 24 jam terakhir
+    python metrics.py report --by length  # dipecah per atribut span (mis. panjang caption)
+"""
+
+import os
+import json
+import time
+import uuid
+import atexit
+import argparse
+import functools
+import threading
+
+from cookie_vault import FileLock, atomic_write_json
+
+METRICS_DIR = "config/metrics"
+EVENTS_FILE = os.path.join(METRICS_DIR, "events.jsonl")
+PROM_FILE = os.path.join(METRICS_DIR, "uploader.prom")
+MAX_EVENTS_BYTES = 50 * 1024 * 1024   # events.jsonl is moved to events.jsonl.1 past this
+RECENT_DURATIONS = 1000               # per phase, for the quantiles in the .prom file
+FLUSH_EVERY = 200                     # spans between merges, so long-running workers show up before exit
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Span:
+    """One timed phase; use as a context manager"""
+
+    def __init__(self, recorder, name, attrs):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = dict(attrs)
+        self.parent = None
+        self.started = None
+
+    def set(self, **attrs):
+        """Attach extra attributes (selector matched, strategy used, ...)"""
+        self.attrs.update(attrs)
+        return self
+
+    def __enter__(self):
+        stack = self.recorder._stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.started = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.time() - self.started
+        stack = self.recorder._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        status = "error" if exc_type else ("fail" if self.attrs.get('ok') is False else "ok")
+        if exc_type:
+            self.attrs['error'] = str(exc)
+        self.recorder.emit({
+            'ts': self.started,
+            'run': self.recorder.run_id,
+            'pid': os.getpid(),
+            'span': self.name,
+            'parent': self.parent,
+            'duration': round(duration, 4),
+            'status': status,
+            'attrs': self.attrs,
+        })
+        return False
+
+
+class MetricsRecorder:
+    """Writes spans to a JSONL event log and keeps per-process totals, which are merged
+    into the Prometheus file at exit"""
+
+    def __init__(self, events_file=EVENTS_FILE, prom_file=PROM_FILE, max_events_bytes=MAX_EVENTS_BYTES,
+                 flush_every=FLUSH_EVERY):
+        self.events_file = events_file
+        self.prom_file = prom_file
+        self.max_events_bytes = max_events_bytes
+        self.flush_every = flush_every
+        self.run_id = uuid.uuid4().hex[:12]
+        self.enabled = os.getenv('TIKTOK_METRICS', '1') != '0'
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.emitted = 0
+        self.totals = {}       # span -> {'count', 'failures', 'sum', 'recent'} not merged yet
+        self.unflushed = 0
+        # Forked pool workers leave through os._exit and skip this; they call flush() themselves
+        atexit.register(self.flush)
+
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def emit(self, event):
+        if not self.enabled:
+            return
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        try:
+            with self.lock:
+                os.makedirs(os.path.dirname(self.events_file) or ".", exist_ok=True)
+                # One write per line in append mode, so parallel workers don't interleave
+                with open(self.events_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                    size = f.tell()
+                self.emitted += 1
+                _add(self.totals, event['span'], 1, int(event['status'] != "ok"), event['duration'],
+                     [event['duration']])
+                self.unflushed += 1
+            if size > self.max_events_bytes:
+                self._rotate()
+            if self.unflushed >= self.flush_every:
+                self.flush()
+        except Exception as e:
+            print(f"⚠️ Failed to write metrics event: {e}")
+
+    def _rotate(self):
+        """Move the event log to <events>.1 (one old generation is kept)"""
+        with FileLock(self.events_file):
+            # Another worker may have rotated it while we waited
+            try:
+                if os.path.getsize(self.events_file) > self.max_events_bytes:
+                    os.replace(self.events_file, f"{self.events_file}.1")
+            except FileNotFoundError:
+                pass
+
+    def flush(self):
+        """Merge this process's totals into the shared Prometheus file (under a file lock)"""
+        with self.lock:
+            totals, self.totals = self.totals, {}
+            self.unflushed = 0
+        if not totals:
+            return
+        state_file = f"{self.prom_file}.state.json"
+        try:
+            with FileLock(self.prom_file):
+                try:
+                    with open(state_file, 'r', encoding='utf-8') as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    state = {}
+                for name, stats in totals.items():
+                    _add(state, name, stats['count'], stats['failures'], stats['sum'], stats['recent'])
+                atomic_write_json(state_file, state)
+                write_prometheus(summarize_totals(state), self.prom_file)
+        except Exception as e:
+            print(f"⚠️ Failed to write Prometheus metrics: {e}")
+
+
+def _add(totals, name, count, failures, total, durations):
+    stats = totals.setdefault(name, {'count': 0, 'failures': 0, 'sum': 0.0, 'recent': []})
+    stats['count'] += count
+    stats['failures'] += failures
+    stats['sum'] += total
+    stats['recent'] = (stats['recent'] + durations)[-RECENT_DURATIONS:]
+
+
+recorder = MetricsRecorder()
+
+
+def span(name, **attrs):
+    """Time a block: `with metrics.span("login") as s: ... s.set(path="cached")`"""
+    return recorder.span(name, **attrs)
+
+
+def annotate(**attrs):
+    """Attach attributes to the innermost active span (no-op outside spans)"""
+    current = recorder.current()
+    if current:
+        current.set(**attrs)
+
+
+def timed(name):
+    """Decorator: record the call as a span, ok = truthiness of the return value"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as s:
+                result = func(*args, **kwargs)
+                s.attrs.setdefault('ok', bool(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def read_events(events_file=EVENTS_FILE, since=None):
+    """Stream events from the JSONL log and its rotated predecessor (optionally only newer than `since` epoch)"""
+    for path in (f"{events_file}.1", events_file):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since is None or event.get('ts', 0) >= since:
+                        yield event
+        except FileNotFoundError:
+            continue
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(events, by=None):
+    """Per-span count, failures, sum and quantiles (optionally split by one span attribute)"""
+    durations = {}
+    failures = {}
+    for event in events:
+        name = event['span']
+        if by and by in event.get('attrs', {}):
+            name = f"{name}[{by}={event['attrs'][by]}]"
+        durations.setdefault(name, []).append(event['duration'])
+        if event.get('status') != "ok":
+            failures[name] = failures.get(name, 0) + 1
+
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            'count': len(values),
+            'failures': failures.get(name, 0),
+            'sum': sum(values),
+            'quantiles': {q: percentile(values, q) for q in QUANTILES},
+        }
+    return summary
+
+
+def summarize_totals(totals):
+    """summarize()-shaped view of running totals: lifetime count/sum, quantiles of recent durations"""
+    summary = {}
+    for name, stats in totals.items():
+        recent = sorted(stats['recent'])
+        summary[name] = {
+            'count': stats['count'],
+            'failures': stats['failures'],
+            'sum': stats['sum'],
+            'quantiles': {q: percentile(recent, q) for q in QUANTILES},
+        }
+    return summary
+
+
+def write_prometheus(summary, prom_file=PROM_FILE):
+    """Write a Prometheus text-format file (atomic replace, textfile-collector friendly)"""
+    lines = [
+        "# HELP tiktok_uploader_phase_seconds Duration of uploader phases",
+        "# TYPE tiktok_uploader_phase_seconds summary",
+    ]
+    for name, stats in sorted(summary.items()):
+        for q, value in stats['quantiles'].items():
+            lines.append(f'tiktok_uploader_phase_seconds{{phase="{name}",quantile="{q}"}} {value:.4f}')
+        lines.append(f'tiktok_uploader_phase_seconds_sum{{phase="{name}"}} {stats["sum"]:.4f}')
+        lines.append(f'tiktok_uploader_phase_seconds_count{{phase="{name}"}} {stats["count"]}')
+    lines += [
+        "# HELP tiktok_uploader_phase_failures_total Phases that failed or raised",
+        "# TYPE tiktok_uploader_phase_failures_total counter",
+    ]
+    for name, stats in sorted(summary.items()):
+        lines.append(f'tiktok_uploader_phase_failures_total{{phase="{name}"}} {stats["failures"]}')
+
+    os.makedirs(os.path.dirname(prom_file) or ".", exist_ok=True)
+    tmp_file = f"{prom_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_file, prom_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uploader timing metrics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="p50/p95/p99 per phase across runs")
+    report.add_argument("--since", type=float, default=None, help="Only the last N hours")
+    report.add_argument("--events", default=EVENTS_FILE)
+    report.add_argument("--by", default=None, help="Split phases by a span attribute (e.g. length)")
+    args = parser.parse_args()
+
+    since = time.time() - args.since * 3600 if args.since else None
+    summary = summarize(read_events(args.events, since), args.by)
+    if not summary:
+        print(f"📭 No events in {args.events}")
+        return
+
+    width = max(28, max(len(name) for name in summary) + 2)
+    print(f"{'phase':<{width}}{'count':>7}{'fail':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+    print("-" * (width + 40))
+    for name, stats in sorted(summary.items()):
+        q = stats['quantiles']
+        print(f"{name:<{width}}{stats['count']:>7}{stats['failures']:>6}"
+              f"{q[0.5]:>8.2f}s{q[0.95]:>8.2f}s{q[0.99]:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
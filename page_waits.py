@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+⏱️ Page Waits - Tunggu sampai halaman benar-benar siap (bukan sleep tetap)
+Kondisi dicek di browser dengan MutationObserver, jadi selesai begitu DOM berubah.
+Setiap tunggu dibatasi deadline keseluruhan.
+"""
+
+import json
+import time
+
+# How long a single in-browser wait may run before we re-arm it (keeps
+# navigation/unload errors short and lets Python honour the deadline)
+SLICE_SECONDS = 5
+
+_ASYNC_WAIT_JS = """
+var cond = new Function(arguments[0]);
+var sliceMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var finished = false, obs = null, timer = null, limit = null;
+function finish(value) {
+    if (finished) return;
+    finished = true;
+    if (obs) obs.disconnect();
+    clearInterval(timer);
+    clearTimeout(limit);
+    done(value);
+}
+function check() {
+    try {
+        var value = cond();
+        if (value) finish(value);
+    } catch (e) {}
+}
+check();
+if (finished) return;
+obs = new MutationObserver(check);
+obs.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+// readyState / property changes don't always mutate the DOM
+timer = setInterval(check, 250);
+limit = setTimeout(function() { finish(null); }, sliceMs);
+"""
+
+DOCUMENT_READY_JS = "return document.readyState === 'complete';"
+
+PUBLISH_ENABLED_JS = """
+var btn = document.querySelector('button[data-e2e="publish-button"]');
+return !!btn && !btn.disabled
+    && btn.getAttribute('aria-disabled') !== 'true'
+    && btn.getAttribute('data-disabled') !== 'true';
+"""
+
+UPLOAD_COMPLETE_JS = """
+var bars = document.querySelectorAll('[role="progressbar"]');
+for (var i = 0; i < bars.length; i++) {
+    var now = parseFloat(bars[i].getAttribute('aria-valuenow'));
+    if (!isNaN(now) && now < 100) return false;
+}
+""" + PUBLISH_ENABLED_JS
+
+
+class Deadline:
+    """Overall time budget shared by several waits"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started = time.time()
+        self.expires = self.started + seconds
+
+    def remaining(self, cap=None):
+        """Seconds left, optionally capped to a per-phase limit"""
+        left = max(0.0, self.expires - time.time())
+        return min(left, cap) if cap is not None else left
+
+    def expired(self):
+        return time.time() >= self.expires
+
+    def elapsed(self):
+        return time.time() - self.started
+
+
+def wait_for_condition(driver, condition_js, timeout):
+    """Wait until a JS condition (function body) returns truthy; returns it or None on timeout"""
+    deadline = Deadline(timeout)
+    while True:
+        slice_seconds = deadline.remaining(SLICE_SECONDS)
+        if slice_seconds <= 0:
+            return None
+        try:
+            driver.set_script_timeout(slice_seconds + 5)
+            value = driver.execute_async_script(_ASYNC_WAIT_JS, condition_js, int(slice_seconds * 1000))
+            if value:
+                return value
+        except Exception:
+            # Navigation unloads the script context; re-arm on the new page
+            time.sleep(0.2)
+
+
+def wait_for_page_load(driver, timeout=15):
+    """Wait for document.readyState == complete"""
+    return bool(wait_for_condition(driver, DOCUMENT_READY_JS, timeout))
+
+
+def any_selector_js(selectors, clickable=False):
+    """JS condition returning the first selector (in order) that matches"""
+    return """
+var selectors = %s;
+var clickable = %s;
+for (var i = 0; i < selectors.length; i++) {
+    var el = document.querySelector(selectors[i]);
+    if (!el) continue;
+    if (clickable) {
+        var rect = el.getBoundingClientRect();
+        if (el.disabled || rect.width === 0 || rect.height === 0) continue;
+    }
+    return selectors[i];
+}
+return null;
+""" % (json.dumps(list(selectors)), "true" if clickable else "false")
+
+
+def wait_for_any_selector(driver, selectors, timeout, clickable=False):
+    """Wait for any of the CSS selectors; returns the one that matched or None"""
+    return wait_for_condition(driver, any_selector_js(selectors, clickable), timeout)
+
+
+def wait_for_navigation(driver, from_url, timeout):
+    """Wait until the page leaves from_url and finishes loading"""
+    condition = "return location.href !== %s && document.readyState === 'complete';" % json.dumps(from_url)
+    return bool(wait_for_condition(driver, condition, timeout))
+
+
+def wait_for_post_settled(driver, from_url, timeout):
+    """After clicking publish: URL changed, publish button gone, or a confirmation appeared"""
+    condition = """
+if (location.href !== %s) return 'navigated';
+var btn = document.querySelector('button[data-e2e="publish-button"]');
+if (!btn) return 'button-gone';
+var text = (document.body && document.body.innerText || '').toLowerCase();
+if (text.indexOf('your video has been uploaded') !== -1 || text.indexOf('manage your posts') !== -1
+        || text.indexOf('video published') !== -1) return 'confirmed';
+return null;
+""" % json.dumps(from_url)
+    return wait_for_condition(driver, condition, timeout)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+⚡ Pipeline Mode - Caption AI dibuat paralel dengan startup Chrome + login
+Caption untuk video berikutnya juga di-prefetch selagi video sekarang
+di-upload. Di akhir ditampilkan berapa detik yang dihemat oleh overlap.
+
+Usage:
+    python pipeline.py video1.mp4 video2.mp4 --describe "funny cat" --describe "cooking"
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from tiktok_uploader import TikTokUploader
+from video_inspector import inspect_many, format_report
+from upload_ledger import UploadLedger, CAPTIONED, POSTED, FAILED
+
+
+def _timed_caption(uploader, description, saved_caption=None):
+    """Caption task for the background thread; returns (caption, seconds)"""
+    started = time.time()
+    caption = saved_caption or uploader.generate_ai_caption(description)
+    return caption, time.time() - started
+
+
+def run_pipeline(videos, descriptions=None, prefetch=2, uploader=None, ledger=None):
+    """Upload videos in one browser, overlapping Gemini with browser work"""
+    uploader = uploader or TikTokUploader()
+    ledger = ledger or UploadLedger()
+    prefetch = max(1, prefetch)
+    descriptions = list(descriptions or [])
+    # Same default as main(): the file name is the AI context
+    descriptions += [os.path.splitext(os.path.basename(v))[0] for v in videos[len(descriptions):]]
+
+    # Drop videos already posted to this account; resumed jobs keep their caption
+    jobs = []
+    for video_path, description in zip(videos, descriptions):
+        job = ledger.begin(video_path, uploader.account)
+        if job is None:
+            print(f"⏭️ Already posted: {os.path.basename(video_path)}")
+        else:
+            jobs.append(dict(job, video_path=video_path, description=description))
+    videos = [job['video_path'] for job in jobs]
+
+    timings = {'caption': [], 'caption_wait': [], 'upload': [], 'setup': 0.0, 'login': 0.0}
+    results = []
+    if not jobs:
+        return results, timings
+    wall_started = time.time()
+
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        futures = {}
+
+        def schedule(index):
+            if index < len(videos) and index not in futures:
+                futures[index] = executor.submit(
+                    _timed_caption, uploader, jobs[index]['description'], jobs[index]['caption']
+                )
+
+        # Kick off Gemini for the first videos before Chrome even starts
+        for index in range(prefetch):
+            schedule(index)
+
+        started = time.time()
+        if not uploader.setup_driver():
+            return results, timings
+        timings['setup'] = time.time() - started
+
+        started = time.time()
+        if not uploader.login_tiktok():
+            print("❌ Login failed")
+            return results, timings
+        timings['login'] = time.time() - started
+
+        for index, (video_path, job) in enumerate(zip(videos, jobs)):
+            # Only blocks if Gemini is slower than everything we did meanwhile
+            started = time.time()
+            caption, caption_seconds = futures.pop(index).result()
+            timings['caption_wait'].append(time.time() - started)
+            timings['caption'].append(caption_seconds)
+            ledger.mark(job['id'], CAPTIONED, caption=caption)
+
+            # Prefetch the next captions while this one uploads
+            schedule(index + prefetch)
+
+            started = time.time()
+            if not ledger.claim(job['id']):
+                print(f"⏭️ Already being uploaded elsewhere: {os.path.basename(video_path)}")
+                continue
+            if index > 0 and not uploader.open_upload_page():
+                success = False
+            else:
+                success = uploader.upload_video(video_path, caption)
+            ledger.mark(job['id'], POSTED if success else FAILED, error=None if success else "upload failed")
+            timings['upload'].append(time.time() - started)
+            results.append({'video_path': video_path, 'caption': caption, 'success': bool(success)})
+
+    timings['wall'] = time.time() - wall_started
+    return results, timings
+
+
+def print_timing_report(timings):
+    """Compare actual wall time with what the strictly sequential flow would take"""
+    caption_total = sum(timings['caption'])
+    sequential = caption_total + timings['setup'] + timings['login'] + sum(timings['upload'])
+    wall = timings.get('wall', sequential)
+
+    print("\n⏱️ Timing Report:")
+    print("-" * 40)
+    print(f"🔧 Driver setup:      {timings['setup']:.1f}s")
+    print(f"🔑 Login:             {timings['login']:.1f}s")
+    print(f"🤖 Captions (Gemini): {caption_total:.1f}s total, {sum(timings['caption_wait']):.1f}s actually waited")
+    print(f"📤 Uploads:           {sum(timings['upload']):.1f}s")
+    print("-" * 40)
+    print(f"🐢 Sequential estimate: {sequential:.1f}s")
+    print(f"⚡ Pipelined wall time:  {wall:.1f}s")
+    print(f"💰 Saved by overlap:    {sequential - wall:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipelined TikTok upload (captions overlap browser work)")
+    parser.add_argument("videos", nargs="+", help="Video files to upload, in order")
+    parser.add_argument("--describe", action="append", default=[],
+                        help="AI context per video, in the same order (default: file name)")
+    parser.add_argument("--prefetch", type=int, default=2, help="Captions generated ahead of the upload")
+    args = parser.parse_args()
+
+    # Pre-flight: refuse to start if any video would be rejected anyway
+    rejected = [r for r in inspect_many(args.videos) if not r['ok']]
+    if rejected:
+        for report in rejected:
+            print(format_report(report))
+        return
+
+    uploader = TikTokUploader()
+    try:
+        results, timings = run_pipeline(args.videos, args.describe, args.prefetch, uploader)
+        for r in results:
+            print(f"{'✅' if r['success'] else '❌'} {os.path.basename(r['video_path'])}")
+        if 'wall' in timings:
+            print_timing_report(timings)
+    finally:
+        uploader.close()
+
+
+if __name__ == "__main__":
+    main()
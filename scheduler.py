@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+🗓️ Posting Scheduler - Upload dijadwalkan per akun, tidak menumpuk sekaligus
+- Token bucket per akun (maksimal N post per jam, dengan burst kecil)
+- Jarak antar post per akun diberi jitter acak
+- Batas global jumlah upload paralel
+- Slot kosong di pool langsung diisi akun lain yang sudah boleh post,
+  jadi browser tetap sibuk walaupun satu akun sedang dibatasi
+
+Usage:
+    python scheduler.py manifest.csv --per-hour 4 --min-gap 600 --global-limit 3
+    python scheduler.py manifest.csv --plan --assume-duration 90   # lihat jadwal saja
+"""
+
+import os
+import time
+import heapq
+import queue
+import random
+import argparse
+from collections import deque
+from datetime import datetime
+
+from batch import RETRY_FILE, CAPTION_MODES, read_manifest, append_retry
+from video_inspector import inspect_video, format_report
+from worker_pool import UploadWorkerPool
+
+
+class TokenBucket:
+    """rate_per_hour tokens refill continuously up to burst; one token per post"""
+
+    def __init__(self, rate_per_hour, burst=1, now=None):
+        self.rate = rate_per_hour / 3600.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.time() if now is None else now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 = now; rate <= 0 means unlimited)"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self, now):
+        if self.rate <= 0:
+            return
+        self._refill(now)
+        self.tokens -= 1
+
+    def refund(self):
+        """Give back a token that was spent on a post that never happened"""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class AccountLane:
+    """Queued jobs and posting limits of one account"""
+
+    def __init__(self, account, bucket, min_gap, capacity, next_allowed):
+        self.account = account
+        self.jobs = deque()
+        self.bucket = bucket
+        self.min_gap = min_gap
+        self.capacity = capacity
+        self.next_allowed = next_allowed
+        self.last_slot = None
+        self.inflight = 0
+
+    def ready_at(self, now):
+        """Earliest time the next job of this account may start"""
+        return max(now + self.bucket.wait_time(now), self.next_allowed)
+
+
+class PostingScheduler:
+    """Assigns queued jobs to per-account time slots under a global concurrency limit"""
+
+    def __init__(self, per_hour=6, burst=1, min_gap=120, jitter=0.3, global_limit=2, concurrency_per_account=1,
+                 account_limits=None, seed=None):
+        self.per_hour = per_hour
+        self.burst = burst
+        self.min_gap = min_gap
+        self.jitter = max(0.0, min(jitter, 1.0))
+        self.global_limit = max(1, global_limit)
+        self.concurrency_per_account = max(1, concurrency_per_account)
+        # {'account': {'per_hour': .., 'burst': .., 'min_gap': .., 'concurrency': ..}}
+        self.account_limits = account_limits or {}
+        self.random = random.Random(seed)
+        self.lanes = {}
+        self.inflight = 0
+
+    def _jittered(self, seconds):
+        return seconds * self.random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _lane(self, account, now):
+        lane = self.lanes.get(account)
+        if lane is None:
+            limits = self.account_limits.get(account, {})
+            lane = AccountLane(
+                account,
+                TokenBucket(limits.get('per_hour', self.per_hour), limits.get('burst', self.burst), now),
+                limits.get('min_gap', self.min_gap),
+                limits.get('concurrency', self.concurrency_per_account),
+                # Spread the first post of each account so they don't all fire together
+                now + self.random.uniform(0, self.jitter * limits.get('min_gap', self.min_gap)),
+            )
+            self.lanes[account] = lane
+        return lane
+
+    def add(self, job, now=None):
+        now = time.time() if now is None else now
+        self._lane(job['account'], now).jobs.append(job)
+
+    def pending(self):
+        return sum(len(lane.jobs) for lane in self.lanes.values())
+
+    def next_dispatch(self, now):
+        """(lane, ready_at) of the account that can start soonest, or None if nothing can start"""
+        if self.inflight >= self.global_limit:
+            return None
+        best = None
+        for lane in self.lanes.values():
+            # Accounts whose workers are all busy don't hold up the others
+            if not lane.jobs or lane.inflight >= lane.capacity:
+                continue
+            key = (lane.ready_at(now), -len(lane.jobs))
+            if best is None or key < best[0]:
+                best = (key, lane)
+        return (best[1], best[0][0]) if best else None
+
+    def take(self, lane, now):
+        """Start the next job of a lane at `now`; returns it with its slot time"""
+        job = lane.jobs.popleft()
+        lane.bucket.consume(now)
+        lane.next_allowed = now + self._jittered(lane.min_gap)
+        lane.last_slot = now
+        lane.inflight += 1
+        self.inflight += 1
+        job['slot'] = now
+        return job
+
+    def done(self, account, refund_slot=None):
+        """Job of account finished; refund_slot = its slot time if nothing was posted
+        (already in the ledger), so the token and the gap it took are given back"""
+        lane = self.lanes.get(account)
+        if lane and lane.inflight > 0:
+            lane.inflight -= 1
+            self.inflight -= 1
+        if lane and refund_slot is not None:
+            lane.bucket.refund()
+            # Only undo the gap if no later job of this account has started since
+            if lane.last_slot == refund_slot:
+                lane.next_allowed = refund_slot
+
+    def reset_inflight(self):
+        """Forget in-flight jobs (the pool has nothing outstanding any more)"""
+        for lane in self.lanes.values():
+            lane.inflight = 0
+        self.inflight = 0
+
+    def plan(self, duration, start=None):
+        """Simulate the schedule assuming every upload takes `duration` seconds (consumes the queue)"""
+        now = time.time() if start is None else start
+        running = []
+        slots = []
+        while self.pending() or running:
+            pick = self.next_dispatch(now)
+            if pick and pick[1] <= now:
+                job = self.take(pick[0], now)
+                slots.append(job)
+                heapq.heappush(running, (now + duration, len(slots), job['account']))
+                continue
+            upcoming = [t for t in (pick[1] if pick else None, running[0][0] if running else None) if t is not None]
+            if not upcoming:
+                break
+            now = max(now, min(upcoming))
+            while running and running[0][0] <= now:
+                self.done(heapq.heappop(running)[2])
+        return slots
+
+
+def run_schedule(scheduler, pool):
+    """Dispatch jobs into an UploadWorkerPool as their slots come up; yields results.
+    Jobs of dead workers come back from the pool as failed results."""
+    # Never ask the pool for more browsers than the global limit
+    scheduler.global_limit = min(scheduler.global_limit, pool.max_workers)
+    for lane in scheduler.lanes.values():
+        lane.capacity = min(lane.capacity, pool.capacity(lane.account))
+    slots = {}
+
+    while scheduler.pending() or scheduler.inflight:
+        now = time.time()
+        pick = scheduler.next_dispatch(now)
+        if pick and pick[1] <= now:
+            job = scheduler.take(pick[0], now)
+            print(f"🗓️ [{job['account']}] {os.path.basename(job['video_path'])} started")
+            slots[pool.submit(job)] = job['slot']
+            continue
+
+        wait = max(0.0, pick[1] - now) if pick else None
+        if not scheduler.inflight:
+            if wait is None:
+                break
+            print(f"💤 Next slot in {wait:.0f}s ({pick[0].account})")
+            time.sleep(wait)
+            continue
+
+        # Wake up for whichever comes first: a finished upload or the next slot
+        try:
+            result = pool.get_result(timeout=wait)
+        except queue.Empty:
+            if not pool.outstanding:
+                # Every submitted job is accounted for; don't wait on phantom uploads
+                scheduler.reset_inflight()
+            continue
+        slot = slots.pop(result['job_id'], None)
+        scheduler.done(result['account'], slot if result['skipped'] else None)
+        yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate-limited, time-slotted multi-account uploads")
+    parser.add_argument("manifest", help="CSV or JSONL manifest (same format as batch.py)")
+    parser.add_argument("--per-hour", type=float, default=6, help="Posts per hour per account (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=1, help="Posts an account may make back to back")
+    parser.add_argument("--min-gap", type=float, default=120, help="Base seconds between posts of one account")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Random ± fraction applied to --min-gap")
+    parser.add_argument("--global-limit", type=int, default=2, help="Uploads running at once across accounts")
+    parser.add_argument("--concurrency", type=int, default=1, help="Workers per account")
+    parser.add_argument("--caption-mode", choices=CAPTION_MODES, default="ai")
+    parser.add_argument("--retry-file", default=RETRY_FILE)
+    parser.add_argument("--lean", action="store_true", help="Headless lean browsers")
+    parser.add_argument("--plan", action="store_true", help="Only print the computed schedule")
+    parser.add_argument("--assume-duration", type=float, default=90, help="Upload seconds assumed by --plan")
+    args = parser.parse_args()
+
+    scheduler = PostingScheduler(args.per_hour, args.burst, args.min_gap, args.jitter, args.global_limit,
+                                 args.concurrency)
+    rejected = 0
+    for job in read_manifest(args.manifest, args.caption_mode):
+        if not args.plan:
+            report = inspect_video(job['video_path'])
+            if not report['ok']:
+                print(format_report(report))
+                rejected += 1
+                continue
+        scheduler.add(job)
+
+    if args.plan:
+        print(f"🗓️ Schedule ({args.assume_duration:.0f}s per upload)")
+        print("-" * 60)
+        for job in scheduler.plan(args.assume_duration):
+            slot = datetime.fromtimestamp(job['slot']).strftime("%H:%M:%S")
+            print(f"{slot}  {job['account']:<16} {os.path.basename(job['video_path'])}")
+        return
+
+    print(f"🗓️ {scheduler.pending()} job(s) across {len(scheduler.lanes)} account(s) | "
+          f"{args.per_hour:g}/hour per account | global limit {args.global_limit}")
+    print("-" * 50)
+    pool = UploadWorkerPool(args.concurrency, max_workers=args.global_limit, lean=args.lean)
+    counts = {'posted': 0, 'skipped': 0, 'retry': 0, 'failed': 0}
+    jobs = {}
+    for lane in scheduler.lanes.values():
+        for job in lane.jobs:
+            jobs[job['job_id']] = job
+
+    os.makedirs(os.path.dirname(args.retry_file) or ".", exist_ok=True)
+    try:
+        with open(args.retry_file, 'a', encoding='utf-8') as retry_out:
+            for result in run_schedule(scheduler, pool):
+                name = os.path.basename(result['video_path'])
+                if result['skipped']:
+                    counts['skipped'] += 1
+                    print(f"⏭️ {name} [{result['account']}] already posted")
+                elif result['success']:
+                    counts['posted'] += 1
+                    print(f"✅ {name} [{result['worker']}] {result['duration']:.1f}s")
+                elif result['retry']:
+                    counts['retry'] += 1
+                    print(f"🔁 {name} [{result['worker']}] {result['error']}")
+                    append_retry(retry_out, jobs[result['job_id']], result['error'])
+                else:
+                    counts['failed'] += 1
+                    print(f"❌ {name} [{result['worker']}] {result['error']}")
+    finally:
+        pool.close()
+
+    print("-" * 50)
+    print(f"✅ Posted: {counts['posted']} | ⏭️ Skipped: {counts['skipped']} | 🔁 Retry: {counts['retry']} | "
+          f"❌ Failed: {counts['failed']} | 🚫 Rejected: {rejected}")
+
+
+if __name__ == "__main__":
+    main()
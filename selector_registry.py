@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+🎯 Selector Registry - Semua CSS selector TikTok di satu tempat
+Mencatat selector mana yang cocok dan berapa lama, disimpan di
+config/selector_stats.json, lalu mencoba selector paling sering cocok duluan.
+Selector yang tidak pernah cocok otomatis turun ke belakang.
+"""
+
+import json
+import time
+import atexit
+
+import metrics
+from cookie_vault import FileLock, atomic_write_json
+from page_waits import wait_for_any_selector
+
+STATS_FILE = "config/selector_stats.json"
+
+# Lookups between two merges into the stats file (the rest is written at close/exit)
+SAVE_EVERY = 20
+
+# A selector that missed this many times without a single hit goes to the back
+DEMOTE_AFTER_MISSES = 5
+
+DEFAULT_SELECTORS = {
+    # Profile indicators on the homepage when cookies are valid
+    'login': [
+        "[data-e2e='profile-icon']",
+        "[data-e2e='upload-icon']",
+        "a[href*='/upload']",
+        "svg[data-e2e='upload-icon']",
+    ],
+    # Upload page elements that only show up after a successful login
+    'login_success': [
+        "input[type='file']",
+        "[data-e2e='upload-btn']",
+        "div[data-e2e='upload-container']",
+        ".upload-btn",
+    ],
+    'upload': [
+        "input[type='file']",
+    ],
+    'caption': [
+        "div[contenteditable='true']",
+        "div[data-text='true']",
+        "textarea[placeholder*='caption']",
+        "div[role='textbox']",
+        "[data-e2e='editor']",
+        ".public-DraftEditor-content",
+        "div[data-contents='true']",
+        "[data-e2e='video-caption']",
+    ],
+    'publish': [
+        'button[data-e2e="publish-button"]',
+    ],
+}
+
+
+class SelectorRegistry:
+    """Ranked selectors per target with hit statistics persisted across runs"""
+
+    def __init__(self, stats_file=STATS_FILE, selectors=None, save_every=SAVE_EVERY):
+        self.stats_file = stats_file
+        self.save_every = save_every
+        self.selectors = {target: list(items) for target, items in (selectors or DEFAULT_SELECTORS).items()}
+        self.stats = self._read_stats()
+        # Changes since the last save, merged into the file so parallel workers don't clobber each other
+        self.pending = {}
+        self.unsaved = 0
+        # Only a safety net: forked pool workers skip atexit and call close() themselves
+        atexit.register(self.close)
+
+    def _read_stats(self):
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _entry(self, stats, target, selector):
+        return stats.setdefault(target, {}).setdefault(selector, {'hits': 0, 'misses': 0, 'total_ms': 0.0})
+
+    def ranked(self, target):
+        """Selectors for a target, most likely match first"""
+        selectors = self.selectors[target]
+        stats = self.stats.get(target, {})
+
+        def score(item):
+            index, selector = item
+            entry = stats.get(selector, {})
+            hits = entry.get('hits', 0)
+            misses = entry.get('misses', 0)
+            demoted = hits == 0 and misses >= DEMOTE_AFTER_MISSES
+            hit_rate = (hits + 1) / (hits + misses + 2)
+            avg_ms = entry.get('total_ms', 0.0) / hits if hits else float('inf')
+            return (demoted, -hit_rate, avg_ms, index)
+
+        return [selector for _, selector in sorted(enumerate(selectors), key=score)]
+
+    def record(self, target, selector, hit, elapsed=0.0):
+        """Record one match (or miss) for a selector"""
+        for stats in (self.stats, self.pending):
+            entry = self._entry(stats, target, selector)
+            if hit:
+                entry['hits'] += 1
+                entry['total_ms'] += elapsed * 1000
+            else:
+                entry['misses'] += 1
+
+    def find(self, driver, target, timeout, clickable=False):
+        """Wait for any selector of a target; returns the matching selector or None"""
+        ranked = self.ranked(target)
+        started = time.time()
+        with metrics.span(f"selector.{target}") as span:
+            matched = wait_for_any_selector(driver, ranked, timeout, clickable)
+            span.set(ok=bool(matched), selector=matched, rank=ranked.index(matched) if matched else None)
+        elapsed = time.time() - started
+
+        if matched:
+            self.record(target, matched, True, elapsed)
+            # Everything ranked ahead of the winner was absent when it matched
+            for selector in ranked[:ranked.index(matched)]:
+                self.record(target, selector, False)
+        else:
+            for selector in ranked:
+                self.record(target, selector, False)
+
+        self.unsaved += 1
+        if self.unsaved >= self.save_every:
+            self.save()
+        return matched
+
+    def save(self):
+        """Merge pending stats into the stats file (locked read-merge-replace)"""
+        if not self.pending:
+            return
+        try:
+            with FileLock(self.stats_file):
+                merged = self._read_stats()
+                for target, entries in self.pending.items():
+                    for selector, delta in entries.items():
+                        entry = self._entry(merged, target, selector)
+                        entry['hits'] += delta['hits']
+                        entry['misses'] += delta['misses']
+                        entry['total_ms'] += delta['total_ms']
+                atomic_write_json(self.stats_file, merged)
+
+            self.stats = merged
+            self.pending = {}
+            self.unsaved = 0
+        except Exception as e:
+            print(f"⚠️ Failed to save selector stats: {e}")
+
+    def close(self):
+        """Write whatever is still pending"""
+        self.save()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+🔐 Session Check - Cek cookies TikTok secara offline sebelum buka browser
+- Cookie sesi wajib ada dan belum expired
+- Timestamp "terakhir terverifikasi OK" disimpan dengan TTL, jadi
+  kalau sesi baru saja terbukti valid kita langsung ke halaman upload
+"""
+
+import os
+import json
+import time
+import hashlib
+
+from cookie_vault import FileLock, atomic_write_json
+
+SESSION_STATE_FILE = "config/session_state.json"
+
+# Any one of these proves a logged-in TikTok session
+SESSION_COOKIE_NAMES = ("sessionid", "sessionid_ss", "sid_tt")
+
+# How long a successful verification is trusted without probing the homepage
+DEFAULT_TTL = 6 * 3600
+
+
+def cookie_expiry(cookie):
+    """Expiry as epoch seconds (Selenium uses 'expiry', CDP/exports use 'expires'), None for session cookies"""
+    expiry = cookie.get('expiry', cookie.get('expires'))
+    try:
+        expiry = float(expiry)
+    except (TypeError, ValueError):
+        return None
+    # CDP reports -1 for browser-session cookies
+    return expiry if expiry > 0 else None
+
+
+def check_cookies_offline(cookies, now=None):
+    """Return (ok, reason) for a saved cookie list without touching the network"""
+    now = now or time.time()
+    if not cookies:
+        return False, "no saved cookies"
+
+    session_cookies = [c for c in cookies if c.get('name') in SESSION_COOKIE_NAMES and c.get('value')]
+    if not session_cookies:
+        return False, "session cookie missing"
+
+    alive = [c for c in session_cookies if cookie_expiry(c) is None or cookie_expiry(c) > now]
+    if not alive:
+        return False, "session cookies expired"
+
+    return True, "session cookies present"
+
+
+def session_fingerprint(cookies):
+    """Hash of the session cookie values, so a new login invalidates the cached verdict"""
+    values = sorted(f"{c['name']}={c['value']}" for c in cookies if c.get('name') in SESSION_COOKIE_NAMES)
+    return hashlib.sha256("\n".join(values).encode('utf-8')).hexdigest()
+
+
+class SessionCache:
+    """Remembers when each cookie file was last verified as logged in"""
+
+    def __init__(self, state_file=SESSION_STATE_FILE, ttl=DEFAULT_TTL):
+        self.state_file = state_file
+        self.ttl = ttl
+
+    def _read(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update(self, change):
+        """Read-modify-write of the state file under a lock, so parallel workers keep each other's entries.
+        change(state) edits the dict in place and returns False if there is nothing to write."""
+        try:
+            with FileLock(self.state_file):
+                state = self._read()
+                if change(state) is not False:
+                    atomic_write_json(self.state_file, state)
+        except Exception as e:
+            print(f"⚠️ Failed to save session state: {e}")
+
+    def is_fresh(self, cookies_file, cookies):
+        """True if these exact session cookies were verified within the TTL"""
+        entry = self._read().get(os.path.abspath(cookies_file))
+        if not entry or entry.get('fingerprint') != session_fingerprint(cookies):
+            return False
+        return time.time() - entry.get('verified_at', 0) < self.ttl
+
+    def mark_verified(self, cookies_file, cookies):
+        entry = {'verified_at': time.time(), 'fingerprint': session_fingerprint(cookies)}
+        self._update(lambda state: state.update({os.path.abspath(cookies_file): entry}))
+
+    def invalidate(self, cookies_file):
+        self._update(lambda state: state.pop(os.path.abspath(cookies_file), None) is not None)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests must not append to the real config/metrics files
+os.environ["TIKTOK_METRICS"] = "0"
+
+# The modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+import random
+
+from caption_engine import MAX_HASHTAGS, MIN_HASHTAGS, MAX_CAPTION_CHARS, generate_caption
+
+
+def hashtags(caption):
+    return [word for word in caption.split() if word.startswith("#")]
+
+
+def test_many_own_hashtags_stay_within_limit():
+    rng = random.Random(0)
+    description = "funny cat video #cat #Cat #pets #meow #kitten #cute #animals #lol #viral #fun"
+    for _ in range(50):
+        tags = hashtags(generate_caption(description, rng))
+        assert MIN_HASHTAGS <= len(tags) <= MAX_HASHTAGS
+        assert len({tag.lower() for tag in tags}) == len(tags)
+
+
+def test_own_hashtags_are_not_in_the_subject():
+    caption = generate_caption("kucing lucu #kucing #lucu", random.Random(1))
+    body = caption[:caption.index(" #")]
+    assert "#" not in body
+
+
+def test_captions_fit_without_description():
+    rng = random.Random(2)
+    for description in ("", "IMG_2024_funny_cats", "resep nasi goreng pedas"):
+        caption = generate_caption(description, rng)
+        assert len(caption) <= MAX_CAPTION_CHARS
+        assert MIN_HASHTAGS <= len(hashtags(caption)) <= MAX_HASHTAGS
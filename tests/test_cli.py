@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli.py")
+# Entry modules that import without the optional Selenium / Gemini / dotenv packages
+MODULES = ["cli", "metrics", "caption_engine", "gemini_client", "upload_ledger"]
+
+
+def import_check(*args):
+    return subprocess.run([sys.executable, CLI, "import-check", *args], capture_output=True, text=True)
+
+
+def test_import_check_passes_within_budget():
+    proc = import_check(*MODULES)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    for module in MODULES:
+        assert module in proc.stdout
+
+
+def test_import_check_fails_over_budget():
+    proc = import_check("--budget-ms", "0.001", "caption_engine")
+    assert proc.returncode == 1
+    assert "budget" in proc.stdout
+
+
+def test_import_check_fails_on_broken_module():
+    proc = import_check("no_such_module_here")
+    assert proc.returncode == 1
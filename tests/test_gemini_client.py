@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import gemini_client
+from gemini_client import (CircuitBreaker, FakeGeminiModel, GeminiCaptionClient, GeminiUnavailable,
+                           graphemes, trim_caption)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    # Slot lock files and metrics land in config/ under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(GeminiCaptionClient, "_breaker", CircuitBreaker(threshold=2, cooldown=60))
+    monkeypatch.setattr(GeminiCaptionClient, "_semaphores", {})
+
+
+def client(model, **options):
+    options.setdefault("backoff", 0.01)
+    return GeminiCaptionClient(model=model, **options)
+
+
+def test_answer_from_fake_model():
+    assert "#cat" in client(FakeGeminiModel()).generate("cat video")
+
+
+def test_retries_then_succeeds():
+    model = FakeGeminiModel(fail_times=1)
+    assert client(model, retries=1).generate("x")
+    assert model.calls == 2
+
+
+def test_circuit_opens_after_repeated_failures():
+    failing = FakeGeminiModel(fail_times=100)
+    with pytest.raises(GeminiUnavailable):
+        client(failing, retries=1).generate("x")
+    assert GeminiCaptionClient._breaker.is_open()
+    # Open circuit: no call reaches the model any more
+    healthy = FakeGeminiModel()
+    with pytest.raises(GeminiUnavailable, match="circuit open"):
+        client(healthy).generate("x")
+    assert healthy.calls == 0
+
+
+def test_timeout_keeps_slot_until_thread_ends():
+    hung = client(FakeGeminiModel(hang=True), timeout=0.2, retries=0, max_concurrency=1, process_slots=1)
+    started = time.time()
+    with pytest.raises(GeminiUnavailable, match="did not answer"):
+        hung.generate("x")
+    assert time.time() - started < 2
+    # The abandoned call still holds the only slot
+    waiting = client(FakeGeminiModel(), timeout=0.2, retries=0, max_concurrency=1, process_slots=1)
+    with pytest.raises(GeminiUnavailable, match="no free Gemini slot"):
+        waiting.generate("x")
+
+
+def test_semaphore_per_concurrency_limit():
+    one = client(FakeGeminiModel(), max_concurrency=1)
+    four = client(FakeGeminiModel(), max_concurrency=4)
+    assert one._semaphore is not four._semaphore
+    assert client(FakeGeminiModel(), max_concurrency=4)._semaphore is four._semaphore
+
+
+def test_no_model_and_no_key_is_unavailable():
+    with pytest.raises(GeminiUnavailable, match="no API key"):
+        GeminiCaptionClient().generate("x")
+
+
+def test_trim_keeps_short_caption_unchanged():
+    caption = "Look at this #cat\nso #funny"
+    assert trim_caption(caption) == caption
+
+
+def test_trim_fits_limit_and_keeps_hashtags_whole():
+    caption = "word " * 40 + "#one #two #three #four #five #six #seven #eight #nine"
+    trimmed = trim_caption(caption, max_chars=100)
+    assert len(trimmed) <= 100
+    tags = [word for word in trimmed.split() if word.startswith("#")]
+    assert len(tags) >= gemini_client.MIN_HASHTAGS
+    assert all(tag in caption.split() for tag in tags)
+
+
+def test_trim_does_not_split_emoji():
+    family = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+    caption = (family + " ") * 60
+    trimmed = trim_caption(caption, max_chars=20)
+    assert len(trimmed) <= 20
+    assert set(graphemes(trimmed)) <= set(graphemes(caption)) | {"…"}
+
+
+def test_trim_never_returns_empty():
+    assert trim_caption("#" + "x" * 300, max_chars=150)
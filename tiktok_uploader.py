@@ -10,47 +10,148 @@ FIXED: Login stuck issue
 """
 
 import os
+import re
 import json
 import time
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import google.generativeai as genai
+# Selenium and google.generativeai are imported where they're used, so commands
+# that never open a browser or call Gemini start without loading them
 from dotenv import load_dotenv
+import metrics
+from caption_cache import CaptionCache
+from browser_profile import LEAN_ARGUMENTS, LEAN_DISABLED_FEATURES, LEAN_PREFS, block_requests
+from video_inspector import VALID_EXTENSIONS, inspect_video, format_report
+from upload_ledger import UploadLedger, CAPTIONED, POSTED, FAILED
+from selector_registry import SelectorRegistry
+from session_check import SessionCache, check_cookies_offline, session_fingerprint
+from upload_progress import UploadProgress, install_progress_hook, read_uploaded_bytes
+from cookie_vault import DEFAULT_ACCOUNT, cookies_path, load_file, save_file, valid_cookies, inject_cookies
+from gemini_client import GeminiCaptionClient, trim_caption
+from caption_engine import generate_caption
+from page_waits import (
+    Deadline, wait_for_page_load, wait_for_condition, wait_for_any_selector,
+    wait_for_post_settled, UPLOAD_COMPLETE_JS, PUBLISH_ENABLED_JS,
+)
 
 # Load environment variables
 load_dotenv()
 
+CAPTION_REQUIREMENTS = """Requirements:
+- Maximum 150 characters
+- Include 5-8 trending hashtags
+- Use emojis to make it engaging
+- Make it viral-worthy and attention-grabbing
+- Focus on engagement (likes, comments, shares)"""
+
+
+def parse_batch_captions(text, expected):
+    """Split a batch Gemini answer (JSON array, or numbered lines) into captions"""
+    text = text.strip()
+    # Gemini likes to wrap JSON in ```json fences
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("\n") + 1:] if "\n" in text else text
+    
+    try:
+        start, end = text.index("["), text.rindex("]") + 1
+        captions = json.loads(text[start:end])
+        if isinstance(captions, list):
+            captions = [str(c).strip() if c else None for c in captions]
+            return (captions + [None] * expected)[:expected]
+    except ValueError:
+        pass
+    
+    captions = [None] * expected
+    for line in text.splitlines():
+        match = re.match(r"\s*(\d+)[.):]\s*(.+)", line)
+        if match and 1 <= int(match.group(1)) <= expected:
+            captions[int(match.group(1)) - 1] = match.group(2).strip().strip('"')
+    return captions
+
+
+# Select everything in the caption editor (textarea or contenteditable) so one insert replaces it
+SELECT_EDITOR_JS = """
+var el = document.querySelector(arguments[0]);
+if (!el) return false;
+el.focus();
+if (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') {
+    el.select();
+} else {
+    var range = document.createRange();
+    range.selectNodeContents(el);
+    var selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+}
+return true;
+"""
+
+# In-page fallback when CDP isn't available; fires the same input events as typing
+EXEC_INSERT_JS = "return document.execCommand('insertText', false, arguments[0]);"
+
+READ_EDITOR_JS = """
+var el = document.querySelector(arguments[0]);
+if (!el) return null;
+return (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') ? el.value : el.innerText;
+"""
+
+
+def caption_length_bucket(caption):
+    """Coarse caption length label for metrics"""
+    for limit in (50, 100, 150, 300):
+        if len(caption) <= limit:
+            return f"<={limit}"
+    return ">300"
+
+
+def same_text(actual, expected):
+    """Editor text matches the caption (ignoring whitespace differences)"""
+    return actual is not None and " ".join(actual.split()) == " ".join(expected.split())
+
+
 class TikTokUploader:
-    def __init__(self):
+    # Overridden by the offline benchmark to point at the local stand-in site
+    base_url = "https://www.tiktok.com"
+    # Overall budget for one video (upload + processing + caption + post)
+    upload_timeout = 300
+    # Longest we wait for TikTok to finish processing the uploaded file
+    processing_timeout = 180
+    # Upload counts as stalled below this many bytes/s for stall_seconds
+    min_upload_throughput = 50 * 1024
+    stall_seconds = 30
+    # Fresh file selections after a stall
+    upload_retries = 2
+
+    def __init__(self, cookies_file=None, user_data_dir=None, account=DEFAULT_ACCOUNT, interactive=True):
         self.driver = None
-        self.cookies_file = "config/cookies.json"
+        self.account = account
+        # Headless batch runs set this to False: never wait on stdin or a human
+        self.interactive = interactive
+        # Why the last login/upload needs a retry instead of a human (non-interactive only)
+        self.retry_reason = None
+        self.cookies_file = cookies_file or cookies_path(account)
+        self.user_data_dir = user_data_dir
+        self.selectors = SelectorRegistry()
+        self.session_cache = SessionCache()
+        self.caption_cache = CaptionCache()
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
         
-        # Ensure config directory exists
-        os.makedirs("config", exist_ok=True)
-        
         # Initialize cookies file if not exists
         if not os.path.exists(self.cookies_file):
-            with open(self.cookies_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+            save_file(self.cookies_file, [])
             print(f"📝 Created empty {self.cookies_file}")
         
-        # Configure Gemini AI
-        if self.gemini_api_key:
-            genai.configure(api_key=self.gemini_api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        else:
-            self.model = None
+        # Gemini AI is configured on first use; deadlines, retries and the circuit breaker live in the client
+        self.gemini = GeminiCaptionClient(self.gemini_api_key)
+        if not self.gemini_api_key:
             print("⚠️ GEMINI_API_KEY not found, will use fallback captions")
 
-    def setup_driver(self):
+    @metrics.timed("setup_driver")
+    def setup_driver(self, detach=True, debugging_port=None, headless=False, lean=False):
         """Setup Chrome driver with optimal settings"""
         print("🔧 Setting up Chrome driver...")
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
         
         chrome_options = Options()
         chrome_options.add_argument("--no-sandbox")
@@ -62,17 +163,38 @@ class TikTokUploader:
         
         # Additional options to prevent stuck
         chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+        disabled_features = ["VizDisplayCompositor"] + (LEAN_DISABLED_FEATURES if lean else [])
+        chrome_options.add_argument(f"--disable-features={','.join(disabled_features)}")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--no-first-run")
         chrome_options.add_argument("--disable-default-apps")
         
+        # Separate profile per worker so parallel browsers don't share state
+        if self.user_data_dir:
+            os.makedirs(self.user_data_dir, exist_ok=True)
+            chrome_options.add_argument(f"--user-data-dir={os.path.abspath(self.user_data_dir)}")
+        
+        if lean:
+            # Headless, no images/autoplay/fonts/trackers, tighter memory limits
+            for argument in LEAN_ARGUMENTS:
+                chrome_options.add_argument(argument)
+            chrome_options.add_experimental_option("prefs", LEAN_PREFS)
+        elif headless:
+            chrome_options.add_argument("--headless=new")
+        
+        # Expose DevTools so a later process can re-attach to this browser
+        if debugging_port:
+            chrome_options.add_argument(f"--remote-debugging-port={debugging_port}")
+        
         # Keep browser open for manual interaction
-        chrome_options.add_experimental_option("detach", True)
+        chrome_options.add_experimental_option("detach", detach)
         
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            if lean:
+                block_requests(self.driver)
+            install_progress_hook(self.driver)
             
             # Set window size
             self.driver.set_window_size(1200, 800)
@@ -82,192 +204,235 @@ class TikTokUploader:
             print(f"❌ Failed to setup driver: {e}")
             return False
 
+    @metrics.timed("attach_driver")
+    def attach_driver(self, debugger_address):
+        """Attach to an already running Chrome (started with --remote-debugging-port)"""
+        print(f"🔌 Attaching to Chrome at {debugger_address}...")
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
+        # debuggerAddress can't be combined with launch-only options like excludeSwitches/detach
+        chrome_options = Options()
+        chrome_options.debugger_address = debugger_address
+        
+        try:
+            self.driver = webdriver.Chrome(options=chrome_options)
+            install_progress_hook(self.driver)
+            print("✅ Attached to running Chrome")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to attach to Chrome: {e}")
+            return False
+
     def reset_cookies(self):
         """Reset cookies file to empty array"""
         try:
-            with open(self.cookies_file, 'w', encoding='utf-8') as f:
-                json.dump([], f, indent=2)
+            save_file(self.cookies_file, [])
+            self.session_cache.invalidate(self.cookies_file)
             print(f"🔄 Reset {self.cookies_file} to empty")
         except Exception as e:
             print(f"⚠️ Failed to reset cookies: {e}")
 
     def save_cookies(self):
-        """Save cookies to config/cookies.json"""
+        """Save browser cookies to the vault (locked, atomic rename)"""
         try:
-            cookies = self.driver.get_cookies()
-            # Filter out invalid cookies
-            valid_cookies = []
-            for cookie in cookies:
-                if 'name' in cookie and 'value' in cookie and cookie['name'] and cookie['value']:
-                    valid_cookies.append(cookie)
-            
-            with open(self.cookies_file, 'w', encoding='utf-8') as f:
-                json.dump(valid_cookies, f, indent=2, ensure_ascii=False)
-            print(f"💾 Saved {len(valid_cookies)} cookies to {self.cookies_file}")
+            cookies = valid_cookies(self.driver.get_cookies())
+            save_file(self.cookies_file, cookies)
+            print(f"💾 Saved {len(cookies)} cookies to {self.cookies_file}")
+            
+            # Only called after a confirmed login, so these cookies are known-good
+            if check_cookies_offline(cookies)[0]:
+                self.session_cache.mark_verified(self.cookies_file, cookies)
         except Exception as e:
             print(f"⚠️ Failed to save cookies: {e}")
 
+    def read_cookies(self):
+        """Read saved cookies without touching the browser"""
+        return load_file(self.cookies_file)
+
     def load_cookies(self):
-        """Load cookies from config/cookies.json"""
+        """Inject saved cookies in one CDP call (works before the first navigation)"""
+        cookies = valid_cookies(self.read_cookies())
+        if not cookies:
+            print(f"📝 {self.cookies_file} is empty, need manual login")
+            return False
+        
         try:
-            if not os.path.exists(self.cookies_file):
-                print(f"📝 {self.cookies_file} not found, will create new one")
-                return False
-                
-            with open(self.cookies_file, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
-            
-            # Check if cookies list is not empty
-            if not cookies or len(cookies) == 0:
-                print(f"📝 {self.cookies_file} is empty, need manual login")
-                return False
-            
-            # Add cookies to driver
-            loaded_count = 0
-            for cookie in cookies:
-                try:
-                    # Ensure required cookie fields exist
-                    if 'name' in cookie and 'value' in cookie and cookie['name'] and cookie['value']:
-                        # Remove problematic fields
-                        clean_cookie = {
-                            'name': cookie['name'],
-                            'value': cookie['value'],
-                            'domain': cookie.get('domain', '.tiktok.com'),
-                            'path': cookie.get('path', '/'),
-                        }
-                        
-                        # Add optional fields if they exist and are valid
-                        if 'secure' in cookie:
-                            clean_cookie['secure'] = cookie['secure']
-                        if 'httpOnly' in cookie:
-                            clean_cookie['httpOnly'] = cookie['httpOnly']
-                            
-                        self.driver.add_cookie(clean_cookie)
-                        loaded_count += 1
-                except Exception as cookie_error:
-                    print(f"⚠️ Failed to add cookie {cookie.get('name', 'unknown')}: {cookie_error}")
-                    continue
-            
-            if loaded_count > 0:
-                print(f"🍪 Loaded {loaded_count} cookies from {self.cookies_file}")
-                return True
-            else:
-                print(f"❌ No valid cookies loaded from {self.cookies_file}")
-                return False
-                
+            loaded_count = inject_cookies(self.driver, cookies)
         except Exception as e:
-            print(f"⚠️ Failed to load cookies: {e}")
-            return False
+            print(f"⚠️ CDP cookie injection failed ({e}), adding cookies one by one")
+            loaded_count = self.add_cookies_slow(cookies)
+        
+        if loaded_count > 0:
+            print(f"🍪 Loaded {loaded_count} cookies from {self.cookies_file}")
+            return True
+        print(f"❌ No valid cookies loaded from {self.cookies_file}")
+        return False
+
+    def add_cookies_slow(self, cookies):
+        """WebDriver add_cookie fallback; needs a page on the cookie domain first"""
+        # robots.txt is the cheapest page on the TikTok domain
+        self.driver.get(f"{self.base_url}/robots.txt")
+        loaded_count = 0
+        for cookie in cookies:
+            try:
+                clean_cookie = {
+                    'name': cookie['name'],
+                    'value': cookie['value'],
+                    'domain': cookie.get('domain', '.tiktok.com'),
+                    'path': cookie.get('path', '/'),
+                }
+                if 'secure' in cookie:
+                    clean_cookie['secure'] = cookie['secure']
+                if 'httpOnly' in cookie:
+                    clean_cookie['httpOnly'] = cookie['httpOnly']
+                self.driver.add_cookie(clean_cookie)
+                loaded_count += 1
+            except Exception as cookie_error:
+                print(f"⚠️ Failed to add cookie {cookie.get('name', 'unknown')}: {cookie_error}")
+        return loaded_count
 
     def generate_ai_caption(self, video_description=""):
         """Generate AI caption using Gemini"""
         try:
             print("🤖 Generating AI caption...")
             
-            if not self.model:
-                return self.get_fallback_caption()
+            # A cached caption is still good while Gemini is down or has no key
+            cached = self.caption_cache.get(video_description)
+            if cached:
+                print(f"🗃️ Cached caption: {cached}")
+                return cached
+            
+            if not self.gemini.available():
+                return self.get_fallback_caption(video_description)
             
             prompt = f"""Create a catchy TikTok caption for a video about: "{video_description}".
 
-Requirements:
-- Maximum 150 characters
-- Include 5-8 trending hashtags
-- Use emojis to make it engaging
-- Make it viral-worthy and attention-grabbing
-- Focus on engagement (likes, comments, shares)
+{CAPTION_REQUIREMENTS}
 
 Just return the caption, nothing else."""
 
-            response = self.model.generate_content(prompt)
-            caption = response.text.strip()
-            
-            if caption and len(caption) <= 200:
+            started = time.time()
+            with metrics.span("gemini", batch=1):
+                text = self.gemini.generate(prompt)
+            self.caption_cache.record_latency(time.time() - started)
+            # Over-length answers are trimmed on hashtag/emoji boundaries, not thrown away
+            caption = trim_caption(text)
+            
+            if caption:
                 print(f"✅ AI Generated: {caption}")
+                self.caption_cache.put(video_description, caption)
                 return caption
             else:
-                raise Exception("Invalid caption length")
+                raise Exception("Empty caption")
                 
         except Exception as e:
             print(f"❌ AI caption failed: {e}")
-            return self.get_fallback_caption()
-
-    def get_fallback_caption(self):
-        """Get random fallback caption"""
-        import random
-        fallbacks = [
-            "🔥 This hits different! Drop a ❤️ #viral #fyp #trending #foryou",
-            "✨ POV: You found the perfect video #viral #fyp #trending #amazing",
-            "🚀 This is about to blow up! #viral #fyp #trending #content #fire",
-            "💯 Can't stop watching this! #viral #fyp #trending #addictive #wow",
-            "😱 This gave me chills... #viral #fyp #trending #mindblown",
-            "🎯 Exactly what I needed to see #viral #fyp #trending #relatable"
-        ]
-        caption = random.choice(fallbacks)
+            return self.get_fallback_caption(video_description)
+
+    def generate_ai_captions(self, video_descriptions):
+        """Generate captions for many videos with a single Gemini request"""
+        captions = [None] * len(video_descriptions)
+        
+        # Serve from cache first; identical descriptions are only asked once
+        pending = {}
+        for i, description in enumerate(video_descriptions):
+            cached = self.caption_cache.get(description)
+            if cached:
+                captions[i] = cached
+            else:
+                pending.setdefault(self.caption_cache.key(description), (description, []))[1].append(i)
+        
+        todo = list(pending.values())
+        if todo and self.gemini.available():
+            print(f"🤖 Generating {len(todo)} AI captions in one request...")
+            numbered = "\n".join(f'{n}. "{description}"' for n, (description, _) in enumerate(todo, 1))
+            prompt = f"""Create a catchy TikTok caption for each of these {len(todo)} videos:
+{numbered}
+
+{CAPTION_REQUIREMENTS}
+
+Return ONLY a JSON array of {len(todo)} strings, one caption per video, in the same order."""
+            
+            try:
+                started = time.time()
+                with metrics.span("gemini", batch=len(todo)):
+                    text = self.gemini.generate(prompt)
+                self.caption_cache.record_latency(time.time() - started)
+                
+                for (description, indexes), caption in zip(todo, parse_batch_captions(text, len(todo))):
+                    caption = trim_caption(caption) if caption else None
+                    if caption:
+                        self.caption_cache.put(description, caption)
+                        for i in indexes:
+                            captions[i] = caption
+            except Exception as e:
+                print(f"❌ Batch AI caption failed: {e}")
+        
+        captions = [caption or self.get_fallback_caption(description)
+                    for caption, description in zip(captions, video_descriptions)]
+        self.print_caption_stats()
+        return captions
+
+    def print_caption_stats(self):
+        """Show cache hit rate and Gemini latency"""
+        stats = self.caption_cache.stats()
+        print(f"📊 Caption cache: {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%}) | Gemini calls: {stats['gemini_calls']} "
+              f"(avg {stats['avg_latency']:.2f}s)")
+
+    def get_fallback_caption(self, video_description=""):
+        """Offline caption from the local caption engine (matches the description)"""
+        caption = generate_caption(video_description)
         print(f"🔄 Using fallback: {caption}")
         return caption
 
+    @metrics.timed("login")
     def login_tiktok(self):
         """Login to TikTok with improved cookie handling"""
+        self.retry_reason = None
         try:
             print("🌐 Navigating to TikTok...")
             
-            # First go to TikTok main page
-            print("🔄 Loading TikTok main page...")
-            self.driver.get("https://www.tiktok.com")
-            time.sleep(5)
-            
-            # Check if we can load cookies
-            cookies_loaded = self.load_cookies()
+            # Check saved session offline first (expiry + required session cookies)
+            cookies = self.read_cookies()
+            session_ok, reason = check_cookies_offline(cookies)
+            cookies_loaded = False
+            
+            if session_ok and self.session_cache.is_fresh(self.cookies_file, cookies):
+                if self.login_with_cached_session():
+                    metrics.annotate(path="cached_session")
+                    return True
+            elif session_ok:
+                # Cookies go in before the first navigation, so the upload page
+                # itself is the login check (no homepage load + refresh)
+                cookies_loaded = self.load_cookies()
+            else:
+                # No point injecting a dead session
+                print(f"📝 Saved session unusable ({reason}), need manual login")
             
-            if cookies_loaded:
-                print("🔄 Refreshing with cookies...")
-                self.driver.refresh()
-                time.sleep(5)
-                
-                # Check if login worked by looking for user indicators
-                try:
-                    # Look for profile or upload indicators
-                    profile_indicators = [
-                        "[data-e2e='profile-icon']",
-                        "[data-e2e='upload-icon']", 
-                        "a[href*='/upload']",
-                        "svg[data-e2e='upload-icon']"
-                    ]
-                    
-                    for indicator in profile_indicators:
-                        try:
-                            element = WebDriverWait(self.driver, 3).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, indicator))
-                            )
-                            if element:
-                                print("✅ Already logged in! (Found profile indicator)")
-                                # Now go to upload page
-                                print("🔄 Navigating to upload page...")
-                                self.driver.get("https://www.tiktok.com/upload")
-                                time.sleep(5)
-                                return True
-                        except TimeoutException:
-                            continue
-                            
-                except Exception as e:
-                    print(f"⚠️ Could not verify login status: {e}")
-            
-            # If not logged in, go to upload page for login
-            print("🔄 Going to upload page for login...")
-            self.driver.get("https://www.tiktok.com/upload")
-            time.sleep(5)
+            print("🔄 Going to upload page...")
+            self.driver.get(f"{self.base_url}/upload")
+            wait_for_page_load(self.driver, 15)
             
             # Check if upload page is accessible (means logged in)
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-                )
-                print("✅ Already logged in! (Upload page accessible)")
+            if self.selectors.find(self.driver, 'upload', 10):
+                if cookies_loaded:
+                    print("✅ Already logged in! (Saved cookies)")
+                    metrics.annotate(path="cookies")
+                    self.session_cache.mark_verified(self.cookies_file, cookies)
+                else:
+                    print("✅ Already logged in! (Upload page accessible)")
+                    metrics.annotate(path="upload_page")
                 return True
-            except TimeoutException:
-                pass
             
             # Need manual login
+            if not self.interactive:
+                print("❌ Saved session not accepted and manual login is disabled")
+                metrics.annotate(path="manual_required")
+                self.retry_reason = "manual login required"
+                return False
+            
             print("\n" + "="*50)
             print("🔑 MANUAL LOGIN REQUIRED")
             print("="*50)
@@ -279,44 +444,8 @@ Just return the caption, nothing else."""
             print("   (Script will detect when you're logged in)")
             print("="*50)
             
-            # Wait for successful login with better detection
-            login_success = False
-            max_attempts = 60  # 5 minutes total
-            
-            for attempt in range(max_attempts):
-                try:
-                    # Check multiple indicators of successful login
-                    success_indicators = [
-                        "input[type='file']",  # Upload input
-                        "[data-e2e='upload-btn']",  # Upload button
-                        "div[data-e2e='upload-container']",  # Upload container
-                        ".upload-btn",  # Upload button class
-                    ]
-                    
-                    for indicator in success_indicators:
-                        try:
-                            element = self.driver.find_element(By.CSS_SELECTOR, indicator)
-                            if element and element.is_displayed():
-                                login_success = True
-                                break
-                        except NoSuchElementException:
-                            continue
-                    
-                    if login_success:
-                        break
-                        
-                    # Show progress
-                    if attempt % 10 == 0:
-                        remaining = max_attempts - attempt
-                        print(f"⏳ Still waiting... ({remaining*5} seconds remaining)")
-                    
-                    time.sleep(5)
-                    
-                except Exception as e:
-                    print(f"⚠️ Login check error: {e}")
-                    time.sleep(5)
-            
-            if login_success:
+            metrics.annotate(path="manual")
+            if self.wait_for_manual_login(timeout=300):
                 print("✅ Login successful!")
                 print("💾 Saving cookies for future use...")
                 self.save_cookies()
@@ -329,8 +458,67 @@ Just return the caption, nothing else."""
             print(f"❌ Login error: {e}")
             return False
 
+    def login_with_cached_session(self):
+        """Skip the homepage round trip when the session was verified recently"""
+        print("⚡ Session verified recently, going straight to upload page...")
+        if self.load_cookies():
+            self.driver.get(f"{self.base_url}/upload")
+            if self.selectors.find(self.driver, 'upload', 15):
+                print("✅ Already logged in! (Cached session)")
+                self.session_cache.mark_verified(self.cookies_file, self.read_cookies())
+                return True
+        
+        print("⚠️ Cached session rejected, need to login again")
+        self.session_cache.invalidate(self.cookies_file)
+        return False
+
+    def wait_for_manual_login(self, timeout=300):
+        """Wait for login to finish: upload page mounts or a new session cookie appears"""
+        deadline = Deadline(timeout)
+        # Stale cookies may already be in the browser, so only a *new* session counts
+        initial_session = session_fingerprint(self.driver.get_cookies())
+        next_report = 0
+        
+        while not deadline.expired():
+            try:
+                # Returns the moment an upload-page element mounts (DOM mutation or navigation)
+                if wait_for_any_selector(self.driver, self.selectors.ranked('login_success'), deadline.remaining(2)):
+                    return True
+                
+                browser_cookies = self.driver.get_cookies()
+                if check_cookies_offline(browser_cookies)[0] and session_fingerprint(browser_cookies) != initial_session:
+                    # TikTok usually redirects to For You after login
+                    print("🍪 Session cookie detected")
+                    self.open_upload_page()
+                    return True
+                
+                # Show progress
+                if deadline.elapsed() >= next_report:
+                    print(f"⏳ Still waiting... ({deadline.remaining():.0f} seconds remaining)")
+                    next_report += 50
+                    
+            except Exception as e:
+                print(f"⚠️ Login check error: {e}")
+                time.sleep(1)
+        
+        return False
+
+    @metrics.timed("open_upload_page")
+    def open_upload_page(self):
+        """Navigate to a fresh upload page (used between videos in one session)"""
+        try:
+            self.driver.get(f"{self.base_url}/upload")
+            return bool(self.selectors.find(self.driver, 'upload', 20))
+        except Exception as e:
+            print(f"❌ Failed to open upload page: {e}")
+            return False
+
+    @metrics.timed("upload_video")
     def upload_video(self, video_path, caption=""):
         """Upload video to TikTok"""
+        from selenium.webdriver.common.by import By
+        deadline = Deadline(self.upload_timeout)
+        self.retry_reason = None
         try:
             # Validate video file
             if not os.path.exists(video_path):
@@ -338,95 +526,161 @@ Just return the caption, nothing else."""
             
             file_size = os.path.getsize(video_path) / (1024 * 1024)  # MB
             print(f"📁 Video: {os.path.basename(video_path)} ({file_size:.1f}MB)")
+            metrics.annotate(size_mb=round(file_size, 1))
             
-            # Find and upload file
-            print("📤 Uploading video...")
-            file_input = WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-            )
-            
-            file_input.send_keys(os.path.abspath(video_path))
-            print("✅ Video file uploaded")
+            for attempt in range(self.upload_retries + 1):
+                if attempt:
+                    print(f"🔁 Upload stalled, selecting the file again ({attempt}/{self.upload_retries})...")
+                    if not self.open_upload_page():
+                        raise Exception("Could not reopen upload page")
+                
+                # Find and upload file
+                print("📤 Uploading video...")
+                with metrics.span("upload.send_file"):
+                    upload_selector = self.selectors.find(self.driver, 'upload', deadline.remaining(20))
+                    if not upload_selector:
+                        raise Exception("Upload input not found")
+                    file_input = self.driver.find_element(By.CSS_SELECTOR, upload_selector)
+                    
+                    file_input.send_keys(os.path.abspath(video_path))
+                print("✅ Video file uploaded")
+                
+                # Follow the upload; finishes as soon as the page says it's processed
+                print("⏳ Waiting for video processing...")
+                with metrics.span("upload.processing", attempt=attempt) as processing:
+                    outcome = self.wait_for_upload(os.path.getsize(video_path), deadline)
+                    processing.set(ok=outcome == "done", outcome=outcome)
+                if outcome != "stalled":
+                    break
             
-            # Wait for video processing
-            print("⏳ Waiting for video processing...")
-            time.sleep(15)  # Increased wait time
+            if outcome == "done":
+                print(f"✅ Video processed ({deadline.elapsed():.1f}s)")
+            elif outcome == "stalled":
+                raise Exception("Upload stalled, giving up after retries")
+            else:
+                print("⚠️ Processing not confirmed, continuing anyway")
             
             # Add caption if provided
             if caption and caption.strip():
-                self.add_caption(caption)
+                self.add_caption(caption, deadline)
             
             # Post the video
-            return self.post_video()
+            return self.post_video(deadline)
             
         except Exception as e:
             print(f"❌ Upload error: {e}")
             return False
 
-    def add_caption(self, caption):
+    def wait_for_upload(self, total_bytes, deadline):
+        """Track bytes sent until the page reports done; returns 'done', 'stalled' or 'timeout'"""
+        phase = Deadline(deadline.remaining(self.processing_timeout))
+        progress = UploadProgress(total_bytes, self.min_upload_throughput, self.stall_seconds)
+        next_report = 0
+        
+        while not phase.expired():
+            # Short in-browser wait: returns the moment processing completes
+            if wait_for_condition(self.driver, UPLOAD_COMPLETE_JS, phase.remaining(2)):
+                metrics.annotate(throughput=round(progress.throughput()))
+                return "done"
+            
+            now = time.time()
+            progress.update(now, read_uploaded_bytes(self.driver, total_bytes))
+            if now >= next_report:
+                state = "processing" if progress.complete() else progress.describe()
+                print(f"📶 {state}")
+                next_report = now + 5
+            if progress.stalled():
+                print(f"⚠️ Upload stalled: {progress.describe()}")
+                metrics.annotate(stalled_at=round(progress.loaded))
+                return "stalled"
+        
+        return "timeout"
+
+    @metrics.timed("add_caption")
+    def add_caption(self, caption, deadline=None):
         """Add caption to video"""
+        deadline = deadline or Deadline(60)
         try:
             print("✍️ Adding caption...")
             
-            # Multiple selectors for caption input
-            caption_selectors = [
-                "div[contenteditable='true']",
-                "div[data-text='true']", 
-                "textarea[placeholder*='caption']",
-                "div[role='textbox']",
-                "[data-e2e='editor']",
-                ".public-DraftEditor-content",
-                "div[data-contents='true']",
-                "[data-e2e='video-caption']"
-            ]
-            
-            caption_input = None
-            for selector in caption_selectors:
-                try:
-                    caption_input = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"✅ Found caption input: {selector}")
-                    break
-                except TimeoutException:
-                    continue
-            
-            if caption_input:
-                caption_input.click()
-                time.sleep(1)
-                
-                # Clear existing text
-                caption_input.send_keys("\ue009a")  # Ctrl+A
-                caption_input.send_keys("\ue017")   # Delete
-                time.sleep(1)
-                
-                # Type new caption
-                caption_input.send_keys(caption)
-                print(f"✅ Caption added: {caption}")
-                time.sleep(2)
-            else:
+            # Multiple selectors for caption input, probed together in learned order;
+            # returns as soon as any of them mounts
+            selector = self.selectors.find(self.driver, 'caption', deadline.remaining(15), clickable=True)
+            if not selector:
                 print("⚠️ Could not find caption input field")
+                return False
+            print(f"✅ Found caption input: {selector}")
+            
+            with metrics.span("caption.entry", chars=len(caption), length=caption_length_bucket(caption)) as entry:
+                # One insert replaces the whole editor (emoji-safe, no per-key round trips)
+                method = self.insert_caption(selector, caption)
+                if not method:
+                    # Slow path: keystrokes (non-BMP emoji may get dropped here)
+                    self.type_caption(selector, caption)
+                    method = "send_keys"
+                ok = same_text(self.driver.execute_script(READ_EDITOR_JS, selector), caption)
+                entry.set(method=method, ok=ok)
+            
+            metrics.annotate(method=method)
+            if ok:
+                print(f"✅ Caption added ({method}): {caption}")
+            else:
+                print(f"⚠️ Caption entered ({method}) but editor text differs from the requested caption")
+            return ok
                 
         except Exception as e:
             print(f"⚠️ Caption error: {e}")
+            return False
 
-    def post_video(self):
+    def insert_caption(self, selector, caption):
+        """Replace editor contents in one operation; returns the method used or None"""
+        for method in ("cdp", "execCommand"):
+            try:
+                if not self.driver.execute_script(SELECT_EDITOR_JS, selector):
+                    return None
+                if method == "cdp":
+                    self.driver.execute_cdp_cmd("Input.insertText", {"text": caption})
+                else:
+                    self.driver.execute_script(EXEC_INSERT_JS, caption)
+                if same_text(self.driver.execute_script(READ_EDITOR_JS, selector), caption):
+                    return method
+            except Exception as e:
+                print(f"⚠️ Caption insert via {method} failed: {e}")
+        return None
+
+    def type_caption(self, selector, caption):
+        """Type the caption key by key"""
+        from selenium.webdriver.common.by import By
+        caption_input = self.driver.find_element(By.CSS_SELECTOR, selector)
+        caption_input.click()
+        
+        # Clear existing text
+        caption_input.send_keys("\ue009a")  # Ctrl+A
+        caption_input.send_keys("\ue017")   # Delete
+        
+        # Type new caption
+        caption_input.send_keys(caption)
+
+    @metrics.timed("post_video")
+    def post_video(self, deadline=None):
         """Post the video using multiple strategies"""
+        from selenium.webdriver.common.by import By
+        deadline = deadline or Deadline(60)
         try:
             print("🚀 Attempting to post video...")
-            time.sleep(3)
+            wait_for_condition(self.driver, PUBLISH_ENABLED_JS, deadline.remaining(10))
             
             # Strategy 1: data-e2e selector
-            try:
-                post_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[data-e2e="publish-button"]'))
-                )
+            publish_selector = self.selectors.find(self.driver, 'publish', deadline.remaining(10), clickable=True)
+            if publish_selector:
+                post_button = self.driver.find_element(By.CSS_SELECTOR, publish_selector)
+                page_url = self.driver.current_url
                 post_button.click()
                 print("🚀 Posted successfully! (Strategy 1: data-e2e)")
-                time.sleep(5)
+                metrics.annotate(strategy="data-e2e")
+                wait_for_post_settled(self.driver, page_url, deadline.remaining(15))
                 return True
-            except TimeoutException:
-                print("Strategy 1 failed, trying next...")
+            print("Strategy 1 failed, trying next...")
             
             # Strategy 2: Button with primary classes
             try:
@@ -437,20 +691,30 @@ Just return the caption, nothing else."""
                     
                     if ("primary" in button_class and "large" in button_class) or \
                        "post" in button_text or "publish" in button_text:
+                        page_url = self.driver.current_url
                         button.click()
                         print("🚀 Posted successfully! (Strategy 2: Button classes)")
-                        time.sleep(5)
+                        metrics.annotate(strategy="button-classes")
+                        wait_for_post_settled(self.driver, page_url, deadline.remaining(15))
                         return True
             except Exception as e:
                 print(f"Strategy 2 failed: {e}")
             
             # Strategy 3: Manual posting
             print("⚠️ Automatic posting failed")
+            if not self.interactive:
+                # Nobody to click the button; leave the job for a later run
+                print("🔁 Marked for retry (manual posting disabled)")
+                metrics.annotate(strategy="retry")
+                self.retry_reason = "automatic posting failed"
+                return False
+            
             print("📝 Video uploaded and caption added successfully!")
             print("🖱️ Please click the 'Post' button manually")
             print("⏳ Browser will stay open for manual posting...")
             
             # Keep browser open for manual posting
+            metrics.annotate(strategy="manual")
             input("Press Enter after you manually click 'Post' button...")
             return True
             
@@ -460,6 +724,7 @@ Just return the caption, nothing else."""
 
     def close(self):
         """Close the browser"""
+        self.selectors.close()
         if self.driver:
             self.driver.quit()
 
@@ -471,6 +736,7 @@ def main():
     print("-" * 50)
     
     uploader = TikTokUploader()
+    ledger = UploadLedger()
     
     try:
         # Check if user wants to reset cookies
@@ -480,10 +746,6 @@ def main():
                 uploader.reset_cookies()
                 print("🔄 Cookies reset, will need fresh login")
         
-        # Setup driver
-        if not uploader.setup_driver():
-            return
-        
         # Get video file path
         while True:
             video_path = input("📁 Enter video file path: ").strip().strip('"')
@@ -495,25 +757,42 @@ def main():
                 continue
             
             # Check file extension
-            valid_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.webm']
-            if not any(video_path.lower().endswith(ext) for ext in valid_extensions):
+            if not any(video_path.lower().endswith(ext) for ext in VALID_EXTENSIONS):
                 print("❌ Invalid video format. Use: .mp4, .mov, .avi, .mkv, .webm")
                 continue
+            
+            # Pre-flight: reject bad files before any browser work
+            report = inspect_video(video_path)
+            print(format_report(report))
+            if not report['ok']:
+                continue
+            
+            # Skip videos this account already posted (matched by content, not name)
+            job = ledger.begin(video_path, uploader.account)
+            if job is None:
+                print("⏭️ This video was already posted to this account. Choose another one.")
+                continue
             break
         
-        # Caption option
-        print("\n📝 Caption Options:")
-        print("1. 🤖 Generate with AI (Gemini)")
-        print("2. ✍️ Write custom caption")
-        print("3. 🚫 No caption")
-        
-        while True:
-            choice = input("Choose option (1-3): ").strip()
-            if choice in ['1', '2', '3']:
-                break
-            print("❌ Please enter 1, 2, or 3")
-        
         caption = ""
+        if job['caption']:
+            # Interrupted earlier: reuse the caption instead of regenerating it
+            choice = None
+            caption = job['caption']
+            print(f"♻️ Resuming previous {job['state']} job with saved caption")
+        else:
+            # Caption option
+            print("\n📝 Caption Options:")
+            print("1. 🤖 Generate with AI (Gemini)")
+            print("2. ✍️ Write custom caption")
+            print("3. 🚫 No caption")
+            
+            while True:
+                choice = input("Choose option (1-3): ").strip()
+                if choice in ['1', '2', '3']:
+                    break
+                print("❌ Please enter 1, 2, or 3")
+        
         if choice == '1':
             video_desc = input("📝 Describe your video (for AI context): ").strip()
             if not video_desc:
@@ -522,6 +801,9 @@ def main():
         elif choice == '2':
             caption = input("✍️ Enter your caption: ").strip()
         
+        if caption:
+            ledger.mark(job['id'], CAPTIONED, caption=caption)
+        
         # Display summary
         print("\n📋 Upload Summary:")
         print("-" * 40)
@@ -539,6 +821,10 @@ def main():
             print("❌ Upload cancelled")
             return
         
+        # Setup driver (only after the video passed pre-flight)
+        if not uploader.setup_driver():
+            return
+        
         # Login to TikTok
         print("\n🔑 Logging in to TikTok...")
         if not uploader.login_tiktok():
@@ -547,7 +833,11 @@ def main():
         
         # Upload video
         print("\n📤 Starting upload...")
+        if not ledger.claim(job['id']):
+            print("⏭️ Another worker is uploading this video right now")
+            return
         success = uploader.upload_video(video_path, caption)
+        ledger.mark(job['id'], POSTED if success else FAILED, error=None if success else "upload failed")
         
         if success:
             print("\n🎉 SUCCESS! Video uploaded to TikTok!")
@@ -563,6 +853,7 @@ def main():
         # Keep browser open for verification
         input("\nPress Enter to close browser...")
         uploader.close()
+        ledger.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+📒 Upload Ledger - Catatan SQLite semua video yang sudah/akan di-upload
+- Setiap job disimpan dengan hash isi video + akun + status
+  (queued → captioned → uploading → posted / failed / retry)
+- Video yang sudah posted di akun yang sama otomatis dilewati
+- Job yang terputus (crash) dilanjutkan dari fase terakhir, caption tidak dibuat ulang
+- Upload di-claim secara atomik, jadi dua worker tidak meng-upload file yang sama
+
+Usage:
+    python upload_ledger.py            # ringkasan status
+    python upload_ledger.py --pending  # job yang belum selesai
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import argparse
+
+LEDGER_FILE = "config/upload_ledger.db"
+
+QUEUED = "queued"
+CAPTIONED = "captioned"
+UPLOADING = "uploading"
+POSTED = "posted"
+FAILED = "failed"
+# Needs something a headless run can't do (manual login/post); safe to run again later
+RETRY = "retry"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# An UPLOADING row untouched this long belongs to a crashed run and may be claimed again
+# (well past TikTokUploader.upload_timeout)
+STALE_UPLOAD_SECONDS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    video_path TEXT NOT NULL,
+    state TEXT NOT NULL,
+    caption TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (account, content_hash)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, account);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+"""
+
+
+def content_hash(path):
+    """SHA-256 of the file contents, read in 1MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadLedger:
+    """Per-video job state shared by every upload entry point"""
+
+    def __init__(self, db_path=LEDGER_FILE):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Several worker processes write here; wait for locks instead of failing
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def hash_file(self, path):
+        """Content hash, cached by (path, size, mtime) so unchanged files aren't re-read"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self.conn.execute(
+            "SELECT content_hash FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return row['content_hash']
+
+        digest = content_hash(path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, digest),
+            )
+        return digest
+
+    def begin(self, video_path, account):
+        """Register (or resume) the job for a video; returns the job row, or None if already posted"""
+        digest = self.hash_file(video_path)
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO jobs (account, content_hash, video_path, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (account, digest, os.path.abspath(video_path), QUEUED, now, now),
+            )
+            job = self.conn.execute(
+                "SELECT * FROM jobs WHERE account = ? AND content_hash = ?", (account, digest)
+            ).fetchone()
+            if job['state'] == POSTED:
+                return None
+            # Same content may have been moved/renamed since the last run
+            self.conn.execute(
+                "UPDATE jobs SET video_path = ? WHERE id = ?", (os.path.abspath(video_path), job['id'])
+            )
+        return dict(job, video_path=os.path.abspath(video_path))
+
+    def mark(self, job_id, state, caption=None, error=None):
+        """Move a job to a new state (caption is kept unless a new one is given).
+        CAPTIONED never takes a job back from a worker that is uploading it."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, caption = COALESCE(?, caption), error = ?, "
+                "attempts = attempts + ?, updated_at = ? WHERE id = ? AND NOT (? = ? AND state = ?)",
+                (state, caption, error, 1 if state == UPLOADING else 0, time.time(), job_id,
+                 state, CAPTIONED, UPLOADING),
+            )
+
+    def claim(self, job_id, stale_after=STALE_UPLOAD_SECONDS):
+        """Atomically move a job to UPLOADING; False if another worker is uploading it
+        (or it got posted) in the meantime"""
+        now = time.time()
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET state = ?, error = NULL, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ? AND (state IN (?, ?, ?, ?) OR (state = ? AND updated_at < ?))",
+                (UPLOADING, now, job_id, QUEUED, CAPTIONED, RETRY, FAILED, UPLOADING, now - stale_after),
+            )
+        return cursor.rowcount == 1
+
+    def is_posted(self, video_path, account):
+        row = self.conn.execute(
+            "SELECT 1 FROM jobs WHERE account = ? AND content_hash = ? AND state = ?",
+            (account, self.hash_file(video_path), POSTED),
+        ).fetchone()
+        return row is not None
+
+    def pending(self, account=None):
+        """Jobs that were started but never posted (crash/failed), oldest first"""
+        query = "SELECT * FROM jobs WHERE state != ?"
+        params = [POSTED]
+        if account:
+            query += " AND account = ?"
+            params.append(account)
+        return [dict(row) for row in self.conn.execute(query + " ORDER BY updated_at", params)]
+
+    def summary(self):
+        return {row['state']: row['count'] for row in self.conn.execute(
+            "SELECT state, COUNT(*) AS count FROM jobs GROUP BY state"
+        )}
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the upload ledger")
+    parser.add_argument("--db", default=LEDGER_FILE)
+    parser.add_argument("--pending", action="store_true", help="List unfinished jobs")
+    parser.add_argument("--account", default=None)
+    args = parser.parse_args()
+
+    ledger = UploadLedger(args.db)
+    try:
+        print("📒 Upload Ledger")
+        print("-" * 40)
+        for state, count in sorted(ledger.summary().items()):
+            print(f"{state:<10} {count}")
+        if args.pending:
+            print("-" * 40)
+            for job in ledger.pending(args.account):
+                error = f" ({job['error']})" if job['error'] else ""
+                print(f"[{job['state']}] {job['account']}: {job['video_path']}{error}")
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
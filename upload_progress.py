@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+📶 Upload Progress - Pantau upload video: bytes terkirim, throughput, ETA
+- Hook XHR/fetch dipasang di setiap halaman (CDP Page.addScriptToEvaluateOnNewDocument)
+  untuk menghitung bytes chunk video yang sudah terkirim
+- Kalau hook tidak melihat apa-apa, pakai progress bar di halaman (aria-valuenow)
+- Stall = throughput di bawah batas minimum selama beberapa detik
+"""
+
+import time
+from collections import deque
+
+# Request bodies smaller than this are API calls, not video chunks
+MIN_CHUNK_BYTES = 64 * 1024
+
+PROGRESS_HOOK_JS = """
+(function() {
+    if (window.__tiktokUpload) return;
+    var state = window.__tiktokUpload = {loaded: 0, requests: 0, errors: 0, updated: 0};
+    function bodySize(body) {
+        return body ? (body.size || body.byteLength || 0) : 0;
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function(body) {
+        var size = bodySize(body);
+        if (size >= %(min_chunk)d) {
+            var xhr = this, sent = 0;
+            state.requests++;
+            xhr.upload.addEventListener('progress', function(e) {
+                state.loaded += e.loaded - sent;
+                sent = e.loaded;
+                state.updated = Date.now();
+            });
+            xhr.addEventListener('loadend', function() {
+                if (xhr.status >= 200 && xhr.status < 400) {
+                    state.loaded += size - sent;
+                } else {
+                    // The page re-sends failed chunks, so don't count them twice
+                    state.errors++;
+                    state.loaded -= sent;
+                }
+                sent = 0;
+                state.updated = Date.now();
+            });
+        }
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function(input, init) {
+            var size = bodySize(init && init.body);
+            var request = fetch.apply(this, arguments);
+            if (size >= %(min_chunk)d) {
+                state.requests++;
+                request.then(function(response) {
+                    if (response.ok) state.loaded += size; else state.errors++;
+                    state.updated = Date.now();
+                }, function() { state.errors++; });
+            }
+            return request;
+        };
+    }
+})();
+""" % {'min_chunk': MIN_CHUNK_BYTES}
+
+READ_PROGRESS_JS = """
+var state = window.__tiktokUpload || {loaded: 0, requests: 0, errors: 0};
+var percent = null;
+var bars = document.querySelectorAll('[role="progressbar"]');
+for (var i = 0; i < bars.length; i++) {
+    var now = parseFloat(bars[i].getAttribute('aria-valuenow'));
+    var max = parseFloat(bars[i].getAttribute('aria-valuemax')) || 100;
+    if (!isNaN(now)) percent = Math.max(percent || 0, now / max * 100);
+}
+return {loaded: state.loaded, requests: state.requests, errors: state.errors, percent: percent};
+"""
+
+
+def install_progress_hook(driver):
+    """Register the XHR/fetch hook for every future document (and the current one)"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": PROGRESS_HOOK_JS})
+        driver.execute_script(PROGRESS_HOOK_JS)
+        return True
+    except Exception as e:
+        print(f"⚠️ Upload progress hook unavailable: {e}")
+        return False
+
+
+def read_uploaded_bytes(driver, total_bytes):
+    """Best estimate of bytes sent: hooked chunk bytes, else the page's progress bar (None = no signal)"""
+    try:
+        state = driver.execute_script(READ_PROGRESS_JS) or {}
+    except Exception:
+        return None
+    if not state.get('requests') and state.get('percent') is None:
+        return None
+    loaded = state.get('loaded') or 0
+    if not loaded and state.get('percent') is not None:
+        loaded = total_bytes * state['percent'] / 100
+    return min(max(0, loaded), total_bytes)
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f}{unit}" if unit == "B" else f"{count:.1f}{unit}"
+        count /= 1024
+    return f"{count:.2f}GB"
+
+
+class UploadProgress:
+    """Throughput / ETA / stall tracking from (time, bytes) samples"""
+
+    def __init__(self, total_bytes, min_throughput=50 * 1024, stall_seconds=30, window=10, now=None):
+        self.total = max(1, total_bytes)
+        self.min_throughput = min_throughput
+        self.stall_seconds = stall_seconds
+        self.window = window
+        self.started = time.time() if now is None else now
+        self.samples = deque([(self.started, 0)])
+        # Without any reading (unknown page layout) we can't tell a stall from silence
+        self.signal = False
+
+    @property
+    def loaded(self):
+        return self.samples[-1][1]
+
+    def update(self, now, loaded):
+        """Record a reading; None (page unreadable) keeps the last value"""
+        if loaded is None:
+            loaded = self.loaded
+        else:
+            self.signal = True
+        self.samples.append((now, max(loaded, self.loaded)))
+        keep = max(self.window, self.stall_seconds) + 5
+        while len(self.samples) > 2 and now - self.samples[1][0] > keep:
+            self.samples.popleft()
+
+    def _rate_since(self, since):
+        """Bytes/s between the newest sample and the last one at or before `since`"""
+        base = None
+        for sample in self.samples:
+            if sample[0] <= since:
+                base = sample
+            else:
+                break
+        if base is None:
+            return None
+        now, loaded = self.samples[-1]
+        return (loaded - base[1]) / (now - base[0]) if now > base[0] else None
+
+    def throughput(self):
+        """Bytes/s over the recent window (whole run while it is shorter)"""
+        now = self.samples[-1][0]
+        rate = self._rate_since(now - self.window)
+        if rate is None:
+            rate = self._rate_since(self.samples[0][0])
+        return rate or 0.0
+
+    def eta(self):
+        rate = self.throughput()
+        return (self.total - self.loaded) / rate if rate > 0 else None
+
+    def complete(self):
+        return self.loaded >= self.total
+
+    def stalled(self):
+        """Below min throughput for a full stall window while bytes are still outstanding"""
+        if not self.signal or self.complete():
+            return False
+        now = self.samples[-1][0]
+        if now - self.started < self.stall_seconds:
+            return False
+        rate = self._rate_since(now - self.stall_seconds)
+        return rate is not None and rate < self.min_throughput
+
+    def describe(self):
+        percent = self.loaded / self.total * 100
+        eta = self.eta()
+        eta_text = f"{eta:.0f}s" if eta is not None else "?"
+        return (f"{format_bytes(self.loaded)}/{format_bytes(self.total)} ({percent:.0f}%) "
+                f"@ {format_bytes(self.throughput())}/s, ETA {eta_text}")
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+🔍 Video Inspector - Cek video sebelum buka browser
+Baca header MP4/MOV (box moov/mvhd/tkhd/stsd) dengan seek, tanpa memuat
+seluruh file, jadi file multi-GB tetap pakai memori konstan.
+Video yang melanggar batas (ukuran, durasi, resolusi, codec) ditolak
+sebelum upload.
+
+Usage:
+    python video_inspector.py video.mp4
+    python video_inspector.py ./folder-video --max-duration 180
+"""
+
+import os
+import sys
+import struct
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+VALID_EXTENSIONS = ['.mp4', '.mov', '.avi', '.mkv', '.webm']
+
+# Extensions whose headers we can parse (ISO base media file format)
+ISO_BMFF_EXTENSIONS = ['.mp4', '.mov']
+
+# Boxes we descend into on the way to the track metadata
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+class VideoLimits:
+    """Upload limits checked by the inspector (None = no limit)"""
+
+    def __init__(self, max_size_mb=4096, min_duration=1, max_duration=600,
+                 min_side=360, max_side=4096, codecs=('avc1', 'avc3', 'hvc1', 'hev1')):
+        self.max_size_mb = max_size_mb
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.min_side = min_side
+        self.max_side = max_side
+        self.codecs = set(codecs) if codecs else None
+
+
+def _iter_boxes(f, start, end):
+    """Yield (type, payload_offset, payload_size) for boxes between start and end"""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return
+        yield box_type, offset + header_size, size - header_size
+        offset += size
+
+
+def _read_mvhd(f, offset):
+    f.seek(offset)
+    version = f.read(1)[0]
+    if version == 1:
+        f.seek(offset + 4 + 16)
+        timescale, duration = struct.unpack(">IQ", f.read(12))
+    else:
+        f.seek(offset + 4 + 8)
+        timescale, duration = struct.unpack(">II", f.read(8))
+    return duration / timescale if timescale else None
+
+
+def _read_tkhd(f, offset):
+    f.seek(offset)
+    version = f.read(1)[0]
+    # Skip times/track id/duration, reserved, layer, group, volume and the 3x3 matrix
+    skip = (32 if version == 1 else 20) + 8 + 8 + 36
+    f.seek(offset + 4 + skip)
+    width, height = struct.unpack(">II", f.read(8))
+    return width / 65536.0, height / 65536.0
+
+
+def _read_handler(f, offset):
+    f.seek(offset + 8)
+    return f.read(4)
+
+
+def _read_codec(f, offset):
+    f.seek(offset + 8)
+    entry = f.read(8)
+    if len(entry) < 8:
+        return None
+    return entry[4:8].decode('latin-1').strip()
+
+
+def _inspect_track(f, offset, size):
+    """Walk one trak box; returns (handler, width, height, codec)"""
+    info = {'handler': None, 'width': None, 'height': None, 'codec': None}
+
+    def walk(start, end):
+        for box_type, payload, payload_size in _iter_boxes(f, start, end):
+            if box_type == b'tkhd':
+                info['width'], info['height'] = _read_tkhd(f, payload)
+            elif box_type == b'hdlr':
+                info['handler'] = _read_handler(f, payload)
+            elif box_type == b'stsd':
+                info['codec'] = _read_codec(f, payload)
+            elif box_type in CONTAINER_BOXES:
+                walk(payload, payload + payload_size)
+
+    walk(offset, offset + size)
+    return info
+
+
+def read_mp4_metadata(path):
+    """Duration, resolution and video codec from an MP4/MOV header (constant memory)"""
+    metadata = {'duration': None, 'width': None, 'height': None, 'codec': None}
+    file_size = os.path.getsize(path)
+
+    with open(path, 'rb') as f:
+        boxes = list(_iter_boxes(f, 0, file_size))
+        if not boxes or boxes[0][0] not in (b'ftyp', b'wide', b'free', b'moov', b'mdat'):
+            raise ValueError("not an MP4/MOV container")
+
+        moov = next(((offset, size) for box_type, offset, size in boxes if box_type == b'moov'), None)
+        if not moov:
+            raise ValueError("moov box missing (incomplete or corrupt file)")
+
+        for box_type, offset, size in _iter_boxes(f, moov[0], moov[0] + moov[1]):
+            if box_type == b'mvhd':
+                metadata['duration'] = _read_mvhd(f, offset)
+            elif box_type == b'trak':
+                track = _inspect_track(f, offset, size)
+                if track['handler'] == b'vide' and metadata['codec'] is None:
+                    metadata.update(width=track['width'], height=track['height'], codec=track['codec'])
+
+    return metadata
+
+
+def inspect_video(path, limits=None):
+    """Check one file against the limits; returns a report dict with 'ok' and 'errors'"""
+    limits = limits or VideoLimits()
+    report = {'path': path, 'ok': False, 'errors': [], 'size_mb': None,
+              'duration': None, 'width': None, 'height': None, 'codec': None}
+    errors = report['errors']
+
+    try:
+        if not os.path.isfile(path):
+            errors.append("file not found")
+            return report
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in VALID_EXTENSIONS:
+            errors.append(f"invalid format {extension or '(none)'}")
+            return report
+
+        report['size_mb'] = os.path.getsize(path) / (1024 * 1024)
+        if report['size_mb'] == 0:
+            errors.append("file is empty")
+        elif limits.max_size_mb and report['size_mb'] > limits.max_size_mb:
+            errors.append(f"too large ({report['size_mb']:.0f}MB > {limits.max_size_mb}MB)")
+
+        # AVI/MKV/WEBM headers aren't parsed, only the size checks apply
+        if extension in ISO_BMFF_EXTENSIONS:
+            report.update(read_mp4_metadata(path))
+            duration = report['duration']
+            if duration is None:
+                errors.append("duration unknown")
+            else:
+                if limits.min_duration and duration < limits.min_duration:
+                    errors.append(f"too short ({duration:.1f}s < {limits.min_duration}s)")
+                if limits.max_duration and duration > limits.max_duration:
+                    errors.append(f"too long ({duration:.0f}s > {limits.max_duration}s)")
+
+            if not report['width'] or not report['height']:
+                errors.append("no video track")
+            else:
+                short_side = min(report['width'], report['height'])
+                long_side = max(report['width'], report['height'])
+                if limits.min_side and short_side < limits.min_side:
+                    errors.append(f"resolution too low ({report['width']:.0f}x{report['height']:.0f})")
+                if limits.max_side and long_side > limits.max_side:
+                    errors.append(f"resolution too high ({report['width']:.0f}x{report['height']:.0f})")
+
+            if limits.codecs and report['codec'] and report['codec'] not in limits.codecs:
+                errors.append(f"unsupported codec {report['codec']}")
+    except Exception as e:
+        errors.append(f"unreadable header: {e}")
+
+    report['ok'] = not errors
+    return report
+
+
+def find_videos(directory):
+    """Video files directly inside a directory (streamed with scandir)"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in VALID_EXTENSIONS:
+                yield entry.path
+
+
+def inspect_many(paths, limits=None, workers=None):
+    """Inspect many files in parallel (header reads are I/O bound)"""
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+        return list(executor.map(lambda path: inspect_video(path, limits), paths))
+
+
+def format_report(report):
+    name = os.path.basename(report['path'])
+    if not report['ok']:
+        return f"❌ {name}: {', '.join(report['errors'])}"
+    details = [f"{report['size_mb']:.1f}MB"]
+    if report['duration'] is not None:
+        details.append(f"{report['duration']:.1f}s")
+    if report['width']:
+        details.append(f"{report['width']:.0f}x{report['height']:.0f}")
+    if report['codec']:
+        details.append(report['codec'])
+    return f"✅ {name}: {' | '.join(details)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-flight check for TikTok videos")
+    parser.add_argument("paths", nargs="+", help="Video files or directories")
+    parser.add_argument("--max-size-mb", type=float, default=4096)
+    parser.add_argument("--min-duration", type=float, default=1)
+    parser.add_argument("--max-duration", type=float, default=600)
+    parser.add_argument("--min-side", type=int, default=360, help="Minimum short side in pixels")
+    parser.add_argument("--max-side", type=int, default=4096, help="Maximum long side in pixels")
+    args = parser.parse_args()
+
+    limits = VideoLimits(args.max_size_mb, args.min_duration, args.max_duration, args.min_side, args.max_side)
+    paths = []
+    for path in args.paths:
+        paths.extend(sorted(find_videos(path)) if os.path.isdir(path) else [path])
+
+    reports = inspect_many(paths, limits)
+    for report in reports:
+        print(format_report(report))
+
+    bad = sum(1 for r in reports if not r['ok'])
+    print(f"\n📋 {len(reports) - bad}/{len(reports)} videos passed pre-flight")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+🏭 Worker Pool - Upload banyak video paralel dengan beberapa akun
+Setiap worker = 1 proses + 1 Chrome + user-data-dir + cookie file sendiri.
+Worker mengambil job dari queue akun masing-masing dan melapor hasil balik.
+
+Usage:
+    python worker_pool.py video1.mp4 video2.mp4 --account main --account second
+"""
+
+import os
+import time
+import queue
+import argparse
+import multiprocessing as mp
+from collections import deque
+
+import metrics
+from tiktok_uploader import TikTokUploader
+from caption_engine import generate_caption
+from video_inspector import inspect_many, format_report
+from upload_ledger import UploadLedger, CAPTIONED, POSTED, FAILED, RETRY
+from cookie_vault import ACCOUNTS_DIR, DEFAULT_ACCOUNT, cookies_path
+from browser_watchdog import BrowserWatchdog, reap_orphans, DEFAULT_RECYCLE_AFTER, DEFAULT_MAX_RSS_MB
+
+
+def account_profile_dir(account, slot):
+    """Chrome user-data-dir for one worker slot of an account"""
+    return os.path.join(ACCOUNTS_DIR, account, f"chrome-profile-{slot}")
+
+
+def _worker_main(account, slot, job_queue, result_queue, lean=False, recycle_after=DEFAULT_RECYCLE_AFTER,
+                 max_rss_mb=DEFAULT_MAX_RSS_MB, current=None):
+    """Worker process: one browser, one account, jobs until sentinel.
+    `current` (shared int) holds the job being worked on, so the parent can fail it if we die"""
+    name = f"{account}#{slot}"
+    uploader = TikTokUploader(
+        cookies_file=cookies_path(account),
+        user_data_dir=account_profile_dir(account, slot),
+        account=account,
+        # Worker processes have no usable stdin
+        interactive=False,
+    )
+    watchdog = BrowserWatchdog(uploader, recycle_after, max_rss_mb, name=name, lean=lean)
+    ledger = UploadLedger()
+    ready = False
+    first_job = True
+
+    try:
+        while True:
+            job = job_queue.get()
+            if job is None:
+                break
+            if current is not None:
+                current.value = job['seq']
+
+            started = time.time()
+            result = {
+                'job_id': job['job_id'],
+                'seq': job['seq'],
+                'account': account,
+                'worker': name,
+                'video_path': job['video_path'],
+                'success': False,
+                'skipped': False,
+                'retry': False,
+                'error': None,
+            }
+            ledger_id = None
+            claimed = False
+            uploader.retry_reason = None
+
+            try:
+                ledger_job = ledger.begin(job['video_path'], account)
+                if ledger_job is None:
+                    result.update(success=True, skipped=True, duration=0.0)
+                    result_queue.put(result)
+                    continue
+                ledger_id = ledger_job['id']
+
+                # Resume: a caption from an interrupted run wins over generating a new one
+                caption = job.get('caption') or ledger_job['caption'] or ""
+                if not caption and job.get('caption_mode') in ('ai', 'local'):
+                    description = job.get('description') or os.path.splitext(os.path.basename(job['video_path']))[0]
+                    if job['caption_mode'] == 'local':
+                        caption = generate_caption(description)
+                    else:
+                        caption = uploader.generate_ai_caption(description)
+                if caption:
+                    ledger.mark(ledger_id, CAPTIONED, caption=caption)
+
+                if not ready:
+                    print(f"🏭 [{name}] Starting browser...")
+                    watchdog.start()
+                    ready = True
+                    first_job = True
+                else:
+                    # Too many uploads, too much memory or hung: fresh browser, same session
+                    reason = watchdog.check()
+                    if reason:
+                        watchdog.recycle(reason)
+                        first_job = True
+
+                # login_tiktok already leaves us on the upload page
+                if not first_job and not uploader.open_upload_page():
+                    raise Exception("Could not open upload page")
+                first_job = False
+
+                claimed = ledger.claim(ledger_id)
+                if not claimed:
+                    # Same content is being uploaded by another worker right now
+                    result.update(success=True, skipped=True, duration=0.0)
+                    result_queue.put(result)
+                    continue
+                result['success'] = bool(uploader.upload_video(job['video_path'], caption))
+                watchdog.record_upload()
+                if not result['success']:
+                    result['error'] = uploader.retry_reason or "Upload failed"
+                    result['retry'] = bool(uploader.retry_reason)
+                state = POSTED if result['success'] else RETRY if result['retry'] else FAILED
+                ledger.mark(ledger_id, state, error=result['error'])
+            except Exception as e:
+                result['error'] = str(e)
+                result['retry'] = bool(uploader.retry_reason)
+                # Before the claim the row may belong to another worker; leave it alone
+                if claimed:
+                    ledger.mark(ledger_id, RETRY if result['retry'] else FAILED, error=result['error'])
+                # Start over with a fresh browser on the next job
+                watchdog.shutdown()
+                ready = False
+
+            result['duration'] = time.time() - started
+            result_queue.put(result)
+            if current is not None:
+                current.value = -1
+    finally:
+        ledger.close()
+        watchdog.shutdown()
+        # multiprocessing children end with os._exit: atexit hooks never run here,
+        # so selector stats and metric totals are written explicitly
+        uploader.close()
+        metrics.recorder.flush()
+
+
+class _WorkerSlot:
+    """One worker process of an account plus the job it is on"""
+
+    def __init__(self, account, slot, proc, current):
+        self.account = account
+        self.slot = slot
+        self.proc = proc
+        self.current = current
+
+
+class UploadWorkerPool:
+    """Pool of isolated uploader processes, grouped per account.
+    At most max_workers browsers run at once: jobs for an account without workers wait
+    until an idle account's workers are retired. Dead workers are replaced and the job
+    they were on is reported as failed."""
+
+    # Deaths in a row (without a finished job) before an account's remaining jobs are failed
+    max_restarts = 3
+
+    def __init__(self, concurrency_per_account=1, max_workers=None, account_concurrency=None, queue_size=None,
+                 lean=False, recycle_after=DEFAULT_RECYCLE_AFTER, max_rss_mb=DEFAULT_MAX_RSS_MB, max_waiting=None):
+        self.concurrency_per_account = max(1, concurrency_per_account)
+        self.account_concurrency = account_concurrency or {}
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.queue_size = queue_size or 0
+        # Jobs held for accounts without workers; submit() blocks beyond this, like a full queue
+        self.max_waiting = max(1, max_waiting or 2 * self.max_workers)
+        self.lean = lean
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.result_queue = mp.Queue()
+        self.job_queues = {}
+        self.workers = {}         # account -> [_WorkerSlot]
+        self.retiring = []        # workers told to exit, still holding a slot
+        self.waiting = deque()    # jobs of accounts that have no workers yet
+        self.waiting_seqs = set()
+        self.waiting_accounts = {}  # account -> jobs of it in waiting
+        self.active = {}          # account -> seqs handed to its workers that have no result yet
+        self.outstanding = {}     # seq -> job, until its result is collected
+        self.buffered = deque()   # results read early or made up for dead workers
+        self.restarts = {}
+        self.submitted = 0
+        self.collected = 0
+        self.closing = False
+        # Browsers left behind by a crashed earlier run still hold memory
+        reap_orphans()
+
+    def running(self):
+        return sum(len(slots) for slots in self.workers.values()) + len(self.retiring)
+
+    def capacity(self, account):
+        """Workers an account has (or would get once it starts)"""
+        if account in self.workers:
+            return len(self.workers[account])
+        wanted = self.account_concurrency.get(account, self.concurrency_per_account)
+        return max(1, min(wanted, self.max_workers - self.running()))
+
+    def _spawn(self, account, slot):
+        current = mp.Value('l', -1)
+        proc = mp.Process(
+            target=_worker_main,
+            args=(account, slot, self.job_queues[account], self.result_queue, self.lean, self.recycle_after,
+                  self.max_rss_mb, current),
+            name=f"uploader-{account}-{slot}",
+            daemon=True,
+        )
+        proc.start()
+        return _WorkerSlot(account, slot, proc, current)
+
+    def _start_account(self, account):
+        """Spawn the workers for an account (caller checked there is a free slot)"""
+        count = self.capacity(account)
+        self.job_queues[account] = mp.Queue(maxsize=self.queue_size or count * 2)
+        self.workers[account] = [self._spawn(account, slot) for slot in range(count)]
+        print(f"🏭 Started {count} worker(s) for account '{account}'")
+
+    def _can_start(self, account):
+        """A free slot, and no retiring worker of this account still holding its Chrome profile"""
+        return (self.running() < self.max_workers
+                and not any(worker.account == account for worker in self.retiring))
+
+    def _account_busy(self, account):
+        return bool(self.active.get(account))
+
+    def _retire_idle(self):
+        """Free the slots of accounts with nothing left to do, for the accounts that are waiting"""
+        for account in list(self.workers):
+            if account in self.waiting_accounts or self._account_busy(account):
+                continue
+            print(f"🏭 Retiring idle worker(s) of account '{account}'")
+            for worker in self.workers.pop(account):
+                self.job_queues[account].put(None)
+                self.retiring.append(worker)
+            del self.job_queues[account]
+
+    def _buffer(self, result):
+        """Keep a result until get_result() hands it out; its account is no longer busy with it"""
+        self.active.get(result['account'], set()).discard(result['seq'])
+        self.buffered.append(result)
+
+    def _fail(self, seq, error):
+        """Made-up failed result for a job whose worker is gone"""
+        job = self.outstanding.get(seq)
+        if job is None or any(result['seq'] == seq for result in self.buffered):
+            return
+        self._buffer({
+            'job_id': job['job_id'], 'seq': seq, 'account': job['account'], 'worker': job['account'],
+            'video_path': job['video_path'], 'success': False, 'skipped': False, 'retry': False,
+            'error': error, 'duration': 0.0, 'crashed': True,
+        })
+
+    def _drain(self):
+        while True:
+            try:
+                self._buffer(self.result_queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _wait(self, job):
+        self.waiting.append(job)
+        self.waiting_seqs.add(job['seq'])
+        self.waiting_accounts[job['account']] = self.waiting_accounts.get(job['account'], 0) + 1
+
+    def _unwait(self, job):
+        self.waiting.remove(job)
+        self.waiting_seqs.discard(job['seq'])
+        self.waiting_accounts[job['account']] -= 1
+        if not self.waiting_accounts[job['account']]:
+            del self.waiting_accounts[job['account']]
+
+    def _check_workers(self):
+        """Replace dead workers, fail their jobs, start waiting accounts when slots free up"""
+        self.retiring = [worker for worker in self.retiring if worker.proc.is_alive()]
+        for account, slots in list(self.workers.items()):
+            for worker in list(slots):
+                if worker.proc.is_alive():
+                    continue
+                # Results it managed to send before dying must win over a made-up failure
+                self._drain()
+                seq = worker.current.value
+                print(f"💥 Worker {account}#{worker.slot} died (exit code {worker.proc.exitcode})")
+                if seq >= 0:
+                    self._fail(seq, f"worker died (exit code {worker.proc.exitcode})")
+                self.restarts[account] = self.restarts.get(account, 0) + 1
+                if self.closing:
+                    slots.remove(worker)
+                elif self.restarts[account] > self.max_restarts:
+                    slots.remove(worker)
+                else:
+                    slots[slots.index(worker)] = self._spawn(account, worker.slot)
+            if not slots and account in self.workers:
+                # Nothing left to run this account's queue: fail what is still waiting in it
+                print(f"❌ Account '{account}' keeps crashing its workers, failing its queued jobs")
+                del self.workers[account]
+                del self.job_queues[account]
+                for seq in list(self.active.get(account, ())):
+                    self._fail(seq, "no live worker for this account")
+
+        if self.waiting and not self.closing:
+            if self.running() >= self.max_workers:
+                self._retire_idle()
+            startable = [account for account in self.waiting_accounts if self._can_start(account)]
+            while startable and self.running() < self.max_workers:
+                account = startable.pop(0)
+                if account in self.job_queues:
+                    continue
+                self._start_account(account)
+                for job in [job for job in self.waiting if job['account'] == account]:
+                    self._unwait(job)
+                    self._put(job)
+
+    def _put(self, job):
+        """Hand a job to its account queue without blocking forever on dead workers"""
+        self.active.setdefault(job['account'], set()).add(job['seq'])
+        while True:
+            job_queue = self.job_queues.get(job['account'])
+            if job_queue is None:
+                self._fail(job['seq'], "no live worker for this account")
+                return
+            try:
+                job_queue.put(job, timeout=1)
+                return
+            except queue.Full:
+                self._check_workers()
+
+    def submit(self, job):
+        """Queue a job dict (video_path, account, caption or caption_mode/description);
+        blocks while the account queue (or the waiting list of accounts without workers) is full"""
+        account = job.get('account') or DEFAULT_ACCOUNT
+        job = dict(job, account=account, job_id=job.get('job_id', self.submitted), seq=self.submitted)
+        self.submitted += 1
+        self.outstanding[job['seq']] = job
+
+        if account in self.job_queues:
+            self._put(job)
+        elif self._can_start(account) and not self.waiting:
+            self.restarts.pop(account, None)
+            self._start_account(account)
+            self._put(job)
+        else:
+            if account not in self.waiting_accounts:
+                print(f"⏳ All {self.max_workers} worker slots busy, '{account}' waits for a free one")
+            self._wait(job)
+            self._check_workers()
+            while len(self.waiting) >= self.max_waiting:
+                # Backpressure: finished uploads (kept for get_result) free accounts to retire
+                try:
+                    self._buffer(self.result_queue.get(timeout=0.2))
+                except queue.Empty:
+                    pass
+                self._check_workers()
+        return job['job_id']
+
+    def get_result(self, timeout=None):
+        """Wait for the next finished job (raises queue.Empty after timeout)"""
+        give_up = None if timeout is None else time.time() + timeout
+        while not self.buffered:
+            wait = 1.0 if give_up is None else min(1.0, give_up - time.time())
+            try:
+                self._buffer(self.result_queue.get(timeout=max(0.0, wait)))
+            except queue.Empty:
+                self._check_workers()
+                if give_up is not None and time.time() >= give_up and not self.buffered:
+                    raise
+        result = self.buffered.popleft()
+        if self.outstanding.pop(result['seq'], None) is None:
+            # Late real result for a job already failed on the worker's behalf
+            return self.get_result(timeout)
+        if not result.get('crashed'):
+            self.restarts.pop(result['account'], None)
+        self.collected += 1
+        if self.waiting:
+            self._check_workers()
+        return result
+
+    def ready_results(self):
+        """Yield the results that are already in, without waiting"""
+        while self.collected < self.submitted:
+            try:
+                yield self.get_result(timeout=0)
+            except queue.Empty:
+                return
+
+    def results(self):
+        """Yield results until every submitted job has reported back"""
+        while self.collected < self.submitted:
+            yield self.get_result()
+
+    def close(self):
+        """Send sentinels and wait for all workers to exit"""
+        self.closing = True
+        for job in list(self.waiting):
+            self._unwait(job)
+            self._fail(job['seq'], "pool closed before an account slot was free")
+        for account, job_queue in self.job_queues.items():
+            for _ in self.workers[account]:
+                # A queue full of jobs nobody is alive to take must not block shutdown
+                while any(worker.proc.is_alive() for worker in self.workers[account]):
+                    try:
+                        job_queue.put(None, timeout=1)
+                        break
+                    except queue.Full:
+                        pass
+        for worker in [w for slots in self.workers.values() for w in slots] + self.retiring:
+            worker.proc.join()
+        # Workers that died hard leave their chromedriver behind
+        reap_orphans()
+
+
+def iter_pool(jobs, concurrency_per_account=1, max_workers=None, account_concurrency=None, lean=False,
+              **pool_options):
+    """Feed jobs lazily into the pool and yield results as they finish"""
+    pool = UploadWorkerPool(concurrency_per_account, max_workers, account_concurrency, lean=lean, **pool_options)
+    try:
+        for job in jobs:
+            pool.submit(job)
+            # Drain whatever is already done so results don't pile up
+            yield from pool.ready_results()
+        yield from pool.results()
+    finally:
+        pool.close()
+
+
+def run_pool(jobs, concurrency_per_account=1, max_workers=None, account_concurrency=None, lean=False,
+             **pool_options):
+    """Run an iterable of jobs through the pool and return all results"""
+    return list(iter_pool(jobs, concurrency_per_account, max_workers, account_concurrency, lean, **pool_options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel multi-account TikTok uploader")
+    parser.add_argument("videos", nargs="+", help="Video files to upload")
+    parser.add_argument("--account", action="append", dest="accounts",
+                        help="Account name (repeat for more accounts, videos are assigned round-robin)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Workers per account")
+    parser.add_argument("--max-workers", type=int, default=None, help="Total worker cap (default: CPU cores)")
+    parser.add_argument("--caption", default="", help="Caption used for every video")
+    parser.add_argument("--lean", action="store_true",
+                        help="Headless lean browsers (needs valid saved cookies, no manual login)")
+    parser.add_argument("--recycle-after", type=int, default=DEFAULT_RECYCLE_AFTER,
+                        help="Restart a worker's browser after this many uploads (0 = never)")
+    parser.add_argument("--max-rss", type=int, default=DEFAULT_MAX_RSS_MB,
+                        help="Restart a worker's browser above this many MB of RSS (0 = no limit)")
+    args = parser.parse_args()
+
+    # Pre-flight all videos in parallel before any browser starts
+    reports = inspect_many(args.videos)
+    for report in reports:
+        if not report['ok']:
+            print(format_report(report))
+    videos = [r['path'] for r in reports if r['ok']]
+    if not videos:
+        print("❌ No valid videos to upload")
+        return
+
+    accounts = args.accounts or [DEFAULT_ACCOUNT]
+    jobs = [
+        {'video_path': path, 'caption': args.caption, 'account': accounts[i % len(accounts)]}
+        for i, path in enumerate(videos)
+    ]
+
+    print("🏭 TikTok Upload Worker Pool")
+    print(f"📁 Videos: {len(jobs)} | 👤 Accounts: {', '.join(accounts)} | ⚙️ Per account: {args.concurrency}")
+    print("-" * 50)
+
+    started = time.time()
+    results = run_pool(jobs, args.concurrency, args.max_workers, lean=args.lean,
+                       recycle_after=args.recycle_after, max_rss_mb=args.max_rss)
+    elapsed = time.time() - started
+
+    ok = sum(1 for r in results if r['success'])
+    print("\n📋 Pool Summary:")
+    print("-" * 40)
+    for r in sorted(results, key=lambda r: r['job_id']):
+        status = "⏭️ already posted" if r['skipped'] else "✅" if r['success'] \
+            else f"🔁 retry: {r['error']}" if r['retry'] else f"❌ {r['error']}"
+        print(f"{os.path.basename(r['video_path'])} [{r['worker']}] {r['duration']:.1f}s {status}")
+    print("-" * 40)
+    print(f"🎉 {ok}/{len(results)} uploaded in {elapsed:.1f}s ({ok / elapsed * 3600:.1f} videos/hour)")
+
+
+if __name__ == "__main__":
+    main()